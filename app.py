@@ -1,22 +1,44 @@
 from flask import Flask
-from extensions import db, login_manager, bcrypt
+from config import perfil_ativo
+from extensions import db, login_manager, bcrypt, cache
 
 from controllers.auth import auth_bp
 from controllers.main import main_bp
 from controllers.projetos import projetos_bp
 from controllers.usuarios import usuarios_bp
+from controllers.debug import debug_bp
 
-from models import Usuario
+from migrations import aplicar_migracoes, criar_tabelas
+from services.busca import init_busca
+from services.facetas import init_facetas
+from services.curtidas import init_curtidas
+from services.imagens import init_imagens
+from services.sessao import sessoes, init_sessoes
+from services.tendencias import init_tendencias
+from services.tarefas import init_tarefas
+from services.armazenamento import armazenamento
+from services.suap import suap
+from utils.instrumentacao import init_instrumentacao
+from utils.banco import init_banco
+from utils.estaticos import init_estaticos
 
 app = Flask(__name__)
 
 # configurações
-app.config.from_object("config.Config")
+app.config.from_object(perfil_ativo())
 
 # inicializa extensões
 db.init_app(app)
 login_manager.init_app(app)
 bcrypt.init_app(app)
+cache.init_app(app)
+init_banco(app)
+init_imagens(app)
+init_sessoes(app)
+init_tendencias(app)
+armazenamento.init_app(app)
+suap.init_app(app)
+init_estaticos(app)
 
 # flask-Login
 login_manager.login_view = "auth.login"
@@ -28,12 +50,29 @@ app.register_blueprint(main_bp)
 app.register_blueprint(projetos_bp)
 app.register_blueprint(usuarios_bp)
 
+# instrumentação opcional (desligada por padrão)
+if app.config["INSTRUMENTACAO"]:
+    init_instrumentacao(app)
+    app.register_blueprint(debug_bp)
+
 with app.app_context():
-    db.create_all()
+    criar_tabelas()
+    if app.config["MIGRAR_AO_INICIAR"]:
+        aplicar_migracoes()
+    init_busca()
+    init_facetas()
+    init_curtidas(app)
+
+# trabalhador da fila de tarefas dentro do app (TAREFAS_NO_APP): sobe com a primeira requisição
+# atendida, não no import, então os scripts que importam o app não pegam tarefas da fila
+@app.before_request
+def iniciar_trabalhador():
+    init_tarefas(app)
 
 @login_manager.user_loader
 def load_user(user_id):
-    return Usuario.query.get(int(user_id))
+    # só as colunas usadas por current_user, em cache por alguns segundos (services/sessao.py)
+    return sessoes.carregar(int(user_id))
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,163 @@
+#cache da aplicação com invalidação por tags
+#backend "memoria": LRU com TTL dentro do processo (padrão)
+#backend "redis": servidor local compartilhado entre os workers do gunicorn (pip install redis)
+#
+#cada entrada guarda a versão das suas tags no momento em que foi gravada;
+#invalidar uma tag só incrementa a versão dela, e as entradas antigas deixam de valer
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+_AUSENTE = object()
+
+
+class MemoriaBackend:
+
+    def __init__(self, tamanho=1024):
+        self.tamanho = tamanho
+        self._itens = OrderedDict()  # chave -> (expira_em, valor)
+        self._tags = {}
+        self._lock = threading.Lock()
+
+    def get(self, chave):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return _AUSENTE
+            expira_em, valor = item
+            if expira_em and expira_em < time.monotonic():
+                del self._itens[chave]
+                return _AUSENTE
+            self._itens.move_to_end(chave)
+            return valor
+
+    def set(self, chave, valor, ttl):
+        expira_em = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._itens[chave] = (expira_em, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho:
+                self._itens.popitem(last=False)
+
+    def delete(self, chave):
+        with self._lock:
+            self._itens.pop(chave, None)
+
+    def versoes(self, tags):
+        with self._lock:
+            return [self._tags.get(tag, 0) for tag in tags]
+
+    def incrementar(self, tag):
+        with self._lock:
+            self._tags[tag] = self._tags.get(tag, 0) + 1
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+            self._tags.clear()
+
+
+class RedisBackend:
+
+    def __init__(self, url, prefixo="ifnexus:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND = 'redis' precisa do pacote redis (pip install redis)")
+        self._redis = redis.Redis.from_url(url)
+        self._prefixo = prefixo
+
+    def get(self, chave):
+        dado = self._redis.get(self._prefixo + chave)
+        return _AUSENTE if dado is None else pickle.loads(dado)
+
+    def set(self, chave, valor, ttl):
+        self._redis.set(self._prefixo + chave, pickle.dumps(valor), ex=ttl or None)
+
+    def delete(self, chave):
+        self._redis.delete(self._prefixo + chave)
+
+    def versoes(self, tags):
+        if not tags:
+            return []
+        return [int(v or 0) for v in self._redis.mget([self._prefixo + "tag:" + t for t in tags])]
+
+    def incrementar(self, tag):
+        self._redis.incr(self._prefixo + "tag:" + tag)
+
+    def limpar(self):
+        for chave in self._redis.scan_iter(self._prefixo + "*"):
+            self._redis.delete(chave)
+
+
+class Cache:
+
+    def __init__(self, app=None):
+        self.backend = MemoriaBackend()
+        self.ttl_padrao = 300
+        self._stats = {"acertos": 0, "faltas": 0, "invalidacoes": 0}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        tipo = app.config.get("CACHE_BACKEND", "memoria")
+        if tipo == "redis":
+            self.backend = RedisBackend(app.config["CACHE_URL"])
+        else:
+            self.backend = MemoriaBackend(app.config.get("CACHE_TAMANHO", 1024))
+        self.ttl_padrao = app.config.get("CACHE_TTL", 300)
+
+    def _contar(self, campo):
+        with self._lock:
+            self._stats[campo] += 1
+
+    def get(self, chave, padrao=None):
+        entrada = self.backend.get(chave)
+        if entrada is not _AUSENTE:
+            valor, tags = entrada
+            if not tags or self.backend.versoes(list(tags)) == list(tags.values()):
+                self._contar("acertos")
+                return valor
+        self._contar("faltas")
+        return padrao
+
+    def _versoes(self, tags):
+        tags = list(tags)
+        return dict(zip(tags, self.backend.versoes(tags)))
+
+    def _gravar(self, chave, valor, ttl, versoes):
+        self.backend.set(chave, (valor, versoes), self.ttl_padrao if ttl is None else ttl)
+
+    def set(self, chave, valor, ttl=None, tags=()):
+        self._gravar(chave, valor, ttl, self._versoes(tags))
+
+    def lembrar(self, chave, funcao, ttl=None, tags=()):
+        valor = self.get(chave, _AUSENTE)
+        if valor is _AUSENTE:
+            # versões lidas antes de calcular: se alguém invalidar no meio, a entrada já nasce velha
+            versoes = self._versoes(tags)
+            valor = funcao()
+            self._gravar(chave, valor, ttl, versoes)
+        return valor
+
+    def apagar(self, chave):
+        self.backend.delete(chave)
+
+    def invalidar(self, *tags):
+        for tag in tags:
+            self.backend.incrementar(tag)
+            self._contar("invalidacoes")
+
+    def limpar(self):
+        self.backend.limpar()
+
+    def estatisticas(self):
+        with self._lock:
+            stats = dict(self._stats)
+        consultas = stats["acertos"] + stats["faltas"]
+        stats["taxa_acerto"] = round(stats["acertos"] / consultas, 3) if consultas else None
+        stats["backend"] = type(self.backend).__name__
+        return stats
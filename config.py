@@ -1,4 +1,119 @@
+import os
+
+# banco: SQLite local por padrão; DATABASE_URL troca para um servidor (postgresql://...) sem mudar código
+DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///ifnexus.db")
+USA_SQLITE = DATABASE_URL.startswith("sqlite")
+
 class Config:
     SECRET_KEY = "ifnexus"
-    SQLALCHEMY_DATABASE_URI = "sqlite:///ifnexus.db"
+    SQLALCHEMY_DATABASE_URI = DATABASE_URL
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # PRAGMAs aplicados em toda conexão SQLite nova (ver utils/banco.py)
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",        # leitores não esperam escritores
+        "synchronous": "NORMAL",      # seguro com WAL e bem mais rápido que FULL
+        "busy_timeout": 5000,         # espera o lock em vez de "database is locked"
+        "foreign_keys": "ON",
+    }
+    SQLALCHEMY_ENGINE_OPTIONS = {} if USA_SQLITE else {"pool_pre_ping": True}
+
+    # aplica as migrações pendentes (pasta migrations/) ao subir o app
+    MIGRAR_AO_INICIAR = os.environ.get("IFNEXUS_MIGRAR_AO_INICIAR", "1") == "1"
+
+    # instrumentação por requisição (Server-Timing, log de lentas, /_debug/requests)
+    INSTRUMENTACAO = os.environ.get("IFNEXUS_INSTRUMENTACAO") == "1"
+    LIMITE_REQUISICAO_LENTA_MS = int(os.environ.get("IFNEXUS_LIMITE_LENTA_MS", 500))
+
+    # usuário da sessão (current_user) guardado na memória de cada processo por esse tempo
+    USUARIO_SESSAO_VALIDADE = int(os.environ.get("IFNEXUS_USUARIO_SESSAO_VALIDADE", 30))
+
+    # cache da aplicação: "memoria" (por processo) ou "redis" (compartilhado entre workers)
+    CACHE_BACKEND = os.environ.get("IFNEXUS_CACHE", "memoria")
+    CACHE_URL = os.environ.get("IFNEXUS_CACHE_URL", "redis://localhost:6379/0")
+    CACHE_TTL = 300
+
+    # projetos virais: agrupa os incrementos de curtidas em memória e grava em lote
+    CURTIDAS_AGRUPADAS = os.environ.get("IFNEXUS_CURTIDAS_AGRUPADAS") == "1"
+    INTERVALO_CURTIDAS_AGRUPADAS = 5
+
+    # curtidas de cada usuário num array em cache (services/curtidas.py); só faz sentido com o
+    # cache compartilhado entre os workers, então acompanha o backend redis por padrão
+    CURTIDAS_CACHE_USUARIO = os.environ.get(
+        "IFNEXUS_CURTIDAS_CACHE_USUARIO", "1" if CACHE_BACKEND == "redis" else "0") == "1"
+    VALIDADE_CURTIDAS_CACHE_USUARIO = 600
+
+    # "em alta" (services/tendencias.py): cada curtida vale metade a cada meia-vida; um comentário
+    # vale TENDENCIA_PESO_COMENTARIO curtidas (os dois positivos, conferidos ao subir o app).
+    # Mudou? rode scripts/recalcular_tendencias.py
+    TENDENCIA_MEIA_VIDA_HORAS = 72
+    TENDENCIA_PESO_COMENTARIO = 2
+
+    # variantes das imagens enviadas (services/imagens.py): formatos gerados além do JPEG
+    IMAGENS_FORMATOS = ("avif", "webp")
+
+    # fila de tarefas (services/tarefas.py): com TAREFAS_NO_APP o servidor roda o trabalhador (a
+    # partir da primeira requisição); com IFNEXUS_TAREFAS_NO_APP=0 rode "python scripts/trabalhador.py"
+    # separado. Os scripts de manutenção desligam para não pegar tarefas
+    TAREFAS_NO_APP = os.environ.get("IFNEXUS_TAREFAS_NO_APP", "1") == "1"
+    TAREFAS_THREADS = int(os.environ.get("IFNEXUS_TAREFAS_THREADS", 2))
+    TAREFAS_INTERVALO = 1.0
+
+    # cliente do SUAP (services/suap.py); IFNEXUS_SUAP_URL=http://127.0.0.1:5050 usa o servidor
+    # falso de scripts/suap_falso.py (testes de carga do login sem depender do SUAP)
+    SUAP_URL = os.environ.get("IFNEXUS_SUAP_URL", "https://suap.ifrn.edu.br")
+    SUAP_TIMEOUT = (3, 10)            # (conexão, leitura) em segundos
+    SUAP_TENTATIVAS = 2
+    SUAP_CONEXOES = 10                # conexões mantidas abertas por processo
+    SUAP_FALHAS_PARA_ABRIR = 5        # falhas seguidas até o disjuntor abrir
+    SUAP_TEMPO_ABERTO = 30
+
+    # uploads endereçados pelo conteúdo (services/armazenamento.py): "fragmentado" ou "plano"
+    ARMAZENAMENTO_LAYOUT = os.environ.get("IFNEXUS_ARMAZENAMENTO_LAYOUT", "fragmentado")
+    LIMITE_IMAGEM_MB = 8
+    LIMITE_DOCUMENTO_MB = 20
+    # o Werkzeug recusa (413) antes de ler o corpo: 4 imagens + 1 documento com folga
+    MAX_CONTENT_LENGTH = 64 * 1024 * 1024
+
+    # static/ com hash no nome e .gz/.br (utils/estaticos.py); em desenvolvimento é refeito a cada
+    # subida, em produção (ProducaoConfig) só lê o manifesto gerado no deploy
+    ESTATICOS_IMPRESSAO_DIGITAL = True
+    ESTATICOS_GERAR_AO_INICIAR = os.environ.get("IFNEXUS_ESTATICOS_AO_INICIAR", "1") == "1"
+
+
+class ProducaoConfig(Config):
+    SECRET_KEY = os.environ.get("SECRET_KEY", Config.SECRET_KEY)
+
+    SQLITE_PRAGMAS = {
+        **Config.SQLITE_PRAGMAS,
+        "busy_timeout": 15000,
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64000,         # ~64 MB de cache de páginas por conexão
+        "temp_store": "MEMORY",
+    }
+
+    # cada worker refaria o hash de static/ e os .gz/.br (brotli nível 11) ao subir: no deploy rode
+    # "python scripts/gerar_estaticos.py"; sem o manifesto, o primeiro worker ainda gera um
+    ESTATICOS_GERAR_AO_INICIAR = os.environ.get("IFNEXUS_ESTATICOS_AO_INICIAR", "0") == "1"
+
+    # cada worker do gunicorn tem seu pool; com SQLite um pool pequeno basta
+    # (só um escritor por vez), num servidor o pool pode crescer
+    if USA_SQLITE:
+        SQLALCHEMY_ENGINE_OPTIONS = {"pool_size": 5, "max_overflow": 5, "pool_timeout": 15}
+    else:
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            "pool_size": 10,
+            "max_overflow": 20,
+            "pool_pre_ping": True,
+            "pool_recycle": 1800,
+        }
+
+
+# IFNEXUS_PERFIL=producao seleciona o perfil de produção
+PERFIS = {
+    "desenvolvimento": Config,
+    "producao": ProducaoConfig,
+}
+
+def perfil_ativo():
+    return PERFIS[os.environ.get("IFNEXUS_PERFIL", "desenvolvimento")]
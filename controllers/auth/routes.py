@@ -1,15 +1,15 @@
+from functools import lru_cache
+
 from flask import render_template, request, flash, redirect, url_for
 from flask_login import login_user, logout_user, login_required, current_user
 
-import requests
-from urllib.parse import urlencode
-
 from extensions import db, bcrypt
-from models import Usuario, Comentario, Curtida
+from models import Usuario
+from services.indice_usuarios import indice_usuarios
+from services.contas import agendar_mesclagem
+from services.suap import suap, SuapErro, SuapIndisponivel
 from . import auth_bp
 
-from services.suap_config import *
-
 @auth_bp.route('/login', methods=['GET', 'POST'])
 def login():
     
@@ -51,6 +51,7 @@ def register():
         novo_usuario = Usuario(nome=nome, email=email, senha=senha_hash, tipo_usuario=tipo_usuario) 
         db.session.add(novo_usuario)
         db.session.commit()
+        indice_usuarios.adicionar(novo_usuario)
 
         flash('Cadastro realizado com sucesso! Agora faça login.', 'success')
         return redirect(url_for('auth.login'))
@@ -66,16 +67,21 @@ def logout():
     return redirect(url_for('main.index'))
 
 
+@lru_cache(maxsize=1)
+def _senha_padrao_suap():
+    # o bcrypt leva centenas de ms e a senha é sempre a mesma: calcula uma vez por processo
+    return bcrypt.generate_password_hash("suap_login_default_123").decode("utf-8")
+
+
 @auth_bp.route("/login_suap")
 def login_suap():
-    
-    params = {
-        "response_type": "code",
-        "client_id": SUAP_CLIENT_ID,
-        "redirect_uri": SUAP_REDIRECT_URI,
-    }
 
-    return redirect(f"{SUAP_AUTH_URL}?{urlencode(params)}")
+    # SUAP fora do ar: avisa aqui em vez de mandar o usuário para uma página que não carrega
+    if suap.disjuntor.aberto():
+        flash("O SUAP não está respondendo agora. Tente novamente em instantes ou entre com email e senha.", "error")
+        return redirect(url_for("auth.login"))
+
+    return redirect(suap.url_autorizacao())
 
 @auth_bp.route("/callback_suap")
 def callback_suap():
@@ -84,49 +90,25 @@ def callback_suap():
         flash("Erro: nenhum código recebido do SUAP.", "error")
         return redirect(url_for("auth.login"))
 
-    data = {
-        "grant_type": "authorization_code",
-        "code": code,
-        "redirect_uri": SUAP_REDIRECT_URI,
-        "client_id": SUAP_CLIENT_ID,
-    }
-
-    token_response = requests.post(SUAP_TOKEN_URL, data=data)
-
-    if token_response.status_code != 200:
-        flash(f"Erro ao obter token do SUAP: {token_response.text}", "error")
+    try:
+        access_token = suap.trocar_codigo(code)
+        user_info = suap.perfil(access_token)
+    except SuapIndisponivel:
+        flash("O SUAP não está respondendo agora. Tente novamente em instantes ou entre com email e senha.", "error")
         return redirect(url_for("auth.login"))
-
-    access_token = token_response.json().get("access_token")
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Accept": "application/json"
-    }
-
-    SUAP_API_URL = "https://suap.ifrn.edu.br/api/eu/"
-    response = requests.get(SUAP_API_URL, headers=headers)
-
-    if response.status_code != 200:
-        print("STATUS SUAP:", response.status_code)
-        print("RESPOSTA SUAP:", response.text)
-        flash("Erro ao buscar dados do usuário no SUAP.", "error")
+    except SuapErro as e:
+        flash(str(e), "error")
         return redirect(url_for("auth.login"))
 
-    user_info = response.json()
-
     email = user_info.get("email")
     nome = user_info.get("nome_usual") or user_info.get("nome")
-    vinculo = user_info.get("vinculo", {})
-    print(user_info)
     suap_usuario = Usuario.query.filter_by(email=email).first()
 
     if not suap_usuario:
-        print(user_info)
         suap_usuario = Usuario(
             nome=nome,
             email=email,
-            senha=bcrypt.generate_password_hash("suap_login_default_123").decode("utf-8"),
+            senha=_senha_padrao_suap(),
             data_nascimento=user_info.get("data_de_nascimento"),
             cpf=user_info.get("cpf"),
             tipo_usuario=user_info.get("tipo_usuario"),
@@ -137,18 +119,11 @@ def callback_suap():
 
         db.session.add(suap_usuario)
         db.session.commit()
+        indice_usuarios.adicionar(suap_usuario)
 
     if current_user.is_authenticated and current_user.id != suap_usuario.id:
-        antigo = current_user
-
-        for comentario in Comentario.query.filter_by(usuario_id=antigo.id).all():
-            comentario.usuario_id = suap_usuario.id
-
-        for curtida in Curtida.query.filter_by(usuario_id=antigo.id).all():
-            curtida.usuario_id = suap_usuario.id
-
-        db.session.commit()
-        db.session.delete(antigo)
+        # a união das contas roda na fila de tarefas (services/contas.py)
+        agendar_mesclagem(current_user.id, suap_usuario.id)
         db.session.commit()
 
     login_user(suap_usuario)
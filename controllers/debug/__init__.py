@@ -0,0 +1,9 @@
+from flask import Blueprint
+
+debug_bp = Blueprint(
+    "debug",
+    __name__,
+    url_prefix="/_debug"
+)
+
+from . import routes
@@ -0,0 +1,32 @@
+#páginas de diagnóstico, só disponíveis com o app em modo debug
+
+from flask import render_template, current_app, abort, jsonify
+
+from extensions import cache
+from services.tarefas import resumo_tarefas
+from services.suap import suap
+from utils.instrumentacao import requisicoes_recentes
+from . import debug_bp
+
+@debug_bp.before_request
+def somente_debug():
+    if not current_app.debug:
+        abort(404)
+
+@debug_bp.route('/requests')
+def requisicoes():
+    return render_template('debug/requisicoes.html', requisicoes=requisicoes_recentes())
+
+@debug_bp.route('/cache')
+def estatisticas_cache():
+    return jsonify(cache.estatisticas())
+
+
+@debug_bp.route('/tarefas')
+def estado_tarefas():
+    return jsonify(resumo_tarefas())
+
+
+@debug_bp.route('/suap')
+def estado_suap():
+    return jsonify(suap.estado())
@@ -1,10 +1,14 @@
 from flask import render_template
+from flask_login import current_user
+from extensions import cache
+from services.curtidas import curtidos_entre
+from services.imagens import precarregar_imagens
 from models import Projeto
 from . import main_bp
 
-@main_bp.route('/')
-def index():
-    projetos_top = Projeto.query.order_by(Projeto.curtidas.desc()).limit(4).all()
+def montar_cards():
+    # "em alta": curtidas e comentários recentes pesam mais (services/tendencias.py)
+    projetos_top = Projeto.query.order_by(Projeto.tendencia.desc(), Projeto.id.desc()).limit(4).all()
     
     cards = []
     for projeto in projetos_top:
@@ -28,8 +32,19 @@ def index():
             { "id": 4, "titulo": "Modus", "descricao": "Criação de roupas sustentáveis usando materiais ecológicos para reduzir o impacto ambiental da moda.", "tag": "vestuario" },
         ]
         cards.extend(cards_padrao[len(cards):4])
-    
-    return render_template('index.html', cards=cards)
+
+    return cards
+
+@main_bp.route('/')
+def index():
+    # invalidado por curtidas e escritas em projetos (tag ranking:top)
+    cards = cache.lembrar('home:cards', montar_cards, ttl=300, tags=('ranking:top',))
+    # os cards são os mesmos para todos; a curtida de quem está logado vem à parte
+    curtidos = set()
+    if current_user.is_authenticated:
+        curtidos = curtidos_entre(current_user.id, [c['id'] for c in cards])
+    precarregar_imagens(c['imagem'] for c in cards if c.get('imagem'))
+    return render_template('index.html', cards=cards, curtidos=curtidos)
 
 @main_bp.route("/sobre")
 def sobre():
@@ -1,17 +1,21 @@
-from flask import request, redirect, url_for, flash, render_template
+from flask import request, redirect, url_for, flash, render_template, current_app
 from flask_login import current_user
 from werkzeug.utils import secure_filename
-import os
-import shutil
 
 from . import projetos_bp
 from extensions import db
 
-from utils.files import criar_pastas_projeto
-from utils.paths import BASE_DIR
 from utils.decorator import suap_required
+from services.busca import indexar_projeto, remover_projeto, COLUNAS as CAMPOS_BUSCA
+from services.projetos import (
+    carregar_projeto_completo, invalidar_cache_projeto, sincronizar_lista, sincronizar_autores, campos_alterados,
+)
+from services.facetas import valores_facetas, atualizar_facetas
+from services.estatisticas import projeto_criado, projeto_excluido, autoria_alterada
+from services.imagens import agendar_variantes
+from services.armazenamento import armazenamento, arquivos_do_projeto, agendar_remocao, sincronizar_arquivos
 
-from models import Projeto, Autor, Objetivo, Metodologia, Link, Comentario, Curtida
+from models import Projeto, Autor, Objetivo, Metodologia, Link, Comentario, Curtida, ArquivoProjeto
 
 @projetos_bp.route('/criarprojeto', methods=['GET','POST'], endpoint='criar_projeto')
 @suap_required
@@ -25,7 +29,8 @@ def gerenciar_projeto(id=None):
     # 1. VERIFICAÇÃO DE PERMISSÃO (GET e POST)
     # ---------------------------------------------------------
     if id:
-        projeto = Projeto.query.get_or_404(id)
+        # o formulário (GET) e a comparação com o que foi enviado (POST) usam todas as coleções
+        projeto = carregar_projeto_completo(id)
         
         # Verifica se é dono
         e_dono = (projeto.usuario_id == current_user.id)
@@ -60,7 +65,12 @@ def gerenciar_projeto(id=None):
             flash('Preencha todos os campos obrigatórios!', 'error')
             return redirect(request.url)
 
+        # arquivos gravados nesta requisição e os que deixaram de ser usados
+        salvos = []
+        substituidos = []
         try:
+            facetas_antes = valores_facetas(projeto) if projeto else None
+
             if not projeto:
                 # CRIANDO NOVO PROJETO
                 projeto = Projeto(
@@ -71,42 +81,37 @@ def gerenciar_projeto(id=None):
                 db.session.flush() # Gera o ID do projeto para usar abaixo
             else:
                 # EDITANDO PROJETO EXISTENTE
+                # (o mesmo valor de antes não gera UPDATE: ver campos_alterados abaixo)
                 projeto.titulo = titulo
                 projeto.subtitulo = subtitulo
                 projeto.descricao = descricao
                 projeto.tipo = tipo
                 projeto.curso = curso
-                
-                # Limpa relações antigas para recriar
-                Objetivo.query.filter_by(projeto_id=projeto.id).delete()
-                Metodologia.query.filter_by(projeto_id=projeto.id).delete()
-                Link.query.filter_by(projeto_id=projeto.id).delete()
-                
-                # --- AQUI ESTAVA O PROBLEMA COMUM ---
-                # Não deletamos os autores ainda. Vamos gerenciar a lista primeiro.
-                Autor.query.filter_by(projeto_id=projeto.id).delete()
 
             # --- UPLOAD DE ARQUIVOS (PDF) ---
+            # gravados pelo hash do conteúdo (services/armazenamento.py): o título não entra no caminho
             arquivo = request.files.get('arquivo')
             if arquivo and arquivo.filename:
-                _, _, pasta_pdfs, nome_pasta = criar_pastas_projeto(titulo)
-                nome_pdf = secure_filename(arquivo.filename)
-                caminho_pdf = os.path.join(pasta_pdfs, nome_pdf)
-                arquivo.save(caminho_pdf)
-                projeto.arquivo = f"uploads/projetos/{nome_pasta}/pdfs/{nome_pdf}"
+                chave = armazenamento.salvar_documento(arquivo)
+                if projeto.arquivo and projeto.arquivo != chave:
+                    substituidos.append(projeto.arquivo)
+                projeto.arquivo = chave
+                projeto.arquivo_nome = secure_filename(arquivo.filename)
+                salvos.append(chave)
             
             # --- UPLOAD DE IMAGENS ---
             imagens = request.files.getlist('imagens[]')
             lista_imagens = [img for img in (projeto.estrutura.split(',') if projeto and projeto.estrutura else []) if img.strip()]
             novas_imagens = [img for img in imagens if img and img.filename]
+            caminhos_novos = []
             
-            if novas_imagens:
-                _, pasta_imagens, _, nome_pasta = criar_pastas_projeto(titulo)
-                for img in novas_imagens:
-                    nome_img = secure_filename(img.filename)
-                    caminho_img = os.path.join(pasta_imagens, nome_img)
-                    img.save(caminho_img)
-                    lista_imagens.append(f"uploads/projetos/{nome_pasta}/imagens/{nome_img}")
+            for img in novas_imagens:
+                chave = armazenamento.salvar_imagem(img)
+                salvos.append(chave)
+                # a mesma imagem enviada de novo não é repetida
+                if chave not in lista_imagens:
+                    lista_imagens.append(chave)
+                    caminhos_novos.append(chave)
             
             if lista_imagens:
                 projeto.estrutura = ",".join(lista_imagens)
@@ -127,26 +132,53 @@ def gerenciar_projeto(id=None):
             if projeto and (projeto.usuario_id != current_user.id):
                 novos_autores_ids.add(current_user.id)
 
-            # Re-adiciona os autores no banco
-            for usuario_id in novos_autores_ids:
-                # Nunca adicione o dono na tabela de autores (redundância)
-                if usuario_id != projeto.usuario_id:
-                    db.session.add(Autor(usuario_id=usuario_id, projeto_id=projeto.id))
+            # Nunca adicione o dono na tabela de autores (redundância)
+            novos_autores_ids.discard(projeto.usuario_id)
 
             # --- DEMAIS CAMPOS (Objetivos, Metodologias, Links) ---
-            for obj in request.form.getlist('objetivos[]'):
-                if obj.strip(): db.session.add(Objetivo(descricao=obj, projeto_id=projeto.id))
+            # só o que mudou vira INSERT/UPDATE/DELETE; as linhas iguais mantêm o id
+            objetivos = [obj for obj in request.form.getlist('objetivos[]') if obj.strip()]
+            metodologias = [met for met in request.form.getlist('metodologias[]') if met.strip()]
+            # link principal primeiro, depois os extras
+            links = [link for link in request.form.getlist('links_principais[]') + request.form.getlist('links[]')
+                     if link.strip()]
+
+            adicionados, removidos = sincronizar_autores(projeto, novos_autores_ids)
+            autores_mudaram = bool(adicionados or removidos)
+            listas_mudaram = any([
+                sincronizar_lista(projeto.objetivos, objetivos, 'descricao', Objetivo),
+                sincronizar_lista(projeto.metodologias, metodologias, 'descricao', Metodologia),
+                sincronizar_lista(projeto.links, links, 'url', Link),
+            ])
+            alterados = campos_alterados(projeto)
 
-            for met in request.form.getlist('metodologias[]'):
-                if met.strip(): db.session.add(Metodologia(descricao=met, projeto_id=projeto.id))
+            if is_edit and not (alterados or autores_mudaram or listas_mudaram):
+                # nada mudou: nenhuma escrita, a versão (ETag) e os caches continuam valendo
+                db.session.rollback()
+                flash('Projeto atualizado!', 'success')
+                return redirect(url_for('projetos.ver_projeto', id=id))
 
-            for link in request.form.getlist('links_principais[]'):
-                if link.strip(): db.session.add(Link(url=link, projeto_id=projeto.id)) # add tipo='principal' se houver
+            if is_edit:
+                # incremento no SQL: não perde as versões geradas por curtidas simultâneas
+                projeto.versao = Projeto.versao + 1
+                autoria_alterada(projeto, adicionados, removidos)
+            else:
+                projeto_criado(projeto, adicionados)
 
-            for link in request.form.getlist('links[]'):
-                if link.strip(): db.session.add(Link(url=link, projeto_id=projeto.id)) # add tipo='extra' se houver
+            # Atualiza o índice de busca e as facetas na mesma transação (se o que eles usam mudou)
+            db.session.flush()
+            if not is_edit or autores_mudaram or alterados & set(CAMPOS_BUSCA):
+                indexar_projeto(projeto)
+            atualizar_facetas(facetas_antes, valores_facetas(projeto))
+
+            # trabalho de disco vai para a fila, gravado junto com o projeto:
+            # miniaturas/WebP/AVIF das imagens novas e o PDF substituído (se ninguém mais usa)
+            sincronizar_arquivos(projeto)
+            agendar_variantes(caminhos_novos)
+            agendar_remocao(substituidos)
 
             db.session.commit()
+            invalidar_cache_projeto(projeto.id)
             
             msg = 'Projeto atualizado!' if is_edit else 'Projeto cadastrado!'
             flash(msg, 'success')
@@ -156,6 +188,14 @@ def gerenciar_projeto(id=None):
 
         except Exception as e:
             db.session.rollback()
+            # uploads desta tentativa que nenhum projeto usa; se o banco está com problema (o
+            # erro original pode ser ele), ficam no disco e o usuário ainda recebe a mensagem
+            try:
+                agendar_remocao(salvos)
+                db.session.commit()
+            except Exception as erro_remocao:
+                db.session.rollback()
+                current_app.logger.error("Não foi possível agendar a remoção dos uploads %s: %s", salvos, erro_remocao)
             # O print ajuda a ver o erro no terminal do Flask
             print(f"ERRO AO SALVAR PROJETO: {e}") 
             flash(f'Erro ao salvar: {str(e)}', 'error')
@@ -180,7 +220,7 @@ def gerenciar_projeto(id=None):
         'descricao': projeto.descricao if projeto else '',
         'tipo': projeto.tipo if projeto else '',
         'curso': projeto.curso if projeto else '',
-        'arquivo_nome': projeto.arquivo if projeto else '',
+        'arquivo_nome': (projeto.arquivo_nome or projeto.arquivo) if projeto else '',
         'imagens': (projeto.estrutura.split(',') if projeto and projeto.estrutura else []) + [''] * 4,
         'autores': projeto.autores if projeto and projeto.autores else [],
         'objetivos': projeto.objetivos if projeto and projeto.objetivos else [Objetivo(descricao='')]*3,
@@ -211,13 +251,9 @@ def excluir_projeto(id):
         return redirect(url_for('usuarios.meus_projetos'))
 
     try:
-        try:
-            nome_pasta = secure_filename(projeto.titulo.lower().replace(" ", "-"))
-            pasta_projeto = os.path.join(BASE_DIR, "static", "uploads", "projetos", nome_pasta)
-            if os.path.exists(pasta_projeto):
-                shutil.rmtree(pasta_projeto)
-        except Exception as fs_err:
-            flash(f"Aviso: falha ao remover arquivos do projeto: {fs_err}", 'error')
+        arquivos = arquivos_do_projeto(projeto)
+        coautores = [uid for (uid,) in db.session.query(Autor.usuario_id).filter_by(projeto_id=id)]
+        projeto_excluido(projeto, coautores)
 
         Autor.query.filter_by(projeto_id=id).delete()
         Objetivo.query.filter_by(projeto_id=id).delete()
@@ -225,9 +261,15 @@ def excluir_projeto(id):
         Link.query.filter_by(projeto_id=id).delete()
         Comentario.query.filter_by(projeto_id=id).delete()
         Curtida.query.filter_by(projeto_id=id).delete()
+        ArquivoProjeto.query.filter_by(projeto_id=id).delete()
+        remover_projeto(id)
+        atualizar_facetas(valores_facetas(projeto), None)
+        # os arquivos são apagados pela fila depois do commit (os que outro projeto usa ficam)
+        agendar_remocao(arquivos)
         
         db.session.delete(projeto)
         db.session.commit()
+        invalidar_cache_projeto(id)
         
         flash('Projeto excluído com sucesso!', 'success')
         return redirect(url_for('usuarios.meus_projetos'))
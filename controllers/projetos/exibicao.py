@@ -1,84 +1,99 @@
 #ver todos os projetos e exibir um projeto específico
 
-from flask import render_template, request, url_for
-from flask_login import current_user
 from datetime import datetime
 
-from utils.paths import BASE_DIR
+from flask import render_template, request, abort, jsonify
+from flask_login import current_user
+
 from extensions import db
 from models import Projeto
 from . import projetos_bp
-import os
 
-from models import Comentario, Curtida, Autor
+from services.busca import subconsulta, normalizar
+from services.curtidas import curtidos_entre
+from services.facetas import listar_facetas
+from services.listagem import contar_projetos, ler_cursor, gerar_cursor, pagina_por_cursor
+from services.tendencias import filtro_semestre, semestre_de
+from services.projetos import carregar_projeto_completo
+from services.comentarios import pagina_comentarios, serializar, ler_cursor as ler_cursor_comentario
+from services.imagens import precarregar_imagens
+from utils.consultas import orcamento_consultas
+from utils.estaticos import estatico_existe
+from utils.condicional import gerar_etag, nao_modificado, com_validadores
 
 @projetos_bp.route('/projeto/<int:id>')
+@orcamento_consultas(10)
 def ver_projeto(id):
-    
-    projeto = Projeto.query.get_or_404(id)
-    comentarios = Comentario.query.filter_by(projeto_id=id).order_by(Comentario.criado_em.desc()).all()
-    
-    liked = False
-    if current_user.is_authenticated:
-        liked = Curtida.query.filter_by(usuario_id=current_user.id, projeto_id=id).first() is not None
 
-    static_path = os.path.join(BASE_DIR, 'static', 'img', 'interacoes', 'curtidas')
-    heart_liked_exists = os.path.exists(os.path.join(static_path, 'heartliked.png'))
-    heart_exists = os.path.exists(os.path.join(static_path, 'heart.png'))
-    heart_hover_exists = os.path.exists(os.path.join(static_path, 'hearthover.png'))
+    # validadores baratos primeiro: versão do projeto (muda a cada comentário, curtida ou edição)
+    estado = db.session.query(Projeto.versao, Projeto.atualizado_em).filter(Projeto.id == id).first()
+    if estado is None:
+        abort(404)
+    versao, atualizado_em = estado
+
+    usuario_id = current_user.id if current_user.is_authenticated else None
+    liked = id in curtidos_entre(usuario_id, [id])
+
+    etag = gerar_etag('projeto', id, versao, usuario_id, liked)
+    resposta = nao_modificado(etag, atualizado_em)
+    if resposta is not None:
+        return resposta
+
+    projeto = carregar_projeto_completo(id)
+    # só o primeiro lote; o resto vem de comentarios_projeto quando o usuário rola a página
+    comentarios, proximo_comentarios = pagina_comentarios(id)
+
+    # existência dos ícones vem do manifesto de static/ (sem acessar o disco)
+    heart_liked_exists = estatico_existe('img/interacoes/curtidas/heartliked.png')
+    heart_exists = estatico_existe('img/interacoes/curtidas/heart.png')
+    heart_hover_exists = estatico_existe('img/interacoes/curtidas/hearthover.png')
     imagens = []
     if getattr(projeto, 'estrutura', None):
-        imagens = [p for p in projeto.estrutura.split(',') if p]
-
-    imagens_urls = []
-    for img in imagens:
-        try:
-            imagens_urls.append(url_for('static', filename=img))
-        except Exception:
-            continue
-
-    comentarios_relativos = {}
-    now = datetime.utcnow()
-    for c in comentarios:
-        if getattr(c, 'criado_em', None):
-            diff = now - c.criado_em
-            diff_seconds = int(diff.total_seconds())
-            if diff_seconds < 60:
-                rel = 'agora'
-            elif diff_seconds < 3600:
-                mins = diff_seconds // 60
-                rel = f"há {mins} minuto{'s' if mins > 1 else ''}"
-            elif diff_seconds < 86400:
-                hrs = diff_seconds // 3600
-                rel = f"há {hrs} hora{'s' if hrs > 1 else ''}"
-            elif diff_seconds < 604800:
-                days = diff_seconds // 86400
-                rel = f"há {days} dia{'s' if days > 1 else ''}"
-            else:
-                rel = c.criado_em.strftime('%d/%m/%Y %H:%M')
-        else:
-            rel = 'data indisponível'
-        comentarios_relativos[c.id] = rel
-
-    return render_template(
+        imagens = [p.strip() for p in projeto.estrutura.split(',') if p.strip()]
+    # variantes (srcset/placeholder) de todas as imagens numa consulta só
+    precarregar_imagens(imagens)
+
+    return com_validadores(render_template(
         'projetos/listar_projeto.html', 
         projeto=projeto, 
-        comentarios=comentarios, 
-        comentarios_relativos=comentarios_relativos,
+        comentarios=[serializar(c) for c in comentarios],
+        proximo_comentarios=proximo_comentarios,
         liked=liked,
         heart_liked_exists=heart_liked_exists,
         heart_exists=heart_exists,
         heart_hover_exists=heart_hover_exists,
-        imagens=imagens_urls
-    )
+        imagens=imagens
+    ), etag, atualizado_em)
+
+
+@projetos_bp.route('/projeto/<int:id>/comentarios')
+@orcamento_consultas(2)
+def comentarios_projeto(id):
+    # próximo lote de comentários em JSON: ?apos=<cursor> (o "proximo" do lote anterior)
+    versao = db.session.query(Projeto.versao).filter(Projeto.id == id).scalar()
+    if versao is None:
+        abort(404)
+
+    cursor = request.args.get('apos', '')
+    etag = gerar_etag('comentarios', id, versao, cursor)
+    resposta = nao_modificado(etag)
+    if resposta is not None:
+        return resposta
+
+    comentarios, proximo = pagina_comentarios(id, apos=ler_cursor_comentario(cursor))
+    return com_validadores(jsonify({
+        'comentarios': [serializar(c) for c in comentarios],
+        'proximo': proximo,
+    }), etag)
 
 
 @projetos_bp.route('/projetos')
+@orcamento_consultas(5)
 def projetos():
     curso_filtro = request.args.get('curso', '').strip()
     tipo_filtro = request.args.get('tipo', '').strip()
-    ordenacao = request.args.get('ordenacao', 'curtidas').strip()
     q = request.args.get('q', '').strip()
+    ordenacao = request.args.get('ordenacao', '').strip() or ('relevancia' if q else 'tendencia')
     pagina = request.args.get('pagina', 1, type=int)
 
     query = Projeto.query
@@ -89,51 +104,95 @@ def projetos():
     if tipo_filtro and tipo_filtro != 'todos':
         query = query.filter_by(tipo=tipo_filtro)
 
-    if q:
-        like_q = f"%{q}%"
-        query = query.outerjoin(Autor).filter(
-            db.or_(
-                Projeto.titulo.ilike(like_q),
-                Projeto.descricao.ilike(like_q),
-                Autor.nome.ilike(like_q)
-            )
-        ).distinct()
-
-    if ordenacao == 'curtidas':
+    busca = subconsulta(q) if q else None
+    if busca is not None:
+        query = query.join(busca, busca.c.projeto_id == Projeto.id)
+    elif ordenacao == 'relevancia':
+        ordenacao = 'tendencia'
+
+    # "top do semestre" só lista os projetos curtidos no semestre (a contagem muda junto)
+    chave_contagem = (curso_filtro, tipo_filtro, normalizar(q))
+    if ordenacao == 'semestre':
+        agora = datetime.utcnow()
+        query = query.filter(filtro_semestre(agora))
+        chave_contagem += (f'semestre:{semestre_de(agora)}',)
+
+    if ordenacao == 'relevancia':
+        query = query.order_by(busca.c.rank, Projeto.tendencia.desc(), Projeto.id.desc())
+    elif ordenacao == 'curtidas':
         query = query.order_by(Projeto.curtidas.desc(), Projeto.id.desc())
+    elif ordenacao == 'tendencia':
+        query = query.order_by(Projeto.tendencia.desc(), Projeto.id.desc())
+    elif ordenacao == 'semestre':
+        query = query.order_by(Projeto.curtidas_semestre.desc(), Projeto.id.desc())
     else:
         query = query.order_by(Projeto.id.desc())
 
-    total_projetos = query.count()
     projetos_por_pagina = 12
+    total_projetos = contar_projetos(query, chave_contagem)
     total_paginas = (total_projetos + projetos_por_pagina - 1) // projetos_por_pagina
 
-    pagina = max(1, min(pagina, max(1, total_paginas)))
-    offset = (pagina - 1) * projetos_por_pagina
-    
-    projetos_lista = query.offset(offset).limit(projetos_por_pagina).all()
+    # links antigos (?pagina=N) e busca por relevância continuam com OFFSET;
+    # a navegação normal usa cursor (?apos=... / ?antes=... / ?fim=1)
+    apos = ler_cursor(request.args.get('apos'), ordenacao)
+    antes = ler_cursor(request.args.get('antes'), ordenacao)
+    fim = request.args.get('fim') == '1'
+    usa_offset = ordenacao == 'relevancia' or ('pagina' in request.args and not (apos or antes or fim))
 
+    pagina = max(1, min(pagina, max(1, total_paginas)))
+    if usa_offset:
+        offset = (pagina - 1) * projetos_por_pagina
+        projetos_lista = query.offset(offset).limit(projetos_por_pagina + 1).all()
+        tem_proxima = len(projetos_lista) > projetos_por_pagina
+        projetos_lista = projetos_lista[:projetos_por_pagina]
+        cursor_anterior = None
+        cursor_proxima = gerar_cursor(projetos_lista[-1], ordenacao) if tem_proxima and ordenacao != 'relevancia' else None
+    else:
+        ultima = None
+        if fim:
+            pagina = max(1, total_paginas)
+            ultima = total_projetos - (pagina - 1) * projetos_por_pagina or projetos_por_pagina
+        projetos_lista, cursor_anterior, cursor_proxima = pagina_por_cursor(
+            query, ordenacao, apos=apos, antes=antes, por_pagina=projetos_por_pagina, ultima=ultima
+        )
+
+    # só os projetos desta página (não todas as curtidas do usuário)
     usuario_curtidas = set()
     if current_user.is_authenticated:
-        curtidas = Curtida.query.filter_by(usuario_id=current_user.id).all()
-        usuario_curtidas = set(c.projeto_id for c in curtidas)
+        usuario_curtidas = curtidos_entre(current_user.id, [p.id for p in projetos_lista])
     
     for projeto in projetos_lista:
         projeto.user_liked = projeto.id in usuario_curtidas
+
+    facetas = listar_facetas()
+
+    # a página muda se algum projeto dela mudar (versão), se as curtidas do usuário nela
+    # mudarem ou se as contagens/navegação mudarem; tudo isso já está em memória aqui
+    etag = gerar_etag(
+        'projetos', current_user.get_id(),
+        [(p.id, p.versao, p.user_liked) for p in projetos_lista],
+        total_projetos, pagina, cursor_anterior, cursor_proxima, facetas,
+    )
+    modificado_em = max((p.atualizado_em for p in projetos_lista if p.atualizado_em), default=None)
+    resposta = nao_modificado(etag, modificado_em)
+    if resposta is not None:
+        return resposta
+
+    precarregar_imagens(p.estrutura.split(',')[0] for p in projetos_lista if p.estrutura)
     
-    cursos = [p.curso for p in Projeto.query.distinct(Projeto.curso).all() if p.curso]
-    tipos = [p.tipo for p in Projeto.query.distinct(Projeto.tipo).all() if p.tipo]
-    
-    return render_template(
+    return com_validadores(render_template(
         'projetos/projetos.html',
         projetos=projetos_lista,
-        cursos=cursos,
-        tipos=tipos,
+        cursos=facetas['curso'],
+        tipos=facetas['tipo'],
         curso_filtro=curso_filtro,
         tipo_filtro=tipo_filtro,
         ordenacao=ordenacao,
         q=q,
         pagina=pagina,
         total_paginas=total_paginas,
+        usa_offset=usa_offset,
+        cursor_anterior=cursor_anterior,
+        cursor_proxima=cursor_proxima,
         total_projetos=total_projetos
-    )
\ No newline at end of file
+    ), etag, modificado_em)
\ No newline at end of file
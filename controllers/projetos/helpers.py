@@ -5,7 +5,7 @@ from . import projetos_bp
 
 from utils.decorator import suap_required
 
-from models import Usuario
+from services.indice_usuarios import indice_usuarios
 
 @projetos_bp.route("/livesearch/usuarios")
 @suap_required
@@ -15,14 +15,8 @@ def livesearch_usuarios():
     if len(q) < 1:
         return jsonify([])
 
-    usuarios = Usuario.query.filter(
-        Usuario.nome.ilike(f"%{q}%")
-    ).limit(8).all()
-
-    return jsonify([
-        {
-            "id": u.id,
-            "nome": u.nome,
-            "matricula": u.matricula
-        } for u in usuarios
-    ])
\ No newline at end of file
+    resposta = jsonify(indice_usuarios.buscar(q, limite=8))
+    # cada tecla vira uma requisição: prefixos repetidos saem do cache do navegador
+    resposta.headers["Cache-Control"] = "private, max-age=60"
+    resposta.headers["Vary"] = "Cookie"
+    return resposta
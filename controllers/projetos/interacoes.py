@@ -1,10 +1,15 @@
 #interações com projetos: comentários e curtidas
-from flask import jsonify, request, flash, redirect, url_for
+from datetime import datetime
+
+from flask import jsonify, request, flash, redirect, url_for, abort
 from flask_login import login_required, current_user
 from . import projetos_bp
 
-from extensions import db
-from models import Projeto, Comentario, Curtida
+from extensions import db, cache
+from models import Projeto, Comentario
+from services.curtidas import definir_curtida
+from services.projetos import tocar_projeto
+from services.estatisticas import comentario_adicionado
 
 @projetos_bp.route('/projeto/<int:id>/comentario', methods=['POST'])
 @login_required
@@ -17,10 +22,15 @@ def adicionar_comentario(id):
         flash('Comentário vazio. Escreva algo antes de enviar.', 'error')
         return redirect(url_for('projetos.ver_projeto', id=id))
 
-    comentario = Comentario(conteudo=conteudo.strip(), usuario_id=current_user.id, projeto_id=projeto.id)
+    comentario = Comentario(conteudo=conteudo.strip(), usuario_id=current_user.id, projeto_id=projeto.id,
+                            criado_em=datetime.utcnow())
     try:
         db.session.add(comentario)
+        tocar_projeto(projeto.id)
+        comentario_adicionado(projeto.id, comentario.criado_em)
         db.session.commit()
+        # o comentário soma em "em alta", que ordena os cards da página inicial
+        cache.invalidar(f'projeto:{id}', 'ranking:top')
         flash('Comentário adicionado com sucesso!', 'success')
     except Exception as e:
         db.session.rollback()
@@ -33,21 +43,17 @@ def adicionar_comentario(id):
 @login_required
 def curtir_projeto(id):
     
-    projeto = Projeto.query.get_or_404(id)
-    curtida = Curtida.query.filter_by(usuario_id=current_user.id, projeto_id=id).first()
-    
+    if not db.session.query(Projeto.query.filter_by(id=id).exists()).scalar():
+        abort(404)
+
+    # "1"/"0" define o estado desejado (cliques repetidos não desfazem); sem o campo, alterna
+    desejado = request.form.get('curtir')
+    curtir = None if desejado not in ('0', '1') else desejado == '1'
+
     try:
-        if curtida:
-            db.session.delete(curtida)
-            projeto.curtidas = max((projeto.curtidas or 0) - 1, 0)
-            db.session.commit()
-            return jsonify({'liked': False, 'curtidas': projeto.curtidas}), 200
-        else:
-            nova_curtida = Curtida(usuario_id=current_user.id, projeto_id=id)
-            projeto.curtidas = (projeto.curtidas or 0) + 1
-            db.session.add(nova_curtida)
-            db.session.commit()
-            return jsonify({'liked': True, 'curtidas': projeto.curtidas}), 200
+        liked, curtidas = definir_curtida(current_user.id, id, curtir)
+        cache.invalidar(f'projeto:{id}', 'ranking:top')
+        return jsonify({'liked': liked, 'curtidas': curtidas}), 200
             
     except Exception as e:
         db.session.rollback()
@@ -2,36 +2,65 @@ from flask import render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
 from sqlalchemy import or_
 
-from extensions import db
-from models import Projeto, Curtida, Usuario, Autor
+from extensions import db, cache
+from models import Projeto, Usuario, Autor
+from services.curtidas import filtro_curtidos
+from services.estatisticas import estatisticas_usuario
+from services.imagens import precarregar_imagens
+from services.sessao import sessoes
+from utils.condicional import gerar_etag, nao_modificado, com_validadores
 
 from . import usuarios_bp
 
+# campos mostrados em usuario/perfil.html
+CAMPOS_PERFIL = ('id', 'nome', 'email', 'matricula', 'data_nascimento', 'tipo_usuario', 'campus', 'foto')
+
+def dados_perfil(id):
+    usuario = Usuario.query.get(id)
+    if not usuario:
+        return None
+    return {campo: getattr(usuario, campo) for campo in CAMPOS_PERFIL}
+
 @usuarios_bp.route("/projetoscurtidos")
 @login_required
 def projetos_curtidos():
-    projetos = Projeto.query.join(Curtida, Curtida.projeto_id == Projeto.id).filter(Curtida.usuario_id == current_user.id).all()
-    return render_template("usuario/projetos_curtidos.html", projetos=projetos)
+    # validador: só id/versão dos projetos curtidos; a lista completa só se mudou algo
+    curtidos = filtro_curtidos(current_user.id)
+    versoes = db.session.query(Projeto.id, Projeto.versao, Projeto.atualizado_em).filter(curtidos).all()
+    etag = gerar_etag('curtidos', current_user.id, [(id, versao) for id, versao, _ in versoes])
+    modificado_em = max((a for _, _, a in versoes if a), default=None)
+    resposta = nao_modificado(etag, modificado_em)
+    if resposta is not None:
+        return resposta
+
+    projetos = Projeto.query.filter(curtidos).all()
+    precarregar_imagens(p.estrutura.split(',')[0] for p in projetos if p.estrutura)
+    return com_validadores(render_template("usuario/projetos_curtidos.html", projetos=projetos), etag, modificado_em)
 
 @usuarios_bp.route('/meus_projetos')
 @login_required
 def meus_projetos():
 
+    # sem JOIN + DISTINCT: dono pelo índice de projetos.usuario_id, coautoria por autor.usuario_id
+    coautoria = db.select(Autor.projeto_id).where(Autor.usuario_id == current_user.id)
     projetos = Projeto.query\
-        .outerjoin(Autor, Projeto.id == Autor.projeto_id)\
         .filter(
             or_(
                 Projeto.usuario_id == current_user.id,  # é o dono
-                Autor.usuario_id == current_user.id     # é coautor
+                Projeto.id.in_(coautoria)               # é coautor
             )
-        ).distinct().all()
-    return render_template('usuario/meus_projetos.html', projetos=projetos)
+        ).order_by(Projeto.id.desc()).all()
+    # painel: totais guardados na linha do usuário e contadores de cada projeto
+    return render_template('usuario/meus_projetos.html', projetos=projetos,
+                           estatisticas=estatisticas_usuario(current_user.id))
 
 @usuarios_bp.route('/meu_perfil')
 @login_required
 def meu_perfil():
-    
-    return render_template('usuario/perfil.html', perfil=current_user)
+    # current_user só tem os campos da sessão; o perfil completo vem do mesmo cache de ver_perfil
+    perfil = cache.lembrar(f'usuario:{current_user.id}:perfil', lambda: dados_perfil(current_user.id),
+                           tags=(f'usuario:{current_user.id}',))
+    return render_template('usuario/perfil.html', perfil=perfil, estatisticas=estatisticas_usuario(current_user.id))
 
 @usuarios_bp.route("/alterar_foto", methods=["POST"])
 @login_required
@@ -45,8 +74,12 @@ def alterar_foto():
     caminho = f"static/uploads/users/{current_user.id}.jpg"
     foto.save(caminho)
 
-    current_user.foto = "/" + caminho
+    db.session.execute(
+        db.update(Usuario).where(Usuario.id == current_user.id).values(foto="/" + caminho)
+    )
     db.session.commit()
+    cache.invalidar(f'usuario:{current_user.id}')
+    sessoes.esquecer(current_user.id)
 
     flash("Foto atualizada com sucesso!", "success")
     return redirect(url_for("usuarios.meu_perfil"))
@@ -55,9 +88,10 @@ def alterar_foto():
 @login_required
 def ver_perfil(id):
     
-    perfil = Usuario.query.get(id)
+    perfil = cache.lembrar(f'usuario:{id}:perfil', lambda: dados_perfil(id), tags=(f'usuario:{id}',))
     if perfil:
-        return render_template("usuario/perfil.html", perfil=perfil)
+        # contadores fora do cache do perfil: mudam a cada curtida/comentário
+        return render_template("usuario/perfil.html", perfil=perfil, estatisticas=estatisticas_usuario(id))
     else:
         flash('Usuário não encontrado', 'error')
-        return redirect (url_for('index'))
\ No newline at end of file
+        return redirect (url_for('main.index'))
\ No newline at end of file
@@ -2,6 +2,9 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_bcrypt import Bcrypt
 
+from cache import Cache
+
 db = SQLAlchemy()
 login_manager = LoginManager()
-bcrypt = Bcrypt()
\ No newline at end of file
+bcrypt = Bcrypt()
+cache = Cache()
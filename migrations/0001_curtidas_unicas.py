@@ -0,0 +1,12 @@
+#curtidas duplicadas (mesmo usuário e projeto) e o índice único que as impede
+
+
+def upgrade(conn):
+    # mantém a curtida mais antiga de cada par
+    conn.exec_driver_sql(
+        "DELETE FROM curtidas WHERE id NOT IN "
+        "(SELECT MIN(id) FROM curtidas GROUP BY usuario_id, projeto_id)"
+    )
+    conn.exec_driver_sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_curtidas_usuario_projeto ON curtidas (usuario_id, projeto_id)"
+    )
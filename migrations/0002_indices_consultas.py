@@ -0,0 +1,25 @@
+#índices das consultas mais frequentes (curtidas, comentários, autoria, listagem)
+
+INDICES = [
+    # comentários de um projeto em ordem de criação
+    "CREATE INDEX IF NOT EXISTS ix_comentarios_projeto_criado_em ON comentarios (projeto_id, criado_em)",
+    # verificação de coautoria e "meus projetos"
+    "CREATE INDEX IF NOT EXISTS ix_autor_projeto_usuario ON autor (projeto_id, usuario_id)",
+    "CREATE INDEX IF NOT EXISTS ix_autor_usuario ON autor (usuario_id)",
+    # listagem: mais curtidos (com cursor) e filtros de curso/tipo
+    "CREATE INDEX IF NOT EXISTS ix_projetos_curtidas_id ON projetos (curtidas, id)",
+    "CREATE INDEX IF NOT EXISTS ix_projetos_curso_tipo ON projetos (curso, tipo)",
+    "CREATE INDEX IF NOT EXISTS ix_projetos_usuario ON projetos (usuario_id)",
+    # curtidas/comentários por projeto (exclusão, recontagem) e por usuário
+    "CREATE INDEX IF NOT EXISTS ix_curtidas_projeto ON curtidas (projeto_id)",
+    "CREATE INDEX IF NOT EXISTS ix_comentarios_usuario ON comentarios (usuario_id)",
+    # coleções carregadas com selectin na página do projeto
+    "CREATE INDEX IF NOT EXISTS ix_objetivos_projeto ON objetivos (projeto_id)",
+    "CREATE INDEX IF NOT EXISTS ix_metodologias_projeto ON metodologias (projeto_id)",
+    "CREATE INDEX IF NOT EXISTS ix_links_projeto ON links (projeto_id)",
+]
+
+
+def upgrade(conn):
+    for comando in INDICES:
+        conn.exec_driver_sql(comando)
@@ -0,0 +1,9 @@
+#nome original do arquivo do projeto (projetos.arquivo passa a guardar o caminho pelo hash)
+
+from sqlalchemy import inspect
+
+
+def upgrade(conn):
+    colunas = {c["name"] for c in inspect(conn).get_columns("projetos")}
+    if "arquivo_nome" not in colunas:
+        conn.exec_driver_sql("ALTER TABLE projetos ADD COLUMN arquivo_nome TEXT")
@@ -0,0 +1,11 @@
+#versão e data de modificação dos projetos (validadores do GET condicional)
+
+from sqlalchemy import inspect
+
+
+def upgrade(conn):
+    colunas = {c["name"] for c in inspect(conn).get_columns("projetos")}
+    if "versao" not in colunas:
+        conn.exec_driver_sql("ALTER TABLE projetos ADD COLUMN versao INTEGER NOT NULL DEFAULT 1")
+    if "atualizado_em" not in colunas:
+        conn.exec_driver_sql("ALTER TABLE projetos ADD COLUMN atualizado_em TIMESTAMP")
@@ -0,0 +1,35 @@
+#contadores de engajamento: comentários por projeto e totais por usuário (services/estatisticas.py)
+#as colunas novas já nascem com os valores calculados a partir das tabelas
+
+from sqlalchemy import inspect
+
+COLUNAS = {
+    "projetos": ["total_comentarios"],
+    "usuarios": ["projetos_proprios", "projetos_coautor", "curtidas_recebidas", "comentarios_recebidos"],
+}
+
+PREENCHER = [
+    "UPDATE projetos SET total_comentarios = "
+    "(SELECT COUNT(*) FROM comentarios WHERE comentarios.projeto_id = projetos.id)",
+    "UPDATE usuarios SET "
+    "projetos_proprios = (SELECT COUNT(*) FROM projetos WHERE projetos.usuario_id = usuarios.id), "
+    "projetos_coautor = (SELECT COUNT(DISTINCT projeto_id) FROM autor WHERE autor.usuario_id = usuarios.id), "
+    "curtidas_recebidas = "
+    "(SELECT COALESCE(SUM(COALESCE(curtidas, 0)), 0) FROM projetos WHERE projetos.usuario_id = usuarios.id) + "
+    "(SELECT COALESCE(SUM(COALESCE(p.curtidas, 0)), 0) FROM autor a JOIN projetos p ON p.id = a.projeto_id "
+    "WHERE a.usuario_id = usuarios.id), "
+    "comentarios_recebidos = "
+    "(SELECT COALESCE(SUM(total_comentarios), 0) FROM projetos WHERE projetos.usuario_id = usuarios.id) + "
+    "(SELECT COALESCE(SUM(p.total_comentarios), 0) FROM autor a JOIN projetos p ON p.id = a.projeto_id "
+    "WHERE a.usuario_id = usuarios.id)",
+]
+
+
+def upgrade(conn):
+    for tabela, colunas in COLUNAS.items():
+        existentes = {c["name"] for c in inspect(conn).get_columns(tabela)}
+        for coluna in colunas:
+            if coluna not in existentes:
+                conn.exec_driver_sql(f"ALTER TABLE {tabela} ADD COLUMN {coluna} INTEGER NOT NULL DEFAULT 0")
+    for comando in PREENCHER:
+        conn.exec_driver_sql(comando)
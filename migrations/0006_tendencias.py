@@ -0,0 +1,44 @@
+#"em alta" e "top do semestre" (services/tendencias.py): data das curtidas, colunas em projetos e
+#os índices das duas ordenações
+#
+#as curtidas já gravadas não têm data: recebem o último instante do semestre anterior (todas com
+#o mesmo peso, então "em alta" começa na ordem de mais curtidos e não conta nada em "top do
+#semestre"), e tendencia já sai calculada com elas e com os comentários existentes
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect, text
+
+from services.tendencias import recalcular_tendencias
+
+COLUNAS = {
+    "curtidas": {"criado_em": "TIMESTAMP"},
+    "projetos": {
+        "tendencia": "FLOAT NOT NULL DEFAULT 0",
+        "curtidas_semestre": "INTEGER NOT NULL DEFAULT 0",
+        "semestre": "INTEGER NOT NULL DEFAULT 0",
+    },
+}
+
+INDICES = [
+    "CREATE INDEX IF NOT EXISTS ix_projetos_tendencia_id ON projetos (tendencia, id)",
+    "CREATE INDEX IF NOT EXISTS ix_projetos_semestre_curtidas_id ON projetos (semestre, curtidas_semestre, id)",
+]
+
+
+def data_legado(agora=None):
+    agora = agora or datetime.utcnow()
+    inicio_semestre = datetime(agora.year, 1 if agora.month <= 6 else 7, 1)
+    return inicio_semestre - timedelta(seconds=1)
+
+
+def upgrade(conn):
+    for tabela, colunas in COLUNAS.items():
+        existentes = {c["name"] for c in inspect(conn).get_columns(tabela)}
+        for coluna, tipo in colunas.items():
+            if coluna not in existentes:
+                conn.exec_driver_sql(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {tipo}")
+    for comando in INDICES:
+        conn.exec_driver_sql(comando)
+    conn.execute(text("UPDATE curtidas SET criado_em = :data WHERE criado_em IS NULL"), {"data": data_legado()})
+    recalcular_tendencias(conn)
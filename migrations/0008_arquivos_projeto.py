@@ -0,0 +1,17 @@
+#arquivos_projeto (quais projetos usam cada upload, ver services/armazenamento.py): a tabela vem do
+#db.create_all(); aqui ela é preenchida a partir de projetos.arquivo e projetos.estrutura
+
+from sqlalchemy import text
+
+
+def upgrade(conn):
+    if conn.exec_driver_sql("SELECT 1 FROM arquivos_projeto LIMIT 1").first():
+        return
+    linhas = []
+    for projeto_id, arquivo, estrutura in conn.exec_driver_sql("SELECT id, arquivo, estrutura FROM projetos"):
+        chaves = {c.strip() for c in (estrutura or "").split(",") if c.strip()}
+        if arquivo:
+            chaves.add(arquivo)
+        linhas.extend({"chave": c, "projeto_id": projeto_id} for c in sorted(chaves))
+    if linhas:
+        conn.execute(text("INSERT INTO arquivos_projeto (chave, projeto_id) VALUES (:chave, :projeto_id)"), linhas)
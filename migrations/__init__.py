@@ -0,0 +1,103 @@
+#migrações do banco: cada arquivo NNNN_nome.py tem uma função upgrade(conn)
+#as aplicadas ficam registradas em schema_migracoes; rodam na inicialização do app
+#(MIGRAR_AO_INICIAR) ou com "python scripts/migrar.py"
+#
+#db.create_all() continua criando as tabelas novas; as migrações alteram bancos que já existem,
+#então todo comando aqui precisa funcionar nos dois casos (IF NOT EXISTS etc.)
+#
+#vários workers do gunicorn sobem ao mesmo tempo: create_all e cada migração rodam com o banco
+#travado para escrita (BEGIN IMMEDIATE no SQLite, advisory lock no PostgreSQL), e a lista de
+#versões aplicadas é relida já com a trava, então só um processo aplica e os outros esperam
+
+import importlib
+import os
+import re
+from contextlib import contextmanager
+from datetime import datetime
+
+from extensions import db
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+
+# quanto um worker espera outro terminar as migrações antes de desistir
+ESPERA_MS = 10 * 60 * 1000
+# chave do pg_advisory_xact_lock (qualquer número fixo do app)
+CHAVE_TRAVA = 7301
+
+
+def listar_migracoes():
+    migracoes = []
+    for arquivo in sorted(os.listdir(PASTA)):
+        encontrado = re.match(r"^(\d{4})_(\w+)\.py$", arquivo)
+        if encontrado:
+            migracoes.append((encontrado.group(1), encontrado.group(2)))
+    return migracoes
+
+
+def _criar_tabela_controle(conn):
+    conn.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS schema_migracoes ("
+        "versao VARCHAR(4) PRIMARY KEY, nome TEXT NOT NULL, aplicada_em TIMESTAMP NOT NULL)"
+    )
+
+
+def _versoes(conn):
+    _criar_tabela_controle(conn)
+    return {v for (v,) in conn.exec_driver_sql("SELECT versao FROM schema_migracoes")}
+
+
+@contextmanager
+def _exclusivo():
+    # uma transação que só um processo por vez tem aberta; commit no fim, rollback se falhar
+    # (o pysqlite não abre transação antes de DDL: o BEGIN explícito faz o ALTER/CREATE entrar nela)
+    with db.engine.connect() as conn:
+        sqlite = conn.dialect.name == "sqlite"
+        if sqlite:
+            espera = conn.exec_driver_sql("PRAGMA busy_timeout").scalar()
+            conn.exec_driver_sql(f"PRAGMA busy_timeout = {ESPERA_MS}")
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        elif conn.dialect.name == "postgresql":
+            conn.exec_driver_sql(f"SELECT pg_advisory_xact_lock({CHAVE_TRAVA})")
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            if sqlite:
+                conn.exec_driver_sql(f"PRAGMA busy_timeout = {espera}")
+                conn.commit()
+
+
+def versoes_aplicadas():
+    with db.engine.begin() as conn:
+        return _versoes(conn)
+
+
+def criar_tabelas():
+    # db.create_all() com a trava: dois workers não criam a mesma tabela ao mesmo tempo
+    with _exclusivo() as conn:
+        db.metadata.create_all(conn)
+
+
+def aplicar_migracoes(saida=None):
+    # cada migração roda na sua própria transação, com a trava, junto com o registro da versão
+    if not {v for v, _ in listar_migracoes()} - versoes_aplicadas():
+        return []
+    novas = []
+    for versao, nome in listar_migracoes():
+        with _exclusivo() as conn:
+            # relida com a trava: outro worker pode ter aplicado enquanto este esperava
+            if versao in _versoes(conn):
+                continue
+            modulo = importlib.import_module(f"migrations.{versao}_{nome}")
+            modulo.upgrade(conn)
+            conn.execute(
+                db.text("INSERT INTO schema_migracoes (versao, nome, aplicada_em) VALUES (:v, :n, :d)"),
+                {"v": versao, "n": nome, "d": datetime.utcnow()},
+            )
+        novas.append(versao)
+        if saida:
+            saida(f"migração {versao}_{nome} aplicada")
+    return novas
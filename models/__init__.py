@@ -6,6 +6,10 @@ from .metodologia import Metodologia
 from .objetivo import Objetivo
 from .projeto import Projeto
 from .autor import Autor
+from .faceta import Faceta
+from .imagem import Imagem
+from .tarefa import Tarefa
+from .arquivo_projeto import ArquivoProjeto
 
 
 tabelas = [
@@ -16,5 +20,9 @@ tabelas = [
     "Metodologia",
     "Objetivo",
     "Projeto",
-    "Autor"
+    "Autor",
+    "Faceta",
+    "Imagem",
+    "Tarefa",
+    "ArquivoProjeto"
 ]
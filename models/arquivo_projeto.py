@@ -0,0 +1,14 @@
+from extensions import db
+
+class ArquivoProjeto(db.Model):
+    # quais projetos usam cada upload (projetos.arquivo e estrutura): com dedupe um arquivo pode
+    # ser de vários projetos, e só é apagado quando nenhum usa (services/armazenamento.py)
+    __tablename__ = 'arquivos_projeto'
+    __table_args__ = (
+        db.Index('uq_arquivos_projeto_chave_projeto', 'chave', 'projeto_id', unique=True),
+        db.Index('ix_arquivos_projeto_projeto', 'projeto_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    chave = db.Column(db.Text, nullable=False)
+    projeto_id = db.Column(db.Integer, db.ForeignKey('projetos.id'), nullable=False)
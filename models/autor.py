@@ -1,6 +1,11 @@
 from extensions import db
 
 class Autor(db.Model):
+    __table_args__ = (
+        db.Index('ix_autor_projeto_usuario', 'projeto_id', 'usuario_id'),
+        db.Index('ix_autor_usuario', 'usuario_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     tipo = db.Column(db.String(50))
 
@@ -3,6 +3,10 @@ from datetime import datetime
 
 class Comentario(db.Model):
     __tablename__ = 'comentarios'
+    __table_args__ = (
+        db.Index('ix_comentarios_projeto_criado_em', 'projeto_id', 'criado_em'),
+        db.Index('ix_comentarios_usuario', 'usuario_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     conteudo = db.Column(db.Text, nullable=False)
@@ -1,8 +1,16 @@
 from extensions import db
+from datetime import datetime
 
 class Curtida(db.Model):
     __tablename__ = 'curtidas'
+    __table_args__ = (
+        # um usuário curte um projeto no máximo uma vez
+        db.Index('uq_curtidas_usuario_projeto', 'usuario_id', 'projeto_id', unique=True),
+        db.Index('ix_curtidas_projeto', 'projeto_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=False)
-    projeto_id = db.Column(db.Integer, db.ForeignKey('projetos.id'), nullable=False)
\ No newline at end of file
+    projeto_id = db.Column(db.Integer, db.ForeignKey('projetos.id'), nullable=False)
+    # sem valor nas curtidas anteriores à migração 0006 (não entram em services/tendencias.py)
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,9 @@
+from extensions import db
+
+class Faceta(db.Model):
+    __tablename__ = 'facetas'
+
+    # contagem de projetos por valor de filtro (campo = 'curso' ou 'tipo')
+    campo = db.Column(db.String(20), primary_key=True)
+    valor = db.Column(db.Text, primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,14 @@
+from extensions import db
+from datetime import datetime
+
+class Imagem(db.Model):
+    __tablename__ = 'imagens'
+
+    # imagem enviada (caminho relativo a static/) e as variantes geradas a partir dela
+    id = db.Column(db.Integer, primary_key=True)
+    caminho = db.Column(db.Text, unique=True, nullable=False)
+    largura = db.Column(db.Integer)
+    altura = db.Column(db.Integer)
+    variantes = db.Column(db.Text)      # JSON: {"card": {"largura", "altura", "webp", "avif", "jpg"}, ...}
+    placeholder = db.Column(db.Text)    # data URI minúsculo para mostrar enquanto carrega
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
\ No newline at end of file
@@ -2,6 +2,7 @@ from extensions import db
 
 class Link(db.Model):
     __tablename__ = 'links'
+    __table_args__ = (db.Index('ix_links_projeto', 'projeto_id'),)
 
     id = db.Column(db.Integer, primary_key=True)
     url = db.Column(db.Text, nullable=False)
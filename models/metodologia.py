@@ -2,6 +2,7 @@ from extensions import db
 
 class Metodologia(db.Model):
     __tablename__ = 'metodologias'
+    __table_args__ = (db.Index('ix_metodologias_projeto', 'projeto_id'),)
 
     id = db.Column(db.Integer, primary_key=True)
     descricao = db.Column(db.Text, nullable=False)
@@ -1,7 +1,15 @@
 from extensions import db
+from datetime import datetime
 
 class Projeto(db.Model):
     __tablename__ = 'projetos'
+    __table_args__ = (
+        db.Index('ix_projetos_curtidas_id', 'curtidas', 'id'),
+        db.Index('ix_projetos_tendencia_id', 'tendencia', 'id'),
+        db.Index('ix_projetos_semestre_curtidas_id', 'semestre', 'curtidas_semestre', 'id'),
+        db.Index('ix_projetos_curso_tipo', 'curso', 'tipo'),
+        db.Index('ix_projetos_usuario', 'usuario_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     titulo = db.Column(db.Text, nullable=False)
@@ -11,11 +19,22 @@ class Projeto(db.Model):
     curso = db.Column(db.Text)
     estrutura = db.Column(db.Text)
     arquivo = db.Column(db.Text)
+    arquivo_nome = db.Column(db.Text)  # nome original do arquivo enviado (arquivo guarda o hash)
     curtidas = db.Column(db.Integer, default=0)
+    # mantido junto com cada comentário (services/estatisticas.py)
+    total_comentarios = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # "em alta" e "top do semestre" (services/tendencias.py)
+    tendencia = db.Column(db.Float, nullable=False, default=0.0, server_default='0')
+    curtidas_semestre = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    semestre = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # incrementada em toda escrita que muda a página (edição, comentário, curtida): base do ETag
+    versao = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=False)
-    autores = db.relationship('Autor', backref='projeto', lazy=True, cascade="all, delete-orphan")
-    objetivos = db.relationship('Objetivo', backref='projeto', lazy=True, cascade="all, delete-orphan")
-    metodologias = db.relationship('Metodologia', backref='projeto', lazy=True, cascade="all, delete-orphan")
-    links = db.relationship('Link', backref='projeto', lazy=True, cascade="all, delete-orphan")
+    # listas na ordem em que foram cadastradas (a edição mantém os ids, ver sincronizar_lista)
+    autores = db.relationship('Autor', backref='projeto', lazy=True, cascade="all, delete-orphan", order_by='Autor.id')
+    objetivos = db.relationship('Objetivo', backref='projeto', lazy=True, cascade="all, delete-orphan", order_by='Objetivo.id')
+    metodologias = db.relationship('Metodologia', backref='projeto', lazy=True, cascade="all, delete-orphan", order_by='Metodologia.id')
+    links = db.relationship('Link', backref='projeto', lazy=True, cascade="all, delete-orphan", order_by='Link.id')
     comentarios = db.relationship('Comentario', backref='projeto', lazy=True, cascade="all, delete-orphan")
\ No newline at end of file
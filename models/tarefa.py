@@ -0,0 +1,23 @@
+from extensions import db
+from datetime import datetime
+
+class Tarefa(db.Model):
+    __tablename__ = 'tarefas'
+    __table_args__ = (
+        # o trabalhador procura a próxima pendente pela data de execução
+        db.Index('ix_tarefas_estado_executar_em', 'estado', 'executar_em'),
+    )
+
+    # trabalho lento feito fora da requisição (services/tarefas.py)
+    id = db.Column(db.Integer, primary_key=True)
+    tipo = db.Column(db.String(50), nullable=False)
+    dados = db.Column(db.Text, nullable=False, default='{}')   # JSON com os argumentos
+    chave = db.Column(db.String(200), unique=True)              # idempotência (só enquanto não termina)
+    estado = db.Column(db.String(20), nullable=False, default='pendente')  # pendente, executando, concluida, falhou
+    tentativas = db.Column(db.Integer, nullable=False, default=0)
+    max_tentativas = db.Column(db.Integer, nullable=False, default=5)
+    executar_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    iniciada_em = db.Column(db.DateTime)
+    concluida_em = db.Column(db.DateTime)
+    erro = db.Column(db.Text)
+    criado_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
\ No newline at end of file
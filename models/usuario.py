@@ -14,4 +14,10 @@ class Usuario(db.Model, UserMixin):
     tipo_usuario = db.Column(db.Text, nullable=False)
     campus = db.Column(db.Text)
     foto = db.Column(db.Text)
+    # contadores de engajamento (services/estatisticas.py): projetos como dono e como coautor,
+    # curtidas e comentários recebidos nesses projetos
+    projetos_proprios = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    projetos_coautor = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    curtidas_recebidas = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    comentarios_recebidos = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     comentarios = db.relationship('Comentario', backref='usuario', lazy=True, cascade="all, delete-orphan")
\ No newline at end of file
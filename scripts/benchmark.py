@@ -0,0 +1,238 @@
+#esse arquivo mede as rotas principais com o test client do Flask (sem rede): latência p50/p95/p99,
+#requisições por segundo e consultas SQL por requisição de cada cenário
+#use "python scripts\benchmark.py" sobre o banco de scripts/gerar_dados.py (ifnexus_carga.db)
+#
+#o resultado vai para instance/benchmarks/ e é comparado com benchmarks/linha_base_micro.json;
+#sai com código 1 se algum cenário passar do orçamento (ver utils/medicoes.py) ou se alguma view
+#fizer mais consultas que o seu @orcamento_consultas (utils/consultas.py). Depois de uma
+#melhoria (ou numa máquina nova), grave a linha de base com --salvar-linha-base
+#
+#para a vazão com vários processos e servidor HTTP de verdade, use scripts/carga.py
+
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+# adiciona a raiz do projeto ao sys.path
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+
+LINHA_BASE = os.path.join(RAIZ, "benchmarks", "linha_base_micro.json")
+
+MINIMO_AMOSTRAS = 20
+
+# prefixos digitados no campo de coautores
+PREFIXOS = ["an", "bru", "carl", "silva", "sou", "mar", "ped", "oliv", "2025000", "ga"]
+
+
+def medir(cliente, requisicao, iteracoes, aquecimento, contar_consultas, tempo_maximo):
+    # requisicao(cliente, i) faz uma chamada e devolve a resposta
+    for i in range(aquecimento):
+        requisicao(cliente, i)
+
+    latencias, consultas, erros = [], [], 0
+    limite = time.perf_counter() + tempo_maximo
+    for i in range(iteracoes):
+        # cenário lento para depois de tempo_maximo segundos (com amostras suficientes)
+        if i >= MINIMO_AMOSTRAS and time.perf_counter() > limite:
+            break
+        with contar_consultas() as contador:
+            inicio = time.perf_counter()
+            resposta = requisicao(cliente, i)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+        consultas.append(contador.total)
+        if resposta.status_code >= 400:
+            erros += 1
+    return latencias, consultas, erros
+
+
+def verificar_orcamentos(app, cliente, rotas):
+    # uma requisição por view com @orcamento_consultas, antes das medições (cache ainda frio);
+    # com app.testing o AssertionError do orçamento chega aqui em vez de virar um 500
+    falhas = []
+    testing = app.testing
+    app.testing = True
+    try:
+        for rota in rotas:
+            try:
+                cliente.get(rota)
+            except AssertionError as erro:
+                falhas.append(f"{rota}: {str(erro).splitlines()[0].rstrip(':')}")
+    finally:
+        app.testing = testing
+    return falhas
+
+
+def curtidas_concorrentes(app, emails, projeto_id, repeticoes, contar_consultas):
+    # vários usuários alternando a curtida do mesmo projeto ao mesmo tempo
+    clientes = []
+    for email in emails:
+        cliente = app.test_client()
+        cliente.post("/auth/login", data={"email": email, "senha": "123"})
+        clientes.append(cliente)
+
+    latencias, erros = [], []
+    lock = threading.Lock()
+    barreira = threading.Barrier(len(clientes))
+
+    def alternar(cliente):
+        barreira.wait()
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            resposta = cliente.post(f"/projeto/{projeto_id}/curtir")
+            duracao = (time.perf_counter() - inicio) * 1000
+            with lock:
+                latencias.append(duracao)
+                if resposta.status_code != 200:
+                    erros.append(resposta.status_code)
+
+    with contar_consultas() as contador:
+        inicio = time.perf_counter()
+        threads = [threading.Thread(target=alternar, args=(c,)) for c in clientes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duracao = time.perf_counter() - inicio
+
+    # todas as threads contam no mesmo contador: vale a média
+    media = contador.total / max(len(latencias), 1)
+    return latencias, [round(media)] * len(latencias), len(erros), duracao
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks das rotas com o test client")
+    parser.add_argument("--banco", default="sqlite:///ifnexus_carga.db", help="DATABASE_URL (gerado por gerar_dados.py)")
+    parser.add_argument("--iteracoes", type=int, default=200)
+    parser.add_argument("--aquecimento", type=int, default=10)
+    parser.add_argument("--tempo-maximo", type=float, default=20, help="segundos por cenário (mínimo de 20 amostras)")
+    parser.add_argument("--cenarios", help="só estes cenários, separados por vírgula")
+    parser.add_argument("--saida", help="arquivo JSON do resultado (padrão: instance/benchmarks/micro-<data>.json)")
+    parser.add_argument("--linha-base", default=LINHA_BASE)
+    parser.add_argument("--salvar-linha-base", action="store_true", help="grava este resultado como a nova linha de base")
+    parser.add_argument("--tolerancia", type=float, default=None, help="folga sobre o p95 da linha de base (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.banco
+    os.environ.setdefault("IFNEXUS_TAREFAS_NO_APP", "0")
+
+    from app import app
+    from extensions import db
+    from models import Usuario, Projeto, Comentario
+    from utils.consultas import contar_consultas
+    from utils import medicoes
+
+    with app.app_context():
+        if not db.session.query(Projeto.query.exists()).scalar():
+            print(f"❌ {args.banco} está vazio; gere os dados com scripts/gerar_dados.py")
+            sys.exit(1)
+        # usuários do SUAP (aluno/docente) podem usar o livesearch
+        alunos = [email for (email,) in db.session.query(Usuario.email)
+                  .filter(Usuario.tipo_usuario == "Aluno").order_by(Usuario.id).limit(8)]
+        mais_comentado = db.session.query(Comentario.projeto_id)\
+            .group_by(Comentario.projeto_id).order_by(db.func.count().desc()).limit(1).scalar()
+        mais_curtido = db.session.query(Projeto.id).order_by(Projeto.curtidas.desc()).limit(1).scalar()
+        total_comentarios = Comentario.query.filter_by(projeto_id=mais_comentado).count()
+        # resultados só são comparáveis sobre o mesmo volume de dados
+        from models import Curtida
+        dados = {modelo.__tablename__: db.session.query(db.func.count(modelo.id)).scalar()
+                 for modelo in (Usuario, Projeto, Curtida, Comentario)}
+        engine = db.engine
+
+    # cada requisição do test client abre o próprio app context (e o próprio g, onde o
+    # Flask-Login guarda current_user) só se não houver um aberto: as medições rodam fora dele
+    def contar():
+        return contar_consultas(engine)
+
+    cliente = app.test_client()
+    cliente.post("/auth/login", data={"email": alunos[0], "senha": "123"})
+
+    falhas_orcamento = verificar_orcamentos(app, cliente, [
+        f"/projeto/{mais_comentado}",
+        f"/projeto/{mais_comentado}/comentarios",
+        "/projetos",
+        "/projetos?q=energia solar",
+        "/projetos?ordenacao=semestre",
+    ])
+    for falha in falhas_orcamento:
+        print(f"❌ {falha}")
+
+    cenarios = {
+        "index": lambda c, i: c.get("/"),
+        "projetos": lambda c, i: c.get("/projetos"),
+        "projetos_pagina_50": lambda c, i: c.get("/projetos?pagina=50"),
+        "projetos_filtros": lambda c, i: c.get("/projetos?curso=informatica&tipo=pesquisa"),
+        "projetos_busca": lambda c, i: c.get("/projetos?q=energia solar"),
+        "projeto_comentado": lambda c, i: c.get(f"/projeto/{mais_comentado}"),
+        "livesearch": lambda c, i: c.get(f"/livesearch/usuarios?q={PREFIXOS[i % len(PREFIXOS)]}"),
+        "login": lambda c, i: c.post("/auth/login", data={"email": alunos[1], "senha": "123"}),
+    }
+    # o bcrypt do login leva centenas de ms: poucas repetições bastam
+    iteracoes_por_cenario = {"login": max(10, args.iteracoes // 10)}
+
+    escolhidos = args.cenarios.split(",") if args.cenarios else list(cenarios) + ["curtir_concorrente"]
+    resultado = medicoes.novo_resultado("micro", banco=args.banco, dados=dados, iteracoes=args.iteracoes,
+                                        projeto_comentado={"id": mais_comentado, "comentarios": total_comentarios})
+
+    for nome in escolhidos:
+        if nome == "curtir_concorrente":
+            repeticoes = max(5, args.iteracoes // len(alunos))
+            latencias, consultas, erros, duracao = curtidas_concorrentes(
+                app, alunos, mais_curtido, repeticoes, contar)
+            resumo = medicoes.resumir(latencias, consultas, duracao=duracao, erros=erros)
+        else:
+            iteracoes = iteracoes_por_cenario.get(nome, args.iteracoes)
+            latencias, consultas, erros = medir(cliente, cenarios[nome], iteracoes,
+                                                min(args.aquecimento, iteracoes), contar, args.tempo_maximo)
+            resumo = medicoes.resumir(latencias, consultas, erros=erros)
+        resultado["cenarios"][nome] = resumo
+        print(f"  {nome}: p95 {resumo['p95_ms']} ms")
+
+    # o contador tem que bater com as curtidas depois das alternâncias simultâneas
+    if "curtir_concorrente" in escolhidos:
+        with app.app_context():
+            db.session.expire_all()
+            contador = db.session.get(Projeto, mais_curtido).curtidas
+            reais = Curtida.query.filter_by(projeto_id=mais_curtido).count()
+            resultado["cenarios"]["curtir_concorrente"]["contador_confere"] = contador == reais
+
+    saida = args.saida or os.path.join(RAIZ, "instance", "benchmarks",
+                                       f"micro-{datetime.now():%Y%m%d-%H%M%S}.json")
+    medicoes.salvar(resultado, saida)
+
+    linha_base = medicoes.carregar(args.linha_base)
+    print()
+    medicoes.imprimir(resultado, linha_base)
+    print(f"\nresultado em {saida}")
+
+    if args.salvar_linha_base:
+        if falhas_orcamento:
+            print("❌ linha de base não gravada: há views acima do orçamento de consultas")
+            sys.exit(1)
+        medicoes.salvar(resultado, args.linha_base)
+        print(f"✅ linha de base gravada em {args.linha_base}")
+        return
+
+    falhas = list(falhas_orcamento)
+    if resultado["cenarios"].get("curtir_concorrente", {}).get("contador_confere") is False:
+        falhas.append("curtir_concorrente: contador de curtidas diferente das curtidas gravadas")
+    if linha_base:
+        tolerancia = args.tolerancia if args.tolerancia is not None else medicoes.TOLERANCIA
+        falhas += medicoes.comparar(resultado, linha_base, tolerancia)
+        for nome, n in medicoes.poucas_amostras(resultado, linha_base).items():
+            print(f"({nome}: {n} amostras, p95 e vazão não comparados; mínimo {medicoes.MINIMO_AMOSTRAS})")
+    else:
+        print(f"(sem linha de base em {args.linha_base}; use --salvar-linha-base)")
+
+    for falha in falhas:
+        print(f"❌ {falha}")
+    if falhas:
+        sys.exit(1)
+    print("✅ todos os cenários dentro do orçamento")
+
+
+if __name__ == "__main__":
+    main()
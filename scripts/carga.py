@@ -0,0 +1,233 @@
+#esse arquivo é um gerador de carga HTTP: vários processos, cada um com o seu usuário logado e
+#conexão reaproveitada, disparam uma mistura de requisições contra o app rodando de verdade
+#use "python scripts\carga.py --iniciar-servidor" (sobe o app sobre ifnexus_carga.db numa porta
+#livre) ou "python scripts\carga.py --url http://127.0.0.1:5000" para um servidor já no ar
+#
+#mede p50/p95/p99 e requisições por segundo por cenário; com o servidor rodando com
+#IFNEXUS_INSTRUMENTACAO=1 (--iniciar-servidor já liga) também as consultas por requisição, lidas
+#do header Server-Timing. O resultado vai para instance/benchmarks/ e é comparado com
+#benchmarks/linha_base_carga.json (código 1 se algum cenário regredir ou der erro)
+
+import argparse
+import multiprocessing
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import requests
+
+# adiciona a raiz do projeto ao sys.path
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+
+from utils import medicoes
+
+LINHA_BASE = os.path.join(RAIZ, "benchmarks", "linha_base_carga.json")
+
+# cenário -> peso na mistura (tráfego típico: muita leitura, poucas escritas)
+MISTURA = {
+    "index": 20,
+    "projetos": 20,
+    "projetos_filtros": 10,
+    "projetos_busca": 10,
+    "projeto": 25,
+    "projeto_comentado": 3,
+    "curtir": 8,
+    "livesearch": 4,
+}
+PREFIXOS = ["an", "bru", "carl", "silva", "sou", "mar", "ped", "oliv", "ga"]
+BUSCAS = ["energia solar", "sistema", "reciclagem tecido", "aplicativo", "robótica"]
+
+CONSULTAS_SERVER_TIMING = re.compile(r'desc="(\d+) consultas"')
+
+
+def _requisicao(sessao, url, cenario, rng, alvos):
+    if cenario == "index":
+        return sessao.get(f"{url}/")
+    if cenario == "projetos":
+        return sessao.get(f"{url}/projetos")
+    if cenario == "projetos_filtros":
+        return sessao.get(f"{url}/projetos", params={"curso": "informatica", "tipo": rng.choice(["pesquisa", "ensino"])})
+    if cenario == "projetos_busca":
+        return sessao.get(f"{url}/projetos", params={"q": rng.choice(BUSCAS)})
+    if cenario == "projeto":
+        return sessao.get(f"{url}/projeto/{rng.choice(alvos['populares'])}")
+    if cenario == "projeto_comentado":
+        return sessao.get(f"{url}/projeto/{alvos['comentado']}")
+    if cenario == "curtir":
+        return sessao.post(f"{url}/projeto/{alvos['curtido']}/curtir")
+    if cenario == "livesearch":
+        return sessao.get(f"{url}/livesearch/usuarios", params={"q": rng.choice(PREFIXOS)})
+    raise ValueError(cenario)
+
+
+def trabalhador(tarefa):
+    indice, url, email, duracao, alvos, semente = tarefa
+    rng = random.Random(semente + indice)
+    sessao = requests.Session()
+    inicio = time.perf_counter()
+    resposta = sessao.post(f"{url}/auth/login", data={"email": email, "senha": "123"}, allow_redirects=False)
+    amostras = {"login": [((time.perf_counter() - inicio) * 1000, resposta.status_code, None)]}
+
+    cenarios, pesos = zip(*MISTURA.items())
+    fim = time.perf_counter() + duracao
+    while time.perf_counter() < fim:
+        cenario = rng.choices(cenarios, pesos)[0]
+        inicio = time.perf_counter()
+        try:
+            resposta = _requisicao(sessao, url, cenario, rng, alvos)
+            status = resposta.status_code
+            encontrado = CONSULTAS_SERVER_TIMING.search(resposta.headers.get("Server-Timing", ""))
+            consultas = int(encontrado.group(1)) if encontrado else None
+        except requests.RequestException:
+            status, consultas = 0, None
+        amostras.setdefault(cenario, []).append(((time.perf_counter() - inicio) * 1000, status, consultas))
+    return amostras
+
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def iniciar_servidor(banco, porta):
+    ambiente = {
+        **os.environ,
+        "DATABASE_URL": banco,
+        "IFNEXUS_INSTRUMENTACAO": "1",
+        "IFNEXUS_TAREFAS_NO_APP": "0",
+        "IFNEXUS_ESTATICOS_AO_INICIAR": "0",
+    }
+    processo = subprocess.Popen(
+        [sys.executable, "-c", f"from app import app; app.run(host='127.0.0.1', port={porta}, threaded=True)"],
+        cwd=RAIZ, env=ambiente, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{porta}"
+    for _ in range(300):
+        try:
+            requests.get(f"{url}/sobre", timeout=1)
+            return processo, url
+        except requests.RequestException:
+            if processo.poll() is not None:
+                break
+            time.sleep(0.1)
+    processo.terminate()
+    raise RuntimeError("o servidor não subiu")
+
+
+def alvos_da_carga(banco):
+    # projetos usados na mistura, um usuário (aluno, para o livesearch) por processo e o volume de dados
+    os.environ["DATABASE_URL"] = banco
+    os.environ.setdefault("IFNEXUS_TAREFAS_NO_APP", "0")
+    from app import app
+    from extensions import db
+    from models import Usuario, Projeto, Curtida, Comentario
+
+    with app.app_context():
+        populares = [pid for (pid,) in db.session.query(Projeto.id).order_by(Projeto.curtidas.desc()).limit(50)]
+        comentado = db.session.query(Comentario.projeto_id)\
+            .group_by(Comentario.projeto_id).order_by(db.func.count().desc()).limit(1).scalar()
+        dados = {modelo.__tablename__: db.session.query(db.func.count(modelo.id)).scalar()
+                 for modelo in (Usuario, Projeto, Curtida, Comentario)}
+        emails = [e for (e,) in db.session.query(Usuario.email)
+                  .filter(Usuario.tipo_usuario == "Aluno").order_by(Usuario.id).limit(64)]
+    alvos = {"populares": populares, "comentado": comentado, "curtido": populares[0] if populares else None}
+    return alvos, emails, dados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga HTTP com vários processos")
+    parser.add_argument("--url", help="servidor já rodando (senão use --iniciar-servidor)")
+    parser.add_argument("--iniciar-servidor", action="store_true")
+    parser.add_argument("--banco", default="sqlite:///ifnexus_carga.db", help="DATABASE_URL (gerado por gerar_dados.py)")
+    parser.add_argument("--workers", type=int, default=4, help="processos gerando carga")
+    parser.add_argument("--duracao", type=float, default=30, help="segundos de carga")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", help="arquivo JSON do resultado (padrão: instance/benchmarks/carga-<data>.json)")
+    parser.add_argument("--linha-base", default=LINHA_BASE)
+    parser.add_argument("--salvar-linha-base", action="store_true")
+    parser.add_argument("--tolerancia", type=float, default=None)
+    args = parser.parse_args()
+
+    if not args.url and not args.iniciar_servidor:
+        parser.error("informe --url ou --iniciar-servidor")
+
+    alvos, emails, dados = alvos_da_carga(args.banco)
+    if not alvos["populares"]:
+        print(f"❌ {args.banco} está vazio; gere os dados com scripts/gerar_dados.py")
+        sys.exit(1)
+
+    servidor = None
+    url = args.url
+    if args.iniciar_servidor:
+        servidor, url = iniciar_servidor(args.banco, _porta_livre())
+
+    try:
+        tarefas = [(i, url, emails[i % len(emails)], args.duracao, alvos, args.semente) for i in range(args.workers)]
+        with multiprocessing.get_context("spawn").Pool(args.workers) as pool:
+            resultados = pool.map(trabalhador, tarefas)
+        # cada processo gera carga por exatamente --duracao segundos (fora a inicialização)
+        duracao = args.duracao
+    finally:
+        if servidor:
+            servidor.terminate()
+            servidor.wait()
+
+    resultado = medicoes.novo_resultado("carga", url=url, banco=args.banco, dados=dados, workers=args.workers,
+                                        duracao_s=round(duracao, 1))
+    por_cenario = {}
+    for amostras in resultados:
+        for cenario, lista in amostras.items():
+            por_cenario.setdefault(cenario, []).extend(lista)
+
+    total = 0
+    for cenario in ["login", *MISTURA]:
+        lista = por_cenario.get(cenario)
+        if not lista:
+            continue
+        latencias = [ms for ms, _, _ in lista]
+        consultas = [c for _, _, c in lista if c is not None]
+        erros = sum(1 for _, status, _ in lista if status == 0 or status >= 500)
+        # login acontece uma vez por processo: a vazão dele não significa nada
+        resumo = medicoes.resumir(latencias, consultas, duracao=duracao if cenario != "login" else None, erros=erros)
+        resultado["cenarios"][cenario] = resumo
+        total += len(lista)
+    resultado["total"] = {"requisicoes": total, "rps": round(total / duracao, 1)}
+
+    saida = args.saida or os.path.join(RAIZ, "instance", "benchmarks", f"carga-{datetime.now():%Y%m%d-%H%M%S}.json")
+    medicoes.salvar(resultado, saida)
+
+    linha_base = medicoes.carregar(args.linha_base)
+    medicoes.imprimir(resultado, linha_base)
+    print(f"\n{total} requisições em {duracao:.1f}s ({resultado['total']['rps']} req/s) com {args.workers} processos")
+    print(f"resultado em {saida}")
+
+    if args.salvar_linha_base:
+        medicoes.salvar(resultado, args.linha_base)
+        print(f"✅ linha de base gravada em {args.linha_base}")
+        return
+
+    falhas = [f"{nome}: {r['erros']} erros" for nome, r in resultado["cenarios"].items() if r["erros"]]
+    if linha_base:
+        tolerancia = args.tolerancia if args.tolerancia is not None else medicoes.TOLERANCIA
+        falhas += [f for f in medicoes.comparar(resultado, linha_base, tolerancia) if "erros" not in f]
+        for nome, n in medicoes.poucas_amostras(resultado, linha_base).items():
+            print(f"({nome}: {n} amostras, p95 e vazão não comparados; mínimo {medicoes.MINIMO_AMOSTRAS})")
+    else:
+        print(f"(sem linha de base em {args.linha_base}; use --salvar-linha-base)")
+
+    for falha in falhas:
+        print(f"❌ {falha}")
+    if falhas:
+        sys.exit(1)
+    print("✅ todos os cenários dentro do orçamento")
+
+
+if __name__ == "__main__":
+    main()
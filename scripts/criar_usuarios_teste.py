@@ -7,6 +7,9 @@ import os
 # adiciona a raiz do projeto ao sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# só o servidor pega tarefas da fila
+os.environ.setdefault("IFNEXUS_TAREFAS_NO_APP", "0")
+
 from app import app
 from extensions import db, bcrypt
 from models import Usuario
@@ -0,0 +1,316 @@
+#esse arquivo gera um banco de dados sintético em escala de produção para medir desempenho
+#use "python scripts\gerar_dados.py --escala grande" (50 mil usuários, 20 mil projetos,
+#2 milhões de curtidas, 500 mil comentários) ou ajuste cada quantidade com --usuarios etc.
+#
+#o banco padrão é instance/ifnexus_carga.db, separado do de desenvolvimento; rode o app contra
+#ele com DATABASE_URL=sqlite:///ifnexus_carga.db. Com a mesma --semente os dados saem iguais (só
+#as datas são relativas ao momento da geração), então toda mudança de desempenho pode ser
+#medida sobre os mesmos dados
+#
+#as distribuições imitam o uso real: poucos projetos concentram a maior parte das curtidas e
+#comentários (Zipf), poucos usuários fazem a maior parte das interações e alguns cursos têm
+#muito mais projetos que outros. As linhas são geradas em lotes (em paralelo com --processos)
+#e gravadas com INSERT em lote do Core, com a senha calculada uma vez só
+
+import argparse
+import bisect
+import itertools
+import multiprocessing
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# adiciona a raiz do projeto ao sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ESCALAS = {
+    "pequena": {"usuarios": 2000, "projetos": 800, "curtidas": 80000, "comentarios": 20000},
+    "media": {"usuarios": 10000, "projetos": 4000, "curtidas": 400000, "comentarios": 100000},
+    "grande": {"usuarios": 50000, "projetos": 20000, "curtidas": 2000000, "comentarios": 500000},
+}
+
+# mesmos valores dos formulários de criar_projeto.html
+CURSOS = {"informatica": 50, "eletro": 25, "textil": 15, "vestuario": 10}
+TIPOS = {"pesquisa": 45, "extensao": 35, "ensino": 20}
+TIPOS_USUARIO = {"Aluno": 85, "Professor": 10, "Visitante": 5}
+
+NOMES = ["Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Heitor", "Isabela", "João",
+         "Karina", "Lucas", "Marina", "Nicolas", "Olivia", "Pedro", "Rafaela", "Samuel", "Tatiana", "Vitor"]
+SOBRENOMES = ["Silva", "Souza", "Oliveira", "Santos", "Lima", "Pereira", "Costa", "Ferreira", "Almeida",
+              "Rodrigues", "Gomes", "Martins", "Araújo", "Barbosa", "Cavalcanti", "Medeiros", "Dantas"]
+PALAVRAS = ["sistema", "monitoramento", "sustentável", "energia", "solar", "tecido", "reciclagem", "aplicativo",
+            "inclusão", "acessibilidade", "sensor", "automação", "moda", "educação", "robótica", "dados",
+            "comunidade", "água", "irrigação", "plataforma", "jogo", "ensino", "química", "algodão",
+            "eficiência", "rede", "web", "análise", "protótipo", "indicadores"]
+COMENTARIOS = ["Muito bom!", "Parabéns pelo projeto.", "Como vocês mediram os resultados?",
+               "Gostei bastante da metodologia.", "Tem repositório público?", "Excelente iniciativa!",
+               "Poderiam detalhar o protótipo?", "Isso ajudaria muito o campus.", "Quero participar!"]
+
+DIAS_HISTORICO = 365
+LOTE = 20000
+
+
+def _zipf(n, expoente):
+    # pesos 1/r^s embaralhados: quem é "popular" não depende do id
+    return [1.0 / (r + 1) ** expoente for r in range(n)]
+
+
+def _acumulados(pesos):
+    return list(itertools.accumulate(pesos))
+
+
+def _escolher(rng, acumulados):
+    return bisect.bisect_left(acumulados, rng.random() * acumulados[-1])
+
+
+def _frase(rng, minimo, maximo):
+    return " ".join(rng.choice(PALAVRAS) for _ in range(rng.randint(minimo, maximo)))
+
+
+def _distribuir(total, pesos, limite):
+    # divide total proporcionalmente aos pesos, sem passar do limite por item (enchimento por níveis)
+    quantidades = [0] * len(pesos)
+    abertos = list(range(len(pesos)))
+    restante = total
+    while restante > 0 and abertos:
+        soma = sum(pesos[i] for i in abertos)
+        proximos = []
+        distribuido = 0
+        for i in abertos:
+            parte = int(restante * pesos[i] / soma)
+            parte = min(parte, limite - quantidades[i])
+            quantidades[i] += parte
+            distribuido += parte
+            if quantidades[i] < limite:
+                proximos.append(i)
+        if distribuido == 0:
+            # sobras menores que 1 por item: vão para os mais pesados
+            for i in sorted(proximos, key=lambda i: -pesos[i])[:restante]:
+                quantidades[i] += 1
+                distribuido += 1
+        restante -= distribuido
+        abertos = proximos
+    return quantidades
+
+
+# --- geradores de lotes (rodam nos processos filhos; recebem tudo por parâmetro) ---
+
+def _lote_curtidas(tarefa):
+    # curtidas de um intervalo de projetos: (usuario_id, projeto_id, criado_em) sem repetição por projeto
+    semente, inicio, quantidades, ordem_usuarios, agora = tarefa
+    rng = random.Random(semente)
+    total_usuarios = len(ordem_usuarios)
+    linhas = []
+    for deslocamento, n in enumerate(quantidades):
+        if not n:
+            continue
+        projeto_id = inicio + deslocamento
+        # projetos pequenos recebem curtidas dos usuários mais ativos; os virais, de quase todos
+        alcance = min(total_usuarios, max(2 * n, total_usuarios // 5))
+        for posicao in rng.sample(range(alcance), n):
+            # como nos comentários, mais curtidas recentes que antigas
+            dias = DIAS_HISTORICO * rng.random() ** 2
+            linhas.append((ordem_usuarios[posicao], projeto_id, agora - timedelta(days=dias)))
+    return linhas
+
+
+def _lote_comentarios(tarefa):
+    semente, n, acumulados_projetos, ordem_projetos, acumulados_usuarios, ordem_usuarios, agora = tarefa
+    rng = random.Random(semente)
+    linhas = []
+    for _ in range(n):
+        projeto_id = ordem_projetos[_escolher(rng, acumulados_projetos)]
+        usuario_id = ordem_usuarios[_escolher(rng, acumulados_usuarios)]
+        # mais comentários recentes que antigos
+        dias = DIAS_HISTORICO * rng.random() ** 2
+        linhas.append((rng.choice(COMENTARIOS), agora - timedelta(days=dias), usuario_id, projeto_id))
+    return linhas
+
+
+def _mapear(pool, funcao, tarefas):
+    return pool.imap(funcao, tarefas) if pool else map(funcao, tarefas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um banco sintético para testes de desempenho")
+    parser.add_argument("--escala", choices=ESCALAS, default="media")
+    parser.add_argument("--usuarios", type=int)
+    parser.add_argument("--projetos", type=int)
+    parser.add_argument("--curtidas", type=int)
+    parser.add_argument("--comentarios", type=int)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--processos", type=int, default=1, help="processos gerando as linhas em paralelo")
+    parser.add_argument("--banco", default="sqlite:///ifnexus_carga.db", help="DATABASE_URL de destino")
+    parser.add_argument("--apagar", action="store_true", help="apaga os dados que já existirem no destino")
+    args = parser.parse_args()
+
+    quantidades = dict(ESCALAS[args.escala])
+    for campo in quantidades:
+        if getattr(args, campo) is not None:
+            quantidades[campo] = getattr(args, campo)
+
+    os.environ["DATABASE_URL"] = args.banco
+    os.environ.setdefault("IFNEXUS_TAREFAS_NO_APP", "0")
+
+    from app import app
+    from extensions import db, bcrypt
+    from models import Usuario, Projeto, Autor, Objetivo, Metodologia, Link, Curtida, Comentario
+    from services.busca import reconstruir_indice
+    from services.facetas import reconstruir_facetas
+    from services.estatisticas import recalcular_estatisticas
+    from services.tendencias import recalcular_tendencias
+
+    rng = random.Random(args.semente)
+    inicio_total = time.perf_counter()
+
+    def gravar(modelo, colunas, linhas):
+        # insert da tabela (Core), não do modelo: o caminho de "bulk insert" do ORM custa o dobro
+        linhas = list(linhas)
+        conexao = db.session.connection()
+        for i in range(0, len(linhas), LOTE):
+            conexao.execute(db.insert(modelo.__table__), [dict(zip(colunas, linha)) for linha in linhas[i:i + LOTE]])
+        return len(linhas)
+
+    @contextmanager
+    def sem_indices(modelo):
+        # índices recriados no fim (construídos de uma vez, ordenados) em vez de atualizados linha a
+        # linha; a unicidade das curtidas é garantida pelo gerador
+        conexao = db.session.connection()
+        for indice in modelo.__table__.indexes:
+            indice.drop(conexao, checkfirst=True)
+        yield
+        for indice in modelo.__table__.indexes:
+            indice.create(conexao)
+
+    def etapa(nome, inicio):
+        print(f"  {nome}: {time.perf_counter() - inicio:.1f}s")
+        return time.perf_counter()
+
+    with app.app_context():
+        if db.session.query(Usuario.query.exists()).scalar():
+            if not args.apagar:
+                print(f"❌ {args.banco} já tem dados; use --apagar para recriar")
+                sys.exit(1)
+            # recriar as tabelas é bem mais rápido que apagar milhões de linhas com os índices
+            db.session.remove()
+            db.drop_all()
+            db.create_all()
+
+        if db.engine.dialect.name == "sqlite":
+            # só durante a carga: se cair no meio é só gerar de novo; o cache grande mantém os
+            # índices de curtidas (inseridas fora de ordem) na memória
+            db.session.execute(db.text("PRAGMA synchronous = OFF"))
+            db.session.execute(db.text("PRAGMA cache_size = -262144"))
+
+        U, P = quantidades["usuarios"], quantidades["projetos"]
+        agora = datetime.utcnow()
+        marca = time.perf_counter()
+
+        # usuários: um único hash para todos (senha "123")
+        senha = bcrypt.generate_password_hash("123").decode("utf-8")
+        tipos_usuario, pesos_tipo = zip(*TIPOS_USUARIO.items())
+        gravar(Usuario, ("id", "nome", "email", "senha", "matricula", "tipo_usuario", "campus"), (
+            (i, f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}",
+             f"usuario{i}@ifnexus.test", senha, f"2025{i:07d}", tipo, "CNAT")
+            for i, tipo in zip(range(1, U + 1), rng.choices(tipos_usuario, pesos_tipo, k=U))
+        ))
+        db.session.commit()
+        marca = etapa(f"{U} usuários", marca)
+
+        # atividade dos usuários e popularidade dos projetos (índice 0 = mais ativo/popular)
+        ordem_usuarios = list(range(1, U + 1))
+        rng.shuffle(ordem_usuarios)
+        acumulados_usuarios = _acumulados(_zipf(U, 0.8))
+        pesos_projetos = _zipf(P, 1.0)
+        ordem_projetos = list(range(1, P + 1))
+        rng.shuffle(ordem_projetos)
+        popularidade = [0.0] * P
+        for posicao, projeto_id in enumerate(ordem_projetos):
+            popularidade[projeto_id - 1] = pesos_projetos[posicao]
+
+        # curtidas por projeto já conhecidas: projetos.curtidas sai certo sem recontar
+        curtidas_por_projeto = _distribuir(quantidades["curtidas"], popularidade, U)
+
+        cursos, pesos_curso = zip(*CURSOS.items())
+        tipos, pesos_tipo = zip(*TIPOS.items())
+        gravar(Projeto, ("id", "titulo", "subtitulo", "descricao", "tipo", "curso", "curtidas", "versao",
+                         "atualizado_em", "usuario_id"), (
+            (i, _frase(rng, 2, 5).capitalize(), _frase(rng, 3, 7), " ".join(_frase(rng, 8, 16) for _ in range(3)),
+             rng.choices(tipos, pesos_tipo)[0], rng.choices(cursos, pesos_curso)[0], curtidas_por_projeto[i - 1],
+             1, agora - timedelta(days=DIAS_HISTORICO * rng.random()),
+             ordem_usuarios[_escolher(rng, acumulados_usuarios)])
+            for i in range(1, P + 1)
+        ))
+        donos = dict(db.session.execute(db.select(Projeto.id, Projeto.usuario_id)).all())
+
+        autores, objetivos, metodologias, links = [], [], [], []
+        for projeto_id in range(1, P + 1):
+            coautores = {ordem_usuarios[_escolher(rng, acumulados_usuarios)]
+                         for _ in range(rng.choices((0, 1, 2, 3, 4), (30, 30, 20, 12, 8))[0])}
+            coautores.discard(donos[projeto_id])
+            autores.extend((projeto_id, u) for u in coautores)
+            objetivos.extend((projeto_id, _frase(rng, 5, 12)) for _ in range(rng.randint(1, 5)))
+            metodologias.extend((projeto_id, _frase(rng, 5, 12)) for _ in range(rng.randint(1, 4)))
+            links.extend((projeto_id, f"https://github.com/ifnexus/projeto-{projeto_id}-{n}")
+                         for n in range(rng.choices((0, 1, 2, 3), (40, 35, 15, 10))[0]))
+        gravar(Autor, ("projeto_id", "usuario_id"), autores)
+        gravar(Objetivo, ("projeto_id", "descricao"), objetivos)
+        gravar(Metodologia, ("projeto_id", "descricao"), metodologias)
+        gravar(Link, ("projeto_id", "url"), links)
+        db.session.commit()
+        marca = etapa(f"{P} projetos ({len(autores)} coautores, {len(objetivos)} objetivos, "
+                      f"{len(metodologias)} metodologias, {len(links)} links)", marca)
+
+        pool = multiprocessing.Pool(args.processos) if args.processos > 1 else None
+        try:
+            passo = max(1, P // 50)
+            tarefas = ((args.semente * 1000 + n, inicio + 1, curtidas_por_projeto[inicio:inicio + passo], ordem_usuarios,
+                        agora)
+                       for n, inicio in enumerate(range(0, P, passo)))
+            total = 0
+            with sem_indices(Curtida):
+                for linhas in _mapear(pool, _lote_curtidas, tarefas):
+                    total += gravar(Curtida, ("usuario_id", "projeto_id", "criado_em"), linhas)
+            db.session.commit()
+            marca = etapa(f"{total} curtidas", marca)
+
+            restantes = quantidades["comentarios"]
+            tarefas = []
+            n = 0
+            while restantes > 0:
+                tamanho = min(LOTE, restantes)
+                tarefas.append((args.semente * 2000 + n, tamanho, _acumulados(pesos_projetos), ordem_projetos,
+                                acumulados_usuarios, ordem_usuarios, agora))
+                restantes -= tamanho
+                n += 1
+            total = 0
+            with sem_indices(Comentario):
+                for linhas in _mapear(pool, _lote_comentarios, tarefas):
+                    total += gravar(Comentario, ("conteudo", "criado_em", "usuario_id", "projeto_id"), linhas)
+            db.session.commit()
+            marca = etapa(f"{total} comentários", marca)
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+
+        reconstruir_facetas()
+        reconstruir_indice()
+        recalcular_estatisticas()
+        db.session.commit()
+        recalcular_tendencias()
+        if db.engine.dialect.name == "sqlite":
+            # estatísticas para o planejador escolher os índices certos
+            db.session.execute(db.text("ANALYZE"))
+            db.session.commit()
+        etapa("facetas, índice de busca, contadores, tendências e ANALYZE", marca)
+
+    print(f"✅ Banco {args.banco} gerado em {time.perf_counter() - inicio_total:.1f}s "
+          f"(escala {args.escala}, semente {args.semente})")
+
+
+if __name__ == "__main__":
+    main()
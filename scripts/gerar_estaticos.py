@@ -0,0 +1,20 @@
+#esse arquivo gera o manifesto de static/ (nomes com hash) e as versões .gz/.br dos arquivos
+#use "python scripts\gerar_estaticos.py" no deploy; com IFNEXUS_PERFIL=producao o app só lê o manifesto ao subir
+
+import sys
+import os
+
+# adiciona a raiz do projeto ao sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("IFNEXUS_ESTATICOS_AO_INICIAR", "0")
+# só o servidor pega tarefas da fila
+os.environ.setdefault("IFNEXUS_TAREFAS_NO_APP", "0")
+
+from app import app
+from utils.estaticos import gerar_manifesto
+
+destino = os.path.join(app.instance_path, "estaticos.json")
+manifesto = gerar_manifesto(app.static_folder, destino)
+comprimidos = sum(1 for item in manifesto.values() if item["gz"] or item["br"])
+print(f"✅ {len(manifesto)} arquivos no manifesto ({comprimidos} com versão comprimida) em {destino}")
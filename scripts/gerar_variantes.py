@@ -0,0 +1,51 @@
+#esse arquivo gera as variantes (card/detalhe em AVIF, WebP e JPEG) das imagens de projetos já enviadas
+#use "python scripts\gerar_variantes.py" depois de atualizar; --refazer gera de novo as que já existem
+
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# adiciona a raiz do projeto ao sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# só o servidor pega tarefas da fila
+os.environ.setdefault("IFNEXUS_TAREFAS_NO_APP", "0")
+
+from app import app
+from extensions import db
+from models import Projeto
+from services.imagens import gerar_variantes, formatos_disponiveis
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--refazer", action="store_true", help="gera de novo mesmo as que já têm variantes")
+parser.add_argument("--workers", type=int, default=2)
+args = parser.parse_args()
+
+formatos = formatos_disponiveis(app.config.get("IMAGENS_FORMATOS", ("avif", "webp")))
+if not formatos:
+    print("❌ Pillow não está instalado (pip install Pillow)")
+    sys.exit(1)
+
+
+def processar(caminho):
+    with app.app_context():
+        try:
+            return gerar_variantes(caminho, formatos, refazer=args.refazer) is not None
+        except Exception as e:
+            db.session.rollback()
+            print(f"  erro em {caminho}: {e}")
+            return False
+
+
+with app.app_context():
+    caminhos = sorted({
+        img.strip()
+        for (estrutura,) in db.session.query(Projeto.estrutura).filter(Projeto.estrutura.isnot(None))
+        for img in estrutura.split(',') if img.strip()
+    })
+
+with ThreadPoolExecutor(max_workers=args.workers) as pool:
+    resultados = list(pool.map(processar, caminhos))
+
+print(f"✅ Variantes ({', '.join(formatos)}) geradas para {sum(resultados)} de {len(caminhos)} imagens")
@@ -0,0 +1,22 @@
+#esse arquivo aplica as migrações pendentes no banco (pasta migrations/)
+#use "python scripts\migrar.py" antes de subir uma versão nova com IFNEXUS_MIGRAR_AO_INICIAR=0
+
+import sys
+import os
+
+# adiciona a raiz do projeto ao sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("IFNEXUS_MIGRAR_AO_INICIAR", "0")
+# só o servidor pega tarefas da fila
+os.environ.setdefault("IFNEXUS_TAREFAS_NO_APP", "0")
+
+from app import app
+from migrations import aplicar_migracoes, listar_migracoes, versoes_aplicadas
+
+with app.app_context():
+    novas = aplicar_migracoes(saida=print)
+    aplicadas = versoes_aplicadas()
+    for versao, nome in listar_migracoes():
+        print(f"  [{'x' if versao in aplicadas else ' '}] {versao}_{nome}")
+    print(f"✅ {len(novas)} migração(ões) aplicada(s)")
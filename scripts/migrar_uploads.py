@@ -0,0 +1,65 @@
+#esse arquivo move os uploads antigos (static/uploads/projetos/<titulo>/...) para o armazenamento
+#por hash (static/uploads/objetos/) e atualiza projetos.arquivo/estrutura
+#use "python scripts\migrar_uploads.py" uma vez; depois rode scripts\gerar_variantes.py
+
+import os
+import sys
+
+# adiciona a raiz do projeto ao sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# só o servidor pega tarefas da fila
+os.environ.setdefault("IFNEXUS_TAREFAS_NO_APP", "0")
+
+from app import app
+from extensions import db
+from models import Projeto
+from services.armazenamento import armazenamento, remover_orfaos, sincronizar_arquivos, ArquivoInvalido
+from services.projetos import invalidar_cache_projeto
+
+
+def migrar(chave, salvar):
+    # devolve a chave nova, ou a antiga se o arquivo não existe / não é de um tipo aceito
+    if chave.startswith(armazenamento.backend.prefixo + '/'):
+        return chave
+    caminho = armazenamento.caminho(chave)
+    if not os.path.isfile(caminho):
+        print(f"  arquivo não encontrado: {chave}")
+        return chave
+    with open(caminho, 'rb') as arquivo:
+        try:
+            return salvar(arquivo)
+        except ArquivoInvalido as e:
+            print(f"  mantido {chave}: {e}")
+            return chave
+
+
+with app.app_context():
+    antigos = set()
+    alterados = []
+
+    for projeto in Projeto.query.filter(db.or_(Projeto.estrutura.isnot(None), Projeto.arquivo.isnot(None))):
+        imagens = [c.strip() for c in (projeto.estrutura or '').split(',') if c.strip()]
+        novas = []
+        for chave in imagens:
+            nova = migrar(chave, armazenamento.salvar_imagem)
+            if nova not in novas:
+                novas.append(nova)
+        arquivo = migrar(projeto.arquivo, armazenamento.salvar_documento) if projeto.arquivo else None
+
+        if novas != imagens or arquivo != projeto.arquivo:
+            antigos.update(c for c in imagens if c not in novas)
+            if arquivo != projeto.arquivo:
+                antigos.add(projeto.arquivo)
+                projeto.arquivo_nome = projeto.arquivo_nome or os.path.basename(projeto.arquivo)
+            projeto.estrutura = ",".join(novas) if novas else projeto.estrutura
+            projeto.arquivo = arquivo
+            sincronizar_arquivos(projeto)
+            alterados.append(projeto.id)
+
+    db.session.commit()
+    for projeto_id in alterados:
+        invalidar_cache_projeto(projeto_id)
+    removidos = remover_orfaos(antigos)
+
+    print(f"✅ {len(alterados)} projetos atualizados, {removidos} arquivos antigos removidos")
@@ -0,0 +1,19 @@
+#esse arquivo recalcula projetos.curtidas a partir da tabela de curtidas
+#e remove curtidas duplicadas do mesmo usuário no mesmo projeto
+#use "python scripts\recalcular_curtidas.py" (de preferência com o site parado se CURTIDAS_AGRUPADAS estiver ligado)
+
+import sys
+import os
+
+# adiciona a raiz do projeto ao sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# só o servidor pega tarefas da fila
+os.environ.setdefault("IFNEXUS_TAREFAS_NO_APP", "0")
+
+from app import app
+from services.curtidas import recalcular_curtidas
+
+with app.app_context():
+    removidas, corrigidos = recalcular_curtidas()
+    print(f"✅ Curtidas recalculadas: {corrigidos} contadores corrigidos, {removidas} duplicadas removidas")
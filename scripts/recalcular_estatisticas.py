@@ -0,0 +1,26 @@
+#esse arquivo recalcula os contadores de engajamento (services/estatisticas.py) a partir das
+#tabelas: comentários por projeto e projetos/curtidas/comentários recebidos por usuário
+#antes corrige projetos.curtidas (mesmo que scripts/recalcular_curtidas.py), que é a base das curtidas recebidas
+#use "python scripts\recalcular_estatisticas.py" (de preferência com o site parado se CURTIDAS_AGRUPADAS estiver ligado)
+
+import sys
+import os
+
+# adiciona a raiz do projeto ao sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# só o servidor pega tarefas da fila
+os.environ.setdefault("IFNEXUS_TAREFAS_NO_APP", "0")
+
+from app import app
+from extensions import db
+from services.curtidas import recalcular_curtidas
+from services.estatisticas import recalcular_estatisticas
+
+with app.app_context():
+    removidas, curtidas_corrigidas = recalcular_curtidas()
+    comentarios_corrigidos, usuarios = recalcular_estatisticas()
+    db.session.commit()
+    print(f"✅ Contadores recalculados: {curtidas_corrigidas} contadores de curtidas e "
+          f"{comentarios_corrigidos} de comentários corrigidos, {usuarios} usuários recontados "
+          f"({removidas} curtidas duplicadas removidas)")
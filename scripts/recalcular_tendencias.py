@@ -0,0 +1,20 @@
+#esse arquivo recalcula "em alta" e "top do semestre" (projetos.tendencia, curtidas_semestre e
+#semestre) a partir das datas das curtidas e dos comentários
+#use "python scripts\recalcular_tendencias.py" depois de mudar TENDENCIA_MEIA_VIDA_HORAS
+#ou TENDENCIA_PESO_COMENTARIO
+
+import sys
+import os
+
+# adiciona a raiz do projeto ao sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# só o servidor pega tarefas da fila
+os.environ.setdefault("IFNEXUS_TAREFAS_NO_APP", "0")
+
+from app import app
+from services.tendencias import recalcular_tendencias
+
+with app.app_context():
+    projetos = recalcular_tendencias()
+    print(f"✅ Tendências recalculadas: {projetos} projetos com curtidas ou comentários datados")
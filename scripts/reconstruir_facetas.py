@@ -0,0 +1,19 @@
+#esse arquivo recalcula as contagens de projetos por curso e tipo (filtros da listagem)
+#use "python scripts\reconstruir_facetas.py" se as contagens ficarem inconsistentes
+
+import sys
+import os
+
+# adiciona a raiz do projeto ao sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# só o servidor pega tarefas da fila
+os.environ.setdefault("IFNEXUS_TAREFAS_NO_APP", "0")
+
+from app import app
+from services.facetas import reconstruir_facetas, listar_facetas
+
+with app.app_context():
+    reconstruir_facetas()
+    facetas = listar_facetas()
+    print(f"✅ Facetas recalculadas: {len(facetas['curso'])} cursos, {len(facetas['tipo'])} tipos")
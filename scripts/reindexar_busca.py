@@ -0,0 +1,19 @@
+#esse arquivo reconstrói o índice de busca dos projetos a partir do banco
+#use "python scripts\reindexar_busca.py" depois de importar dados ou em bancos antigos
+
+import sys
+import os
+
+# adiciona a raiz do projeto ao sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# só o servidor pega tarefas da fila
+os.environ.setdefault("IFNEXUS_TAREFAS_NO_APP", "0")
+
+from app import app
+from services.busca import reconstruir_indice, usa_fts
+
+with app.app_context():
+    total = reconstruir_indice()
+    modo = "FTS5" if usa_fts() else "LIKE (sem FTS5)"
+    print(f"✅ Índice de busca reconstruído: {total} projetos ({modo})")
@@ -0,0 +1,84 @@
+#servidor OAuth falso com as mesmas rotas que o app usa do SUAP, para testar (e testar a carga
+#do) login via SUAP sem rede e sem contas reais:
+#   python scripts/suap_falso.py --porta 5050
+#   IFNEXUS_SUAP_URL=http://127.0.0.1:5050 python app.py
+#
+#/o/authorize/ devolve direto para o callback com code=<n> (escolha com ?usuario=n, senão sorteia
+#entre --usuarios); o token é "falso-<n>" e /api/eu/ responde o perfil do aluno n. Um teste de
+#carga pode pular o navegador e chamar /auth/callback_suap?code=<n> no app
+#
+#--atraso e --erros simulam o SUAP lento ou instável da semana de matrícula
+
+import argparse
+import random
+import time
+from urllib.parse import urlencode
+
+from flask import Flask, abort, jsonify, redirect, request
+
+parser = argparse.ArgumentParser(description="SUAP falso para desenvolvimento e testes de carga")
+parser.add_argument("--porta", type=int, default=5050)
+parser.add_argument("--usuarios", type=int, default=1000, help="quantos alunos diferentes existem")
+parser.add_argument("--atraso", type=int, default=0, help="atraso em ms em cada resposta")
+parser.add_argument("--erros", type=float, default=0.0, help="fração das respostas que vira 503 (0 a 1)")
+args = parser.parse_args()
+
+app = Flask(__name__)
+
+
+@app.before_request
+def simular_instabilidade():
+    if args.atraso:
+        time.sleep(args.atraso / 1000)
+    if args.erros and random.random() < args.erros:
+        return jsonify({"detail": "Serviço indisponível"}), 503
+
+
+@app.route("/o/authorize/")
+def autorizar():
+    redirect_uri = request.args.get("redirect_uri")
+    if not redirect_uri:
+        abort(400)
+    usuario = request.args.get("usuario", type=int)
+    if usuario is None:
+        usuario = random.randrange(args.usuarios)
+    return redirect(f"{redirect_uri}?{urlencode({'code': usuario})}")
+
+
+@app.route("/o/token/", methods=["POST"])
+def token():
+    code = request.form.get("code", "")
+    if request.form.get("grant_type") != "authorization_code" or not code.isdigit():
+        return jsonify({"error": "invalid_grant"}), 400
+    return jsonify({
+        "access_token": f"falso-{code}",
+        "token_type": "Bearer",
+        "expires_in": 36000,
+        "scope": "identificacao email",
+    })
+
+
+@app.route("/api/eu/")
+def eu():
+    autorizacao = request.headers.get("Authorization", "")
+    token = autorizacao.removeprefix("Bearer ")
+    if not token.startswith("falso-") or not token[len("falso-"):].isdigit():
+        return jsonify({"detail": "As credenciais de autenticação não foram fornecidas."}), 401
+
+    n = int(token[len("falso-"):])
+    return jsonify({
+        "identificacao": f"2025{n:07d}",
+        "nome": f"Aluno Teste {n}",
+        "nome_usual": f"Aluno {n}",
+        "email": f"aluno{n}@escolar.ifrn.edu.br",
+        "cpf": f"{n:011d}",
+        "data_de_nascimento": "2006-01-01",
+        "tipo_usuario": "Aluno",
+        "campus": "CNAT",
+        "foto": None,
+    })
+
+
+if __name__ == "__main__":
+    print(f"✅ SUAP falso em http://127.0.0.1:{args.porta} ({args.usuarios} alunos)")
+    app.run(port=args.porta, threaded=True)
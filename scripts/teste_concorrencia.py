@@ -0,0 +1,107 @@
+#esse arquivo simula vários workers escrevendo ao mesmo tempo (curtidas e comentários)
+#num banco SQLite temporário e conta quantas requisições falharam ("database is locked" etc.)
+#use "python scripts\teste_concorrencia.py" (perfil de produção) ou com --sem-pragmas para comparar
+#sai com código 1 se alguma escrita falhar
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+
+# adiciona a raiz do projeto ao sys.path
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+
+
+def carregar_app(caminho_banco, sem_pragmas):
+    os.environ["DATABASE_URL"] = f"sqlite:///{caminho_banco}"
+    os.environ.setdefault("IFNEXUS_PERFIL", "producao")
+    os.environ.setdefault("IFNEXUS_TAREFAS_NO_APP", "0")
+    import config
+    if sem_pragmas:
+        config.Config.SQLITE_PRAGMAS = {}
+        config.ProducaoConfig.SQLITE_PRAGMAS = {}
+        # sem busy_timeout o driver ainda espera 5s por padrão; zera para ver o problema original
+        config.Config.SQLALCHEMY_ENGINE_OPTIONS = {"connect_args": {"timeout": 0}}
+        config.ProducaoConfig.SQLALCHEMY_ENGINE_OPTIONS = {"connect_args": {"timeout": 0}}
+    from app import app
+    return app
+
+
+def preparar(caminho_banco, workers):
+    app = carregar_app(caminho_banco, False)
+    from extensions import db, bcrypt
+    from models import Usuario, Projeto
+
+    with app.app_context():
+        senha = bcrypt.generate_password_hash("123").decode("utf-8")
+        for i in range(workers):
+            db.session.add(Usuario(nome=f"Worker {i}", email=f"w{i}@if.edu.br", senha=senha, tipo_usuario="Aluno"))
+        db.session.flush()
+        db.session.add(Projeto(titulo="Concorrência", descricao="teste", curso="Informática", usuario_id=1, curtidas=0))
+        db.session.commit()
+
+
+def trabalhador(args):
+    caminho_banco, indice, repeticoes, sem_pragmas = args
+    try:
+        # a inicialização do app também escreve no banco (migrações, índices)
+        app = carregar_app(caminho_banco, sem_pragmas)
+        cliente = app.test_client()
+        cliente.post("/auth/login", data={"email": f"w{indice}@if.edu.br", "senha": "123"})
+    except Exception as e:
+        return [f"inicialização: {e!r}"]
+
+    erros = []
+    for i in range(repeticoes):
+        try:
+            r = cliente.post("/projeto/1/curtir")
+            if r.status_code != 200:
+                erros.append(f"curtir {r.status_code}: {r.get_json()}")
+            r = cliente.post("/projeto/1/comentario", data={"conteudo": f"comentário {indice}-{i}"})
+            if r.status_code != 302:
+                erros.append(f"comentar {r.status_code}")
+        except Exception as e:
+            erros.append(repr(e))
+    return erros
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--repeticoes", type=int, default=50)
+    parser.add_argument("--sem-pragmas", action="store_true", help="roda sem WAL/busy_timeout para comparar")
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp(prefix="ifnexus-concorrencia-")
+    caminho_banco = os.path.join(pasta, "concorrencia.db")
+    preparar(caminho_banco, args.workers)
+
+    with multiprocessing.get_context("spawn").Pool(args.workers) as pool:
+        resultados = pool.map(
+            trabalhador,
+            [(caminho_banco, i, args.repeticoes, args.sem_pragmas) for i in range(args.workers)],
+        )
+
+    erros = [e for lista in resultados for e in lista]
+    total = args.workers * args.repeticoes * 2
+
+    app = carregar_app(caminho_banco, False)
+    from extensions import db
+    from models import Projeto, Curtida
+    with app.app_context():
+        contador = db.session.get(Projeto, 1).curtidas
+        reais = Curtida.query.filter_by(projeto_id=1).count()
+
+    print(f"{total} escritas, {len(erros)} falhas; contador={contador} curtidas reais={reais}")
+    for erro in erros[:10]:
+        print("  ", erro)
+
+    if erros or contador != reais:
+        sys.exit(1)
+    print("✅ nenhuma escrita falhou e o contador bate com as curtidas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#esse arquivo roda o trabalhador da fila de tarefas fora do app (services/tarefas.py)
+#use "python scripts\trabalhador.py" com o app rodando com IFNEXUS_TAREFAS_NO_APP=0
+#  --uma-vez  executa o que estiver pendente e sai
+#  --status   mostra quantas tarefas há em cada estado e os erros recentes
+#  --limpar N apaga as concluídas há mais de N dias
+
+import argparse
+import json
+import os
+import signal
+import sys
+
+# adiciona a raiz do projeto ao sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("IFNEXUS_TAREFAS_NO_APP", "0")
+
+from app import app
+from services.tarefas import Trabalhador, executar_pendentes, recuperar_travadas, resumo_tarefas, limpar_concluidas
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--threads", type=int, default=app.config.get("TAREFAS_THREADS", 2))
+parser.add_argument("--uma-vez", action="store_true")
+parser.add_argument("--status", action="store_true")
+parser.add_argument("--limpar", type=int, metavar="DIAS")
+args = parser.parse_args()
+
+with app.app_context():
+    if args.status:
+        print(json.dumps(resumo_tarefas(), indent=2, ensure_ascii=False))
+        sys.exit(0)
+    if args.limpar is not None:
+        print(f"✅ {limpar_concluidas(args.limpar)} tarefas concluídas removidas")
+        sys.exit(0)
+    if args.uma_vez:
+        recuperar_travadas()
+        print(f"✅ {executar_pendentes()} tarefas executadas")
+        sys.exit(0)
+
+trabalhador = Trabalhador(app, threads=args.threads, intervalo=app.config.get("TAREFAS_INTERVALO", 1.0))
+signal.signal(signal.SIGTERM, lambda *_: trabalhador.parar(esperar=False))
+trabalhador.iniciar()
+print(f"✅ trabalhador rodando com {args.threads} threads (Ctrl+C para parar)")
+try:
+    trabalhador.aguardar()
+except KeyboardInterrupt:
+    pass
+trabalhador.parar()
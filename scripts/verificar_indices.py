@@ -0,0 +1,22 @@
+#esse arquivo confere com EXPLAIN QUERY PLAN se as consultas mais usadas usam índice
+#use "python scripts\verificar_indices.py"; sai com código 1 se alguma varre a tabela inteira
+
+import sys
+import os
+
+# adiciona a raiz do projeto ao sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# só o servidor pega tarefas da fila
+os.environ.setdefault("IFNEXUS_TAREFAS_NO_APP", "0")
+
+from app import app
+from utils.consultas import planos_com_varredura, CONSULTAS_QUENTES
+
+with app.app_context():
+    problemas = planos_com_varredura()
+    for nome, plano in problemas.items():
+        print(f"❌ {nome}: {' | '.join(plano)}")
+    if problemas:
+        sys.exit(1)
+    print(f"✅ {len(CONSULTAS_QUENTES)} consultas usando índice")
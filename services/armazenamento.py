@@ -0,0 +1,250 @@
+#armazenamento dos uploads endereçado pelo conteúdo (sha256)
+#o arquivo é gravado em pedaços enquanto o hash é calculado; o nome final é o próprio hash,
+#então o mesmo PDF/imagem enviado por dois projetos fica uma vez só no disco
+#
+#layouts: "plano" (objetos/<hash>.pdf) ou "fragmentado" (objetos/ab/cd/<hash>.pdf, padrão),
+#que mantém poucas entradas por pasta. Para vários servidores, monte o mesmo volume em
+#static/uploads/objetos; a gravação é atômica (os.replace), então escritas simultâneas do
+#mesmo conteúdo não corrompem nada
+#
+#arquivos_projeto diz quais projetos usam cada chave; um arquivo sem uso só é apagado pela fila
+#(remover_orfaos) e, se foi gravado ou reaproveitado há pouco, espera: o projeto que acabou de
+#recebê-lo pode não ter feito o commit ainda
+
+import hashlib
+import os
+import tempfile
+import time
+
+from extensions import db
+from models import ArquivoProjeto
+from services.imagens import remover_variantes
+from services.tarefas import tarefa, enfileirar
+from utils.paths import STATIC_DIR, UPLOADS_DIR
+
+TAMANHO_PEDACO = 64 * 1024
+# arquivo gravado/reaproveitado há menos que isso não é apagado (a remoção é tentada de novo depois)
+JANELA_REUSO = 600
+
+# assinatura (primeiros bytes) de cada tipo aceito; a extensão salva vem daqui, não do nome enviado
+TIPOS_IMAGEM = {
+    'jpg': (b'\xff\xd8\xff',),
+    'png': (b'\x89PNG\r\n\x1a\n',),
+    'gif': (b'GIF87a', b'GIF89a'),
+    'webp': (b'RIFF',),
+}
+TIPOS_DOCUMENTO = {
+    'pdf': (b'%PDF-',),
+    'doc': (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',),
+    'docx': (b'PK\x03\x04',),
+}
+
+
+class ArquivoInvalido(ValueError):
+    pass
+
+
+def detectar_tipo(inicio, tipos):
+    for extensao, assinaturas in tipos.items():
+        for assinatura in assinaturas:
+            if inicio.startswith(assinatura):
+                if extensao == 'webp' and inicio[8:12] != b'WEBP':
+                    continue
+                return extensao
+    return None
+
+
+class ArmazenamentoLocal:
+    # layout plano: <raiz>/<hash>.<ext>
+
+    def __init__(self, raiz, prefixo):
+        self.raiz = raiz
+        self.prefixo = prefixo  # caminho da raiz relativo a static/, usado nas chaves
+
+    def relativo(self, hash_, extensao):
+        return f"{hash_}.{extensao}"
+
+    def chave(self, hash_, extensao):
+        return f"{self.prefixo}/{self.relativo(hash_, extensao)}"
+
+    def caminho(self, chave):
+        # chaves são relativas a static/ (como o que já fica em projetos.arquivo/estrutura)
+        return os.path.join(STATIC_DIR, *chave.split('/'))
+
+    def existe(self, chave):
+        return os.path.isfile(self.caminho(chave))
+
+    def modificado_em(self, chave):
+        try:
+            return os.path.getmtime(self.caminho(chave))
+        except FileNotFoundError:
+            return None
+
+    def salvar(self, arquivo, tipos, tamanho_maximo):
+        # arquivo: FileStorage (ou qualquer objeto com .stream/.read); devolve a chave
+        tamanho_declarado = getattr(arquivo, 'content_length', None)
+        if tamanho_declarado and tamanho_declarado > tamanho_maximo:
+            raise ArquivoInvalido(f"Arquivo maior que {tamanho_maximo // (1024 * 1024)} MB")
+
+        stream = getattr(arquivo, 'stream', arquivo)
+        inicio = stream.read(TAMANHO_PEDACO)
+        extensao = detectar_tipo(inicio, tipos)
+        if extensao is None:
+            raise ArquivoInvalido(f"Tipo de arquivo não permitido (aceitos: {', '.join(tipos)})")
+
+        pasta_tmp = os.path.join(self.raiz, '.tmp')
+        os.makedirs(pasta_tmp, exist_ok=True)
+        hash_ = hashlib.sha256()
+        tamanho = 0
+        fd, temporario = tempfile.mkstemp(dir=pasta_tmp)
+        try:
+            with os.fdopen(fd, 'wb') as destino:
+                pedaco = inicio
+                while pedaco:
+                    tamanho += len(pedaco)
+                    if tamanho > tamanho_maximo:
+                        raise ArquivoInvalido(f"Arquivo maior que {tamanho_maximo // (1024 * 1024)} MB")
+                    hash_.update(pedaco)
+                    destino.write(pedaco)
+                    pedaco = stream.read(TAMANHO_PEDACO)
+
+            chave = self.chave(hash_.hexdigest(), extensao)
+            final = self.caminho(chave)
+            if os.path.exists(final):
+                # mesmo conteúdo já armazenado; o mtime marca o reuso para remover_orfaos
+                os.remove(temporario)
+                os.utime(final)
+            else:
+                os.makedirs(os.path.dirname(final), exist_ok=True)
+                os.chmod(temporario, 0o644)
+                os.replace(temporario, final)
+            return chave
+        except BaseException:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+    def remover(self, chave):
+        try:
+            os.remove(self.caminho(chave))
+            return True
+        except FileNotFoundError:
+            return False
+
+
+class ArmazenamentoFragmentado(ArmazenamentoLocal):
+    # <raiz>/ab/cd/<hash>.<ext>: evita pastas com dezenas de milhares de arquivos
+
+    def relativo(self, hash_, extensao):
+        return f"{hash_[:2]}/{hash_[2:4]}/{hash_}.{extensao}"
+
+    def remover(self, chave):
+        removido = super().remover(chave)
+        # apaga as pastas ab/cd que ficaram vazias
+        pasta = os.path.dirname(self.caminho(chave))
+        for _ in range(2):
+            try:
+                os.rmdir(pasta)
+            except OSError:
+                break
+            pasta = os.path.dirname(pasta)
+        return removido
+
+
+LAYOUTS = {
+    'plano': ArmazenamentoLocal,
+    'fragmentado': ArmazenamentoFragmentado,
+}
+
+
+class Armazenamento:
+    # ponto único usado pelo resto do app; o layout vem de ARMAZENAMENTO_LAYOUT
+
+    def __init__(self):
+        self.backend = ArmazenamentoFragmentado(os.path.join(UPLOADS_DIR, 'objetos'), 'uploads/objetos')
+        self.limite_imagem = 8 * 1024 * 1024
+        self.limite_documento = 20 * 1024 * 1024
+
+    def init_app(self, app):
+        layout = LAYOUTS[app.config.get("ARMAZENAMENTO_LAYOUT", "fragmentado")]
+        self.backend = layout(os.path.join(UPLOADS_DIR, 'objetos'), 'uploads/objetos')
+        self.limite_imagem = app.config.get("LIMITE_IMAGEM_MB", 8) * 1024 * 1024
+        self.limite_documento = app.config.get("LIMITE_DOCUMENTO_MB", 20) * 1024 * 1024
+
+    def salvar_imagem(self, arquivo):
+        return self.backend.salvar(arquivo, TIPOS_IMAGEM, self.limite_imagem)
+
+    def salvar_documento(self, arquivo):
+        return self.backend.salvar(arquivo, TIPOS_DOCUMENTO, self.limite_documento)
+
+    def caminho(self, chave):
+        return self.backend.caminho(chave)
+
+    def existe(self, chave):
+        return self.backend.existe(chave)
+
+    def modificado_em(self, chave):
+        return self.backend.modificado_em(chave)
+
+    def remover(self, chave):
+        return self.backend.remover(chave)
+
+
+armazenamento = Armazenamento()
+
+
+def arquivos_do_projeto(projeto):
+    chaves = [c.strip() for c in (projeto.estrutura or '').split(',') if c.strip()]
+    if projeto.arquivo:
+        chaves.append(projeto.arquivo)
+    return chaves
+
+
+def sincronizar_arquivos(projeto):
+    # arquivos_projeto igual a arquivos_do_projeto(projeto); na transação de quem salva o projeto
+    chaves = set(arquivos_do_projeto(projeto))
+    atuais = {c for (c,) in db.session.query(ArquivoProjeto.chave).filter_by(projeto_id=projeto.id)}
+    if atuais - chaves:
+        db.session.execute(
+            db.delete(ArquivoProjeto)
+            .where(ArquivoProjeto.projeto_id == projeto.id, ArquivoProjeto.chave.in_(atuais - chaves))
+            .execution_options(synchronize_session=False)
+        )
+    if chaves - atuais:
+        db.session.execute(db.insert(ArquivoProjeto),
+                           [{'chave': c, 'projeto_id': projeto.id} for c in sorted(chaves - atuais)])
+
+
+def em_uso(chave):
+    # busca no índice único (chave, projeto_id)
+    return db.session.query(ArquivoProjeto.query.filter(ArquivoProjeto.chave == chave).exists()).scalar()
+
+
+@tarefa('remover_arquivos')
+def remover_orfaos(chaves):
+    # roda depois do commit (pela fila): apaga só os arquivos que nenhum projeto usa mais
+    # (com dedupe o mesmo arquivo pode pertencer a vários projetos)
+    removidos = 0
+    recentes = []
+    for chave in set(chaves):
+        if not chave or em_uso(chave):
+            continue
+        modificado_em = armazenamento.modificado_em(chave)
+        if modificado_em and time.time() - modificado_em < JANELA_REUSO:
+            # outro upload acabou de gravar/reaproveitar o mesmo conteúdo
+            recentes.append(chave)
+            continue
+        remover_variantes([chave])
+        if armazenamento.remover(chave):
+            removidos += 1
+    if recentes:
+        enfileirar('remover_arquivos', {'chaves': sorted(recentes)}, atraso=JANELA_REUSO)
+    db.session.commit()
+    return removidos
+
+
+def agendar_remocao(chaves):
+    # na mesma transação que deixou os arquivos sem uso
+    chaves = sorted({c for c in chaves if c})
+    if chaves:
+        enfileirar('remover_arquivos', {'chaves': chaves})
@@ -0,0 +1,150 @@
+#indice de busca textual dos projetos
+#usa uma tabela virtual FTS5 (ranking bm25, prefixo) quando o SQLite suporta;
+#caso contrario cai para uma tabela comum consultada com LIKE
+
+import re
+import unicodedata
+
+from sqlalchemy import inspect
+from sqlalchemy.exc import OperationalError
+
+from extensions import db
+
+TABELA = "projetos_busca"
+COLUNAS = ("titulo", "subtitulo", "descricao", "curso", "tipo", "autores")
+
+# pesos do bm25 na mesma ordem de COLUNAS
+PESOS = (10.0, 4.0, 1.0, 2.0, 2.0, 5.0)
+
+_estado = {"fts": None}
+
+
+def normalizar(texto):
+    # minusculas e sem acentos: "Informática" -> "informatica"
+    if not texto:
+        return ""
+    decomposto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def termos(q):
+    return re.findall(r"\w+", normalizar(q))
+
+
+def usa_fts():
+    return bool(_estado["fts"])
+
+
+def init_busca():
+    # cria o indice se ainda nao existir; chamado dentro do app_context
+    novo = not inspect(db.engine).has_table(TABELA)
+
+    with db.engine.begin() as conn:
+        _estado["fts"] = False
+        if db.engine.dialect.name == "sqlite":
+            try:
+                conn.exec_driver_sql(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA} USING fts5("
+                    + ", ".join(COLUNAS)
+                    + ", tokenize='unicode61 remove_diacritics 2')"
+                )
+                _estado["fts"] = True
+            except OperationalError:
+                # SQLite compilado sem FTS5
+                pass
+
+        if not usa_fts():
+            conn.exec_driver_sql(
+                f"CREATE TABLE IF NOT EXISTS {TABELA} ("
+                "projeto_id INTEGER PRIMARY KEY, "
+                + ", ".join(f"{c} TEXT" for c in COLUNAS)
+                + ")"
+            )
+
+    # banco que ja tinha projetos antes do indice existir
+    if novo:
+        reconstruir_indice()
+
+
+def _nomes_autores(projeto_id, dono_id):
+    linhas = db.session.execute(
+        db.text(
+            "SELECT nome FROM usuarios WHERE id = :dono "
+            "OR id IN (SELECT usuario_id FROM autor WHERE projeto_id = :pid)"
+        ),
+        {"dono": dono_id, "pid": projeto_id},
+    )
+    return " ".join(nome for (nome,) in linhas if nome)
+
+
+def _documento(projeto):
+    return {
+        "titulo": normalizar(projeto.titulo),
+        "subtitulo": normalizar(projeto.subtitulo),
+        "descricao": normalizar(projeto.descricao),
+        "curso": normalizar(projeto.curso),
+        "tipo": normalizar(projeto.tipo),
+        "autores": normalizar(_nomes_autores(projeto.id, projeto.usuario_id)),
+    }
+
+
+def remover_projeto(projeto_id):
+    chave = "rowid" if usa_fts() else "projeto_id"
+    db.session.execute(
+        db.text(f"DELETE FROM {TABELA} WHERE {chave} = :pid"), {"pid": projeto_id}
+    )
+
+
+def indexar_projeto(projeto):
+    # roda na mesma transacao da escrita do projeto; o commit fica com quem chamou
+    remover_projeto(projeto.id)
+    chave = "rowid" if usa_fts() else "projeto_id"
+    doc = _documento(projeto)
+    doc["pid"] = projeto.id
+    db.session.execute(
+        db.text(
+            f"INSERT INTO {TABELA} ({chave}, {', '.join(COLUNAS)}) "
+            f"VALUES (:pid, {', '.join(':' + c for c in COLUNAS)})"
+        ),
+        doc,
+    )
+
+
+def reconstruir_indice():
+    from models import Projeto
+
+    db.session.execute(db.text(f"DELETE FROM {TABELA}"))
+    total = 0
+    for projeto in Projeto.query.yield_per(500):
+        indexar_projeto(projeto)
+        total += 1
+    if usa_fts():
+        db.session.execute(db.text(f"INSERT INTO {TABELA}({TABELA}) VALUES ('optimize')"))
+    db.session.commit()
+    return total
+
+
+def subconsulta(q):
+    # devolve (projeto_id, rank) dos projetos que casam com q; rank menor = mais relevante
+    palavras = termos(q)
+    if not palavras:
+        return None
+
+    if usa_fts():
+        # cada termo vira prefixo ("infor"*) e todos precisam aparecer
+        expressao = " ".join(f'"{p}"*' for p in palavras)
+        pesos = ", ".join(str(p) for p in PESOS)
+        sql = db.text(
+            f"SELECT rowid AS projeto_id, bm25({TABELA}, {pesos}) AS rank "
+            f"FROM {TABELA} WHERE {TABELA} MATCH :expressao"
+        ).bindparams(expressao=expressao)
+    else:
+        documento = " || ' ' || ".join(f"COALESCE({c}, '')" for c in COLUNAS)
+        filtros = " AND ".join(f"({documento}) LIKE :t{i}" for i in range(len(palavras)))
+        # sem bm25: acerto no titulo pesa mais que no resto
+        rank = " + ".join(f"(CASE WHEN titulo LIKE :t{i} THEN -10 ELSE -1 END)" for i in range(len(palavras)))
+        sql = db.text(
+            f"SELECT projeto_id, {rank} AS rank FROM {TABELA} WHERE {filtros}"
+        ).bindparams(**{f"t{i}": f"%{p}%" for i, p in enumerate(palavras)})
+
+    return sql.columns(projeto_id=db.Integer, rank=db.Float).subquery("busca")
@@ -0,0 +1,73 @@
+#comentários de um projeto em lotes (do mais novo para o mais antigo), paginados por cursor
+#(keyset) em (criado_em, id): cada lote é uma busca no índice (projeto_id, criado_em), sem OFFSET
+#
+#a página do projeto renderiza o primeiro lote e o resto vem de /projeto/<id>/comentarios
+#conforme o usuário rola; o "há N minutos" é calculado no navegador (data-ts-ms), então o HTML
+#só muda quando o projeto muda
+
+from datetime import datetime, timedelta
+
+from flask import url_for
+from sqlalchemy import tuple_
+from sqlalchemy.orm import joinedload
+
+from models import Comentario
+
+POR_PAGINA = 20
+
+_EPOCA = datetime(1970, 1, 1)
+
+
+def _microssegundos(data):
+    return (data - _EPOCA) // timedelta(microseconds=1)
+
+
+def gerar_cursor(comentario):
+    # cursor é "microssegundos desde 1970.id" (criado_em é UTC sem fuso)
+    return f'{_microssegundos(comentario.criado_em)}.{comentario.id}'
+
+
+def ler_cursor(valor):
+    if not valor:
+        return None
+    try:
+        micros, comentario_id = (int(p) for p in valor.split('.'))
+    except ValueError:
+        return None
+    return _EPOCA + timedelta(microseconds=micros), comentario_id
+
+
+def pagina_comentarios(projeto_id, apos=None, por_pagina=POR_PAGINA):
+    # devolve (comentários, cursor do próximo lote ou None); apos vem de ler_cursor
+    query = Comentario.query\
+        .options(joinedload(Comentario.usuario))\
+        .filter(Comentario.projeto_id == projeto_id)
+    if apos:
+        query = query.filter(tuple_(Comentario.criado_em, Comentario.id) < tuple_(*apos))
+    itens = query.order_by(Comentario.criado_em.desc(), Comentario.id.desc()).limit(por_pagina + 1).all()
+
+    proximo = gerar_cursor(itens[por_pagina - 1]) if len(itens) > por_pagina else None
+    return itens[:por_pagina], proximo
+
+
+def avatar_usuario(usuario):
+    if not usuario.foto:
+        return url_for('static', filename='img/geral/default-avatar.png')
+    if 'http' in usuario.foto:
+        return usuario.foto
+    return url_for('static', filename=f'uploads/users/{usuario.id}.jpg')
+
+
+def serializar(comentario):
+    # mesmo formato no HTML (primeiro lote) e no JSON (lotes seguintes)
+    return {
+        'id': comentario.id,
+        'conteudo': comentario.conteudo,
+        'ts_ms': _microssegundos(comentario.criado_em) // 1000,
+        'data': comentario.criado_em.strftime('%d/%m/%Y %H:%M'),
+        'autor': {
+            'id': comentario.usuario.id,
+            'nome': comentario.usuario.nome,
+            'avatar': avatar_usuario(comentario.usuario),
+        },
+    }
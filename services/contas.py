@@ -0,0 +1,162 @@
+#união da conta local com a conta do SUAP (primeiro login pelo SUAP de quem já tinha cadastro)
+#roda pela fila de tarefas: o callback do SUAP só enfileira e já loga o usuário
+#
+#tudo é feito com UPDATE/DELETE em conjunto, direto no banco, numa transação só: o custo não
+#depende de quantos comentários e curtidas a conta antiga tem, e uma falha no meio não deixa
+#a conta pela metade (a tarefa é repetida do zero)
+
+from datetime import datetime
+
+from extensions import db, cache
+from models import Usuario, Comentario, Curtida, Autor, Projeto
+from services.busca import indexar_projeto
+from services.estatisticas import recalcular_estatisticas
+from services.indice_usuarios import indice_usuarios
+from services.sessao import sessoes
+from services.tarefas import tarefa, enfileirar
+from services.tendencias import valores_tendencia, variacao_curtidas
+
+
+def _projetos_afetados(antigo_id):
+    # projetos cuja página mostra a conta antiga (dono, coautor, comentário ou curtida)
+    return db.union(
+        db.select(Projeto.id).where(Projeto.usuario_id == antigo_id),
+        db.select(Autor.projeto_id).where(Autor.usuario_id == antigo_id),
+        db.select(Comentario.projeto_id).where(Comentario.usuario_id == antigo_id),
+        db.select(Curtida.projeto_id).where(Curtida.usuario_id == antigo_id),
+    )
+
+
+def _mesclar_curtidas(antigo_id, novo_id):
+    # projeto curtido pelas duas contas: fica a curtida da conta nova; o contador perde 1 e a
+    # tendência/curtidas do semestre perdem o peso da curtida removida. O peso de cada projeto
+    # vai como parâmetro: um UPDATE (executemany) por tipo de curtida removida, não por projeto
+    repetidas = db.select(Curtida.projeto_id).where(Curtida.usuario_id == novo_id).scalar_subquery()
+    filtro = (Curtida.usuario_id == antigo_id, Curtida.projeto_id.in_(repetidas))
+    if db.engine.dialect.delete_returning:
+        removidas = db.session.execute(
+            db.delete(Curtida).where(*filtro).returning(Curtida.projeto_id, Curtida.criado_em)
+            .execution_options(synchronize_session=False)
+        ).all()
+    else:
+        removidas = db.session.query(Curtida.projeto_id, Curtida.criado_em).filter(*filtro).all()
+        db.session.execute(db.delete(Curtida).where(*filtro).execution_options(synchronize_session=False))
+
+    # (tem data, no semestre) -> parâmetros; o índice único deixa uma curtida removida por projeto
+    agora = datetime.utcnow()
+    grupos = {}
+    for projeto_id, criado_em in removidas:
+        variacao, curtidas_semestre = variacao_curtidas(-1, [criado_em], agora)
+        parametros = {'pid': projeto_id}
+        if variacao:
+            parametros['x'] = variacao[1]
+        grupos.setdefault((variacao is not None, curtidas_semestre), []).append(parametros)
+
+    novo = db.func.coalesce(Projeto.curtidas, 0) - 1
+    for (com_data, curtidas_semestre), parametros in grupos.items():
+        variacao = (-1, db.bindparam('x')) if com_data else None
+        db.session.execute(
+            db.update(Projeto.__table__)
+            .where(Projeto.id == db.bindparam('pid'))
+            .values(curtidas=db.case((novo < 0, 0), else_=novo),
+                    **valores_tendencia(variacao, curtidas_semestre, agora)),
+            parametros,
+        )
+    movidas = db.session.execute(
+        db.update(Curtida)
+        .where(Curtida.usuario_id == antigo_id)
+        .values(usuario_id=novo_id)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    return movidas, len(removidas)
+
+
+def _mesclar_autoria(antigo_id, novo_id):
+    # o dono nunca aparece em autor (ver gerenciar_projeto), e ninguém é coautor duas vezes
+    do_novo = db.select(Projeto.id).where(Projeto.usuario_id == novo_id).scalar_subquery()
+    coautor_novo = db.select(Autor.projeto_id).where(Autor.usuario_id == novo_id).scalar_subquery()
+    db.session.execute(
+        db.delete(Autor)
+        .where(Autor.usuario_id == antigo_id,
+               db.or_(Autor.projeto_id.in_(do_novo), Autor.projeto_id.in_(coautor_novo)))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(
+        db.update(Autor)
+        .where(Autor.usuario_id == antigo_id)
+        .values(usuario_id=novo_id)
+        .execution_options(synchronize_session=False)
+    )
+
+    # projetos da conta antiga passam para a nova; se ela era coautora deles, vira só dona
+    do_antigo = db.select(Projeto.id).where(Projeto.usuario_id == antigo_id).scalar_subquery()
+    db.session.execute(
+        db.delete(Autor)
+        .where(Autor.usuario_id == novo_id, Autor.projeto_id.in_(do_antigo))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(
+        db.update(Projeto)
+        .where(Projeto.usuario_id == antigo_id)
+        .values(usuario_id=novo_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+@tarefa('mesclar_contas')
+def mesclar_contas(antigo_id, novo_id):
+    existe = db.session.query(Usuario.query.filter_by(id=antigo_id).exists()).scalar()
+    if not existe or antigo_id == novo_id:
+        # já unida (tarefa repetida depois de um crash)
+        return None
+
+    # ids antes de mover as linhas; a nova versão (ETag) vai para as páginas que mostram a conta antiga
+    afetados = [pid for (pid,) in db.session.execute(_projetos_afetados(antigo_id))]
+    autoria = [pid for (pid,) in db.session.execute(db.union(
+        db.select(Projeto.id).where(Projeto.usuario_id == antigo_id),
+        db.select(Autor.projeto_id).where(Autor.usuario_id == antigo_id),
+    ))]
+    db.session.execute(
+        db.update(Projeto)
+        .where(Projeto.id.in_(_projetos_afetados(antigo_id)))
+        .values(versao=Projeto.versao + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+    movidas, removidas = _mesclar_curtidas(antigo_id, novo_id)
+    comentarios = db.session.execute(
+        db.update(Comentario)
+        .where(Comentario.usuario_id == antigo_id)
+        .values(usuario_id=novo_id)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    _mesclar_autoria(antigo_id, novo_id)
+
+    # curtidas/comentários recebidos e projetos da conta nova e das equipes dos projetos mexidos
+    # (curtidas repetidas saíram do contador): recontados a partir das tabelas
+    equipes = [novo_id]
+    if afetados:
+        equipes += [uid for (uid,) in db.session.execute(db.union(
+            db.select(Projeto.usuario_id).where(Projeto.id.in_(afetados)),
+            db.select(Autor.usuario_id).where(Autor.projeto_id.in_(afetados)),
+        ))]
+    recalcular_estatisticas(usuario_ids=set(equipes))
+
+    # o índice de busca guarda o nome dos autores
+    for projeto in Projeto.query.filter(Projeto.id.in_(autoria)) if autoria else ():
+        indexar_projeto(projeto)
+
+    db.session.execute(db.delete(Usuario).where(Usuario.id == antigo_id))
+    db.session.commit()
+
+    indice_usuarios.remover(antigo_id)
+    sessoes.esquecer(antigo_id, novo_id)
+    cache.invalidar(f'usuario:{antigo_id}', f'usuario:{novo_id}', 'ranking:top', 'listagem',
+                    *(f'projeto:{pid}' for pid in afetados))
+    return {'curtidas': movidas, 'curtidas_repetidas': removidas, 'comentarios': comentarios,
+            'projetos': len(afetados)}
+
+
+def agendar_mesclagem(antigo_id, novo_id):
+    enfileirar('mesclar_contas', {'antigo_id': antigo_id, 'novo_id': novo_id},
+               chave=f'mesclar:{antigo_id}:{novo_id}')
@@ -0,0 +1,275 @@
+#curtidas: alternância idempotente e contador atômico em projetos.curtidas
+#com CURTIDAS_AGRUPADAS = True os incrementos ficam em memória e são gravados em lote
+#
+#"quais destes projetos o usuário curtiu" consulta só os projetos da página (índice único
+#usuario_id, projeto_id); com CURTIDAS_CACHE_USUARIO = True o conjunto inteiro de cada usuário
+#fica no cache como um array ordenado de ints, invalidado a cada curtida
+#
+#cada curtida guarda criado_em; a mesma escrita do contador soma (ou desconta) o peso dela em
+#projetos.tendencia e curtidas_semestre (services/tendencias.py)
+
+import atexit
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db, cache
+from models import Curtida, Projeto
+from services.estatisticas import curtidas_recebidas
+from services.tendencias import valores_tendencia, variacao_curtidas, juntar
+
+
+def _inserir_curtida(usuario_id, projeto_id, agora):
+    # devolve 1 se inseriu, 0 se a curtida já existia (clique duplo, outra aba...)
+    valores = {'usuario_id': usuario_id, 'projeto_id': projeto_id, 'criado_em': agora}
+    dialeto = db.engine.dialect.name
+
+    if dialeto in ('sqlite', 'postgresql'):
+        if dialeto == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        comando = insert(Curtida).values(**valores).on_conflict_do_nothing(
+            index_elements=['usuario_id', 'projeto_id']
+        )
+        return db.session.execute(comando).rowcount
+
+    try:
+        with db.session.begin_nested():
+            db.session.execute(db.insert(Curtida).values(**valores))
+        return 1
+    except IntegrityError:
+        return 0
+
+
+def _remover_curtida(usuario_id, projeto_id):
+    # devolve as datas das curtidas removidas (nenhuma se já não existia)
+    filtro = (Curtida.usuario_id == usuario_id, Curtida.projeto_id == projeto_id)
+    if db.engine.dialect.delete_returning:
+        return db.session.execute(
+            db.delete(Curtida).where(*filtro).returning(Curtida.criado_em)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+
+    datas = [d for (d,) in db.session.query(Curtida.criado_em).filter(*filtro)]
+    removidas = db.session.execute(db.delete(Curtida).where(*filtro)).rowcount
+    # outra requisição removeu antes: não desconta nada
+    return datas[:removidas]
+
+
+def ajustar_contador(projeto_id, delta, variacao=None, curtidas_semestre=0):
+    # UPDATE curtidas = curtidas + delta direto no banco, sem ler para o Python
+    # (a versão também sobe: o contador aparece na página; atualizado_em vem do onupdate)
+    novo = db.func.coalesce(Projeto.curtidas, 0) + delta
+    db.session.execute(
+        db.update(Projeto)
+        .where(Projeto.id == projeto_id)
+        .values(curtidas=db.case((novo < 0, 0), else_=novo), versao=Projeto.versao + 1,
+                **valores_tendencia(variacao, curtidas_semestre))
+    )
+    # "curtidas recebidas" do dono e dos coautores andam junto com o contador do projeto
+    curtidas_recebidas(projeto_id, delta)
+
+
+def contador(projeto_id):
+    valor = db.session.query(Projeto.curtidas).filter_by(id=projeto_id).scalar() or 0
+    return max(valor + buffer_curtidas.pendente(projeto_id), 0)
+
+
+def definir_curtida(usuario_id, projeto_id, curtir=None):
+    # curtir=True/False define o estado; None alterna. Devolve (curtido, total)
+    if curtir is None:
+        curtir = not db.session.query(
+            Curtida.query.filter_by(usuario_id=usuario_id, projeto_id=projeto_id).exists()
+        ).scalar()
+
+    agora = datetime.utcnow()
+    if curtir:
+        delta = _inserir_curtida(usuario_id, projeto_id, agora)
+        criadas_em = [agora] * delta
+    else:
+        criadas_em = _remover_curtida(usuario_id, projeto_id)
+        delta = -len(criadas_em)
+    variacao, curtidas_semestre = variacao_curtidas(delta, criadas_em, agora)
+
+    if delta and not buffer_curtidas.ativo:
+        ajustar_contador(projeto_id, delta, variacao, curtidas_semestre)
+    db.session.commit()
+
+    if delta and buffer_curtidas.ativo:
+        buffer_curtidas.somar(projeto_id, delta, variacao, curtidas_semestre)
+    if delta:
+        conjuntos_curtidas.invalidar(usuario_id)
+
+    return curtir, contador(projeto_id)
+
+
+class ConjuntosCurtidas:
+    # ids dos projetos curtidos por usuário, em array('i') ordenado (4 bytes por curtida),
+    # no cache da aplicação com a tag usuario:<id> (a união de contas invalida)
+    #
+    # com o cache em memória cada worker teria o seu conjunto, e uma curtida feita num worker
+    # não apareceria nos outros: por isso só vem ligado com o backend redis
+    #
+    # curtir não corrige o array (ler, alterar e regravar perderia a curtida feita ao mesmo tempo
+    # em outro worker): sobe a tag curtidas:usuario:<id>, um INCR atômico no redis, e a próxima
+    # leitura recarrega do índice. Quem carregou antes do commit grava uma entrada já velha
+    # (lembrar guarda as versões lidas antes de calcular), então ela não é servida
+
+    def __init__(self):
+        self.ativo = False
+        self.validade = 600
+
+    def _chave(self, usuario_id):
+        return f'curtidas:usuario:{usuario_id}'
+
+    def _tags(self, usuario_id):
+        return (f'usuario:{usuario_id}', self._chave(usuario_id))
+
+    def _carregar(self, usuario_id):
+        # só a coluna projeto_id, lida do próprio índice único e já ordenada
+        return array('i', (pid for (pid,) in db.session.query(Curtida.projeto_id)
+                           .filter(Curtida.usuario_id == usuario_id)
+                           .order_by(Curtida.projeto_id)))
+
+    def ids(self, usuario_id):
+        return cache.lembrar(self._chave(usuario_id), lambda: self._carregar(usuario_id),
+                             ttl=self.validade, tags=self._tags(usuario_id))
+
+    def invalidar(self, usuario_id):
+        # depois do commit
+        if self.ativo:
+            cache.invalidar(self._chave(usuario_id))
+
+
+conjuntos_curtidas = ConjuntosCurtidas()
+
+
+def _contem(ids, projeto_id):
+    posicao = bisect_left(ids, projeto_id)
+    return posicao < len(ids) and ids[posicao] == projeto_id
+
+
+def curtidos_entre(usuario_id, projeto_ids):
+    # quais destes projetos (os da página) o usuário curtiu; uma consulta ou nenhuma (cache)
+    projeto_ids = list(projeto_ids)
+    if not usuario_id or not projeto_ids:
+        return set()
+    if conjuntos_curtidas.ativo:
+        ids = conjuntos_curtidas.ids(usuario_id)
+        return {pid for pid in projeto_ids if _contem(ids, pid)}
+    return {pid for (pid,) in db.session.query(Curtida.projeto_id)
+            .filter(Curtida.usuario_id == usuario_id, Curtida.projeto_id.in_(projeto_ids))}
+
+
+def filtro_curtidos(usuario_id):
+    # condição "Projeto curtido pelo usuário" para Projeto.query.filter(...)
+    if conjuntos_curtidas.ativo:
+        return Projeto.id.in_(list(conjuntos_curtidas.ids(usuario_id)))
+    return Projeto.id.in_(db.select(Curtida.projeto_id).where(Curtida.usuario_id == usuario_id))
+
+
+class BufferCurtidas:
+    # acumula deltas por projeto e grava tudo de uma vez a cada `intervalo` segundos;
+    # a linha em `curtidas` continua sendo gravada na hora, então nada se perde de fato
+    # (no pior caso, um crash antes da gravação é corrigido por recalcular_curtidas)
+
+    def __init__(self):
+        self.ativo = False
+        self._pendentes = Counter()
+        self._tendencia = {}  # projeto_id -> variação (services/tendencias.py, juntar)
+        self._semestre = Counter()
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+
+    def somar(self, projeto_id, delta, variacao=None, curtidas_semestre=0):
+        with self._lock:
+            self._pendentes[projeto_id] += delta
+            self._tendencia[projeto_id] = juntar(self._tendencia.get(projeto_id), variacao)
+            self._semestre[projeto_id] += curtidas_semestre
+
+    def pendente(self, projeto_id):
+        with self._lock:
+            return self._pendentes.get(projeto_id, 0)
+
+    def descarregar(self):
+        with self._lock:
+            lote = {pid: (d, self._tendencia.get(pid), self._semestre[pid]) for pid, d in self._pendentes.items()
+                    if d or self._tendencia.get(pid) or self._semestre[pid]}
+            self._pendentes.clear()
+            self._tendencia.clear()
+            self._semestre.clear()
+        if not lote:
+            return 0
+
+        try:
+            for projeto_id, (delta, variacao, curtidas_semestre) in lote.items():
+                ajustar_contador(projeto_id, delta, variacao, curtidas_semestre)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            # devolve o lote para a próxima tentativa
+            with self._lock:
+                for projeto_id, (delta, variacao, curtidas_semestre) in lote.items():
+                    self._pendentes[projeto_id] += delta
+                    self._tendencia[projeto_id] = juntar(self._tendencia.get(projeto_id), variacao)
+                    self._semestre[projeto_id] += curtidas_semestre
+            raise
+
+        cache.invalidar('ranking:top', *(f'projeto:{pid}' for pid in lote))
+        return len(lote)
+
+    def iniciar(self, app, intervalo):
+        self.ativo = True
+
+        def laco():
+            while not self._parar.wait(intervalo):
+                with app.app_context():
+                    try:
+                        self.descarregar()
+                    except Exception as e:
+                        app.logger.error("Erro ao gravar curtidas agrupadas: %s", e)
+
+        def ao_sair():
+            self._parar.set()
+            with app.app_context():
+                self.descarregar()
+
+        threading.Thread(target=laco, name="buffer-curtidas", daemon=True).start()
+        atexit.register(ao_sair)
+
+
+buffer_curtidas = BufferCurtidas()
+
+
+def remover_duplicadas():
+    # mantém a curtida mais antiga de cada (usuario, projeto)
+    return db.session.execute(db.text(
+        "DELETE FROM curtidas WHERE id NOT IN "
+        "(SELECT MIN(id) FROM curtidas GROUP BY usuario_id, projeto_id)"
+    )).rowcount
+
+
+def recalcular_curtidas():
+    removidas = remover_duplicadas()
+    contagem = db.select(db.func.count(Curtida.id))\
+        .where(Curtida.projeto_id == Projeto.id).scalar_subquery()
+    corrigidos = db.session.execute(
+        db.update(Projeto)
+        .where(db.func.coalesce(Projeto.curtidas, -1) != contagem)
+        .values(curtidas=contagem, versao=Projeto.versao + 1)
+    ).rowcount
+    db.session.commit()
+    cache.invalidar('ranking:top')
+    return removidas, corrigidos
+
+
+def init_curtidas(app):
+    conjuntos_curtidas.ativo = bool(app.config.get("CURTIDAS_CACHE_USUARIO"))
+    conjuntos_curtidas.validade = app.config.get("VALIDADE_CURTIDAS_CACHE_USUARIO", 600)
+    if app.config.get("CURTIDAS_AGRUPADAS"):
+        buffer_curtidas.iniciar(app, app.config.get("INTERVALO_CURTIDAS_AGRUPADAS", 5))
@@ -0,0 +1,120 @@
+#contadores de engajamento guardados nas próprias linhas: projetos.total_comentarios e, em
+#usuarios, projetos_proprios, projetos_coautor, curtidas_recebidas e comentarios_recebidos
+#
+#cada escrita ajusta os contadores com UPDATE x = x + delta na mesma transação (quem chama faz
+#o commit); as páginas só leem as colunas. "Recebidas" conta os projetos em que o usuário é
+#dono ou coautor. recalcular_estatisticas() refaz tudo a partir das tabelas
+#(scripts/recalcular_estatisticas.py)
+
+from datetime import datetime
+
+from extensions import db
+from models import Usuario, Projeto, Autor, Comentario
+from services.tendencias import valores_tendencia, expoente_comentario
+
+CAMPOS_USUARIO = ('projetos_proprios', 'projetos_coautor', 'curtidas_recebidas', 'comentarios_recebidos')
+
+
+def _equipe(projeto_id):
+    # dono e coautores do projeto
+    return db.union(
+        db.select(Projeto.usuario_id).where(Projeto.id == projeto_id),
+        db.select(Autor.usuario_id).where(Autor.projeto_id == projeto_id),
+    )
+
+
+def _ajustar_usuarios(filtro, **deltas):
+    deltas = {campo: delta for campo, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    valores = {}
+    for campo, delta in deltas.items():
+        novo = db.func.coalesce(getattr(Usuario, campo), 0) + delta
+        valores[campo] = db.case((novo < 0, 0), else_=novo)
+    db.session.execute(
+        db.update(Usuario).where(filtro).values(**valores).execution_options(synchronize_session=False)
+    )
+
+
+def curtidas_recebidas(projeto_id, delta):
+    # junto com o contador do projeto (services/curtidas.py, ajustar_contador)
+    _ajustar_usuarios(Usuario.id.in_(_equipe(projeto_id)), curtidas_recebidas=delta)
+
+
+def comentario_adicionado(projeto_id, criado_em=None):
+    # o comentário também conta para "em alta" (services/tendencias.py)
+    db.session.execute(
+        db.update(Projeto)
+        .where(Projeto.id == projeto_id)
+        .values(total_comentarios=db.func.coalesce(Projeto.total_comentarios, 0) + 1,
+                **valores_tendencia((1, expoente_comentario(criado_em or datetime.utcnow()))))
+    )
+    _ajustar_usuarios(Usuario.id.in_(_equipe(projeto_id)), comentarios_recebidos=1)
+
+
+def autoria_alterada(projeto, adicionados=(), removidos=()):
+    # coautores que entraram passam a receber o que o projeto já tem; os que saíram perdem
+    curtidas = projeto.curtidas or 0
+    comentarios = projeto.total_comentarios or 0
+    for usuarios, fator in ((adicionados, 1), (removidos, -1)):
+        if usuarios:
+            _ajustar_usuarios(Usuario.id.in_(list(usuarios)), projetos_coautor=fator,
+                              curtidas_recebidas=fator * curtidas, comentarios_recebidos=fator * comentarios)
+
+
+def projeto_criado(projeto, coautores):
+    _ajustar_usuarios(Usuario.id == projeto.usuario_id, projetos_proprios=1)
+    autoria_alterada(projeto, adicionados=coautores)
+
+
+def projeto_excluido(projeto, coautores):
+    _ajustar_usuarios(Usuario.id == projeto.usuario_id, projetos_proprios=-1,
+                      curtidas_recebidas=-(projeto.curtidas or 0),
+                      comentarios_recebidos=-(projeto.total_comentarios or 0))
+    autoria_alterada(projeto, removidos=coautores)
+
+
+def estatisticas_usuario(usuario_id):
+    # uma leitura por chave primária; sem cache, os contadores mudam a cada curtida
+    linha = db.session.query(*(getattr(Usuario, c) for c in CAMPOS_USUARIO))\
+        .filter(Usuario.id == usuario_id).first()
+    if linha is None:
+        return None
+    return {campo: valor or 0 for campo, valor in zip(CAMPOS_USUARIO, linha)}
+
+
+def recalcular_estatisticas(usuario_ids=None):
+    # em conjunto, direto no banco; usa projetos.curtidas (recalcular_curtidas corrige antes)
+    # usuario_ids limita a recontagem de usuários (ex.: depois de unir contas)
+    corrigidos = 0
+    if usuario_ids is None:
+        contagem = db.select(db.func.count(Comentario.id))\
+            .where(Comentario.projeto_id == Projeto.id).scalar_subquery()
+        corrigidos = db.session.execute(
+            db.update(Projeto)
+            .where(db.func.coalesce(Projeto.total_comentarios, -1) != contagem)
+            .values(total_comentarios=contagem)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+    # o dono nunca está em autor (ver gerenciar_projeto): as duas somas não se repetem
+    def soma(coluna):
+        propria = db.select(db.func.coalesce(db.func.sum(coluna), 0))\
+            .where(Projeto.usuario_id == Usuario.id).scalar_subquery()
+        coautoria = db.select(db.func.coalesce(db.func.sum(coluna), 0))\
+            .select_from(Autor).join(Projeto, Projeto.id == Autor.projeto_id)\
+            .where(Autor.usuario_id == Usuario.id).scalar_subquery()
+        return propria + coautoria
+
+    comando = db.update(Usuario).values(
+        projetos_proprios=db.select(db.func.count(Projeto.id))
+        .where(Projeto.usuario_id == Usuario.id).scalar_subquery(),
+        projetos_coautor=db.select(db.func.count(db.distinct(Autor.projeto_id)))
+        .where(Autor.usuario_id == Usuario.id).scalar_subquery(),
+        curtidas_recebidas=soma(db.func.coalesce(Projeto.curtidas, 0)),
+        comentarios_recebidos=soma(db.func.coalesce(Projeto.total_comentarios, 0)),
+    )
+    if usuario_ids is not None:
+        comando = comando.where(Usuario.id.in_(list(usuario_ids)))
+    usuarios = db.session.execute(comando.execution_options(synchronize_session=False)).rowcount
+    return corrigidos, usuarios
@@ -0,0 +1,69 @@
+#facetas da listagem: quantos projetos existem por curso e por tipo
+#mantidas na mesma transação das escritas de projeto, para a listagem não varrer a tabela
+
+from extensions import db, cache
+from models import Faceta, Projeto
+
+CAMPOS = ('curso', 'tipo')
+
+
+def _ajustar(campo, valor, delta):
+    if not valor or not delta:
+        return
+
+    atualizadas = db.session.execute(
+        db.update(Faceta)
+        .where(Faceta.campo == campo, Faceta.valor == valor)
+        .values(total=Faceta.total + delta)
+    ).rowcount
+
+    if not atualizadas and delta > 0:
+        db.session.add(Faceta(campo=campo, valor=valor, total=delta))
+    elif delta < 0:
+        db.session.execute(
+            db.delete(Faceta).where(Faceta.campo == campo, Faceta.valor == valor, Faceta.total <= 0)
+        )
+
+
+def valores_facetas(projeto):
+    return {campo: getattr(projeto, campo) for campo in CAMPOS}
+
+
+def atualizar_facetas(antes, depois):
+    # antes/depois: dicts de valores_facetas(); None para projeto criado/excluído
+    antes = antes or {}
+    depois = depois or {}
+    for campo in CAMPOS:
+        if antes.get(campo) != depois.get(campo):
+            _ajustar(campo, antes.get(campo), -1)
+            _ajustar(campo, depois.get(campo), +1)
+
+
+def _consultar_facetas():
+    facetas = {campo: [] for campo in CAMPOS}
+    for faceta in Faceta.query.filter(Faceta.total > 0).order_by(Faceta.campo, Faceta.valor):
+        facetas[faceta.campo].append((faceta.valor, faceta.total))
+    return facetas
+
+
+def listar_facetas():
+    return cache.lembrar('listagem:facetas', _consultar_facetas, ttl=60, tags=('facetas',))
+
+
+def reconstruir_facetas():
+    db.session.execute(db.delete(Faceta))
+    for campo in CAMPOS:
+        coluna = getattr(Projeto, campo)
+        linhas = db.session.query(coluna, db.func.count(Projeto.id))\
+            .filter(coluna.isnot(None), coluna != '')\
+            .group_by(coluna).all()
+        db.session.add_all(Faceta(campo=campo, valor=valor, total=total) for valor, total in linhas)
+    db.session.commit()
+    cache.invalidar('facetas')
+
+
+def init_facetas():
+    # banco que já tinha projetos antes da tabela de facetas existir
+    if not db.session.query(Faceta.query.exists()).scalar() \
+            and db.session.query(Projeto.query.exists()).scalar():
+        reconstruir_facetas()
@@ -0,0 +1,269 @@
+#variantes das imagens enviadas (card e detalhe, em AVIF/WebP/JPEG) geradas fora da requisição
+#o upload só enfileira o trabalho (services/tarefas.py); o trabalhador redimensiona e grava em
+#imagens (models/imagem.py)
+#enquanto as variantes não existem os templates continuam usando a imagem original
+#
+#precisa do Pillow (pip install Pillow); sem ele nada é gerado e tudo continua como antes
+
+import base64
+import io
+import json
+import logging
+import os
+
+from flask import url_for
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db, cache
+from models import Imagem
+from services.tarefas import tarefa, enfileirar
+from utils.paths import STATIC_DIR
+
+# larguras geradas para cada uso (a maior cobre telas 2x); nunca amplia a original
+TAMANHOS = {
+    'card': (320, 640),
+    'detalhe': (800, 1600),
+}
+
+# atributo sizes do <img> para cada uso (o card tem no máximo ~360px de largura)
+SIZES = {
+    'card': '(max-width: 600px) 100vw, 360px',
+    'detalhe': '(max-width: 900px) 100vw, 50vw',
+}
+
+QUALIDADE = {'avif': 50, 'webp': 78, 'jpg': 82}
+PASTA_VARIANTES = '_variantes'
+LARGURA_PLACEHOLDER = 16
+
+# imagem ainda sem variantes: consulta de novo depois desse tempo
+VALIDADE_PENDENTE = 30
+VALIDADE_PRONTA = 3600
+
+log = logging.getLogger("ifnexus.imagens")
+
+_formatos = ('webp', 'jpg')
+
+
+def _pillow():
+    try:
+        from PIL import Image, ImageOps, features
+    except ImportError:
+        return None
+    return Image, ImageOps, features
+
+
+def formatos_disponiveis(desejados=('avif', 'webp')):
+    # AVIF depende de como o Pillow foi compilado; o JPEG entra sempre como fallback
+    pil = _pillow()
+    if pil is None:
+        return ()
+    _, _, features = pil
+    return tuple(f for f in desejados if features.check(f)) + ('jpg',)
+
+
+def _normalizar(caminho):
+    # aceita "uploads/...", "/static/uploads/..." ou com espaços (vindo de estrutura.split(','))
+    caminho = (caminho or '').strip().lstrip('/')
+    if caminho.startswith('static/'):
+        caminho = caminho[len('static/'):]
+    return caminho
+
+
+def _caminho_variante(caminho, nome, largura, formato):
+    pasta, arquivo = os.path.split(caminho)
+    base = os.path.splitext(arquivo)[0]
+    return f"{pasta}/{PASTA_VARIANTES}/{base}-{nome}-{largura}.{formato}"
+
+
+def _salvar(imagem, destino, formato):
+    absoluto = os.path.join(STATIC_DIR, destino)
+    os.makedirs(os.path.dirname(absoluto), exist_ok=True)
+    if formato == 'jpg':
+        imagem.convert('RGB').save(absoluto, 'JPEG', quality=QUALIDADE['jpg'], optimize=True, progressive=True)
+    elif formato == 'webp':
+        imagem.save(absoluto, 'WEBP', quality=QUALIDADE['webp'], method=4)
+    else:
+        imagem.save(absoluto, 'AVIF', quality=QUALIDADE['avif'])
+
+
+def _placeholder(imagem):
+    # miniatura borrada embutida no HTML como fundo enquanto a imagem real carrega
+    pequena = imagem.copy()
+    pequena.thumbnail((LARGURA_PLACEHOLDER, LARGURA_PLACEHOLDER))
+    buffer = io.BytesIO()
+    # WebP fica em ~100 bytes; JPEG nesse tamanho é quase só cabeçalho
+    pequena.convert('RGB').save(buffer, 'WEBP', quality=30)
+    return 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+@tarefa('gerar_variantes')
+def gerar_variantes(caminho, formatos=None, refazer=False):
+    # caminho relativo a static/ (o mesmo guardado em projetos.estrutura)
+    # devolve o registro Imagem ou None se o arquivo não existe / não é imagem
+    pil = _pillow()
+    if pil is None:
+        return None
+    Image, ImageOps, _ = pil
+    formatos = formatos or _formatos
+
+    registro = Imagem.query.filter_by(caminho=caminho).first()
+    if registro is not None and registro.variantes and not refazer:
+        return registro
+
+    absoluto = os.path.join(STATIC_DIR, caminho)
+    try:
+        with Image.open(absoluto) as original:
+            original = ImageOps.exif_transpose(original)
+            if original.mode not in ('RGB', 'RGBA'):
+                original = original.convert('RGBA' if 'transparency' in original.info else 'RGB')
+            largura, altura = original.size
+
+            variantes = {}
+            for nome, larguras in TAMANHOS.items():
+                alvo = sorted({min(l, largura) for l in larguras})
+                variantes[nome] = {formato: [] for formato in formatos}
+                for l in alvo:
+                    a = max(1, round(altura * l / largura))
+                    redimensionada = original if l == largura else original.resize((l, a), Image.LANCZOS)
+                    for formato in formatos:
+                        destino = _caminho_variante(caminho, nome, l, formato)
+                        _salvar(redimensionada, destino, formato)
+                        variantes[nome][formato].append([l, destino])
+
+            placeholder = _placeholder(original)
+    except (OSError, ValueError) as e:
+        log.warning("Não foi possível gerar variantes de %s: %s", caminho, e)
+        return None
+
+    if registro is None:
+        registro = Imagem(caminho=caminho)
+        db.session.add(registro)
+    registro.largura = largura
+    registro.altura = altura
+    registro.variantes = json.dumps(variantes)
+    registro.placeholder = placeholder
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # a mesma imagem (dedupe) processada ao mesmo tempo por outro projeto
+        db.session.rollback()
+        return Imagem.query.filter_by(caminho=caminho).first()
+
+    cache.apagar(f'imagem:{caminho}')
+    return registro
+
+
+def remover_variantes(caminhos):
+    # apaga os registros e os arquivos gerados (a original é do armazenamento)
+    caminhos = [c for c in map(_normalizar, caminhos) if c]
+    if not caminhos:
+        return 0
+    registros = Imagem.query.filter(Imagem.caminho.in_(caminhos)).all()
+    pastas = set()
+    for registro in registros:
+        for formatos in json.loads(registro.variantes or '{}').values():
+            for lista in formatos.values():
+                for _, destino in lista:
+                    absoluto = os.path.join(STATIC_DIR, destino)
+                    pastas.add(os.path.dirname(absoluto))
+                    try:
+                        os.remove(absoluto)
+                    except FileNotFoundError:
+                        pass
+        db.session.delete(registro)
+    for pasta in pastas:
+        try:
+            os.rmdir(pasta)  # só se ficou vazia
+        except OSError:
+            pass
+    for caminho in caminhos:
+        cache.apagar(f'imagem:{caminho}')
+    return len(registros)
+
+
+def agendar_variantes(caminhos):
+    # chamado na transação do upload; a resposta não espera o processamento
+    if not _formatos:
+        log.info("Pillow indisponível: variantes de %s não serão geradas", caminhos)
+        return
+    for caminho in map(_normalizar, caminhos):
+        if caminho:
+            enfileirar('gerar_variantes', {'caminho': caminho}, chave=f'variantes:{caminho}')
+
+
+def _info(registro):
+    if registro is None or not registro.variantes:
+        return None
+    return {
+        'largura': registro.largura,
+        'altura': registro.altura,
+        'variantes': json.loads(registro.variantes),
+        'placeholder': registro.placeholder,
+    }
+
+
+def precarregar_imagens(caminhos):
+    # uma consulta para todas as imagens de uma página (em vez de uma por card)
+    caminhos = {_normalizar(c) for c in caminhos}
+    faltando = [c for c in caminhos if c and cache.get(f'imagem:{c}', False) is False]
+    if not faltando:
+        return
+    registros = {r.caminho: r for r in Imagem.query.filter(Imagem.caminho.in_(faltando))}
+    for caminho in faltando:
+        info = _info(registros.get(caminho))
+        cache.set(f'imagem:{caminho}', info, ttl=VALIDADE_PRONTA if info else VALIDADE_PENDENTE)
+
+
+def info_imagem(caminho):
+    caminho = _normalizar(caminho)
+    if not caminho:
+        return None
+    info = cache.get(f'imagem:{caminho}', False)
+    if info is False:
+        precarregar_imagens([caminho])
+        info = cache.get(f'imagem:{caminho}')
+    return info
+
+
+def _srcset(lista):
+    return ', '.join(f"{url_for('static', filename=destino)} {largura}w" for largura, destino in lista)
+
+
+def imagem_responsiva(caminho, tamanho='card'):
+    # dados usados pela macro de templates/componentes/imagem.html
+    caminho = _normalizar(caminho)
+    dados = {
+        'src': url_for('static', filename=caminho),
+        'original': url_for('static', filename=caminho),
+        'fontes': [],
+        'srcset': None,
+        'sizes': SIZES.get(tamanho),
+        'largura': None,
+        'altura': None,
+        'placeholder': None,
+    }
+
+    info = info_imagem(caminho)
+    variantes = info['variantes'].get(tamanho) if info else None
+    if not variantes:
+        return dados
+
+    for formato, tipo in (('avif', 'image/avif'), ('webp', 'image/webp')):
+        if variantes.get(formato):
+            dados['fontes'].append({'tipo': tipo, 'srcset': _srcset(variantes[formato])})
+
+    fallback = variantes.get('jpg') or []
+    if fallback:
+        dados['src'] = url_for('static', filename=fallback[0][1])
+        dados['srcset'] = _srcset(fallback)
+        largura = fallback[-1][0]
+        dados['largura'] = largura
+        dados['altura'] = round(info['altura'] * largura / info['largura'])
+    dados['placeholder'] = info['placeholder']
+    return dados
+
+
+def init_imagens(app):
+    global _formatos
+    app.jinja_env.globals['imagem_responsiva'] = imagem_responsiva
+    _formatos = formatos_disponiveis(app.config.get("IMAGENS_FORMATOS", ('avif', 'webp')))
@@ -0,0 +1,175 @@
+#indice em memória (por processo) de nomes e matrículas para o livesearch de coautores
+#carregado na primeira busca e atualizado quando usuários se cadastram ou entram pelo SUAP
+
+import threading
+import time
+from bisect import bisect_left, insort
+from itertools import chain
+
+from extensions import db
+from services.busca import normalizar, termos
+
+# outros workers também cadastram usuários: de tempos em tempos buscamos os ids novos
+INTERVALO_SINCRONIA = 30
+# recarga completa para refletir exclusões/merges feitos em outros processos
+INTERVALO_RECARGA = 600
+
+
+def _trigramas(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceUsuarios:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._carregado = False
+        self._limpar()
+
+    def _limpar(self):
+        self._usuarios = {}     # id -> (nome, matricula, termos)
+        self._chaves = []       # lista ordenada de (termo, id) para busca por prefixo
+        self._uso = {}          # termo -> quantos usuários o possuem
+        self._trigramas = {}    # trigrama -> {termos}, para buscas no meio da palavra
+        self._max_id = 0
+        self._sincronizado_em = 0.0
+        self._recarregado_em = 0.0
+
+    # --- manutenção ---
+
+    def _registrar(self, uid, nome, matricula):
+        # guarda o usuário e devolve seus termos; a lista _chaves fica com quem chamou
+        if uid in self._usuarios:
+            self._retirar(uid)
+
+        chaves = set(termos(nome))
+        if matricula:
+            chaves.add(normalizar(matricula))
+
+        self._usuarios[uid] = (nome, matricula, tuple(chaves))
+        for chave in chaves:
+            if chave not in self._uso:
+                self._uso[chave] = 0
+                for tri in _trigramas(chave):
+                    self._trigramas.setdefault(tri, set()).add(chave)
+            self._uso[chave] += 1
+        self._max_id = max(self._max_id, uid)
+        return chaves
+
+    def _inserir(self, uid, nome, matricula):
+        for chave in self._registrar(uid, nome, matricula):
+            insort(self._chaves, (chave, uid))
+
+    def _retirar(self, uid):
+        _, _, chaves = self._usuarios.pop(uid)
+        for chave in chaves:
+            pos = bisect_left(self._chaves, (chave, uid))
+            if pos < len(self._chaves) and self._chaves[pos] == (chave, uid):
+                del self._chaves[pos]
+            self._uso[chave] -= 1
+            if not self._uso[chave]:
+                del self._uso[chave]
+                for tri in _trigramas(chave):
+                    self._trigramas.get(tri, set()).discard(chave)
+
+    def _carregar_novos(self):
+        from models import Usuario
+
+        linhas = db.session.query(Usuario.id, Usuario.nome, Usuario.matricula)\
+            .filter(Usuario.id > self._max_id).all()
+
+        # carga em lote: junta tudo e ordena uma vez só
+        novas = [
+            (chave, uid)
+            for uid, nome, matricula in linhas
+            for chave in self._registrar(uid, nome, matricula)
+        ]
+        if novas:
+            self._chaves.extend(novas)
+            self._chaves.sort()
+
+    def _garantir_atualizado(self):
+        agora = time.monotonic()
+        if not self._carregado or agora - self._recarregado_em > INTERVALO_RECARGA:
+            self._limpar()
+            self._carregar_novos()
+            self._carregado = True
+            self._recarregado_em = self._sincronizado_em = agora
+        elif agora - self._sincronizado_em > INTERVALO_SINCRONIA:
+            self._carregar_novos()
+            self._sincronizado_em = agora
+
+    def adicionar(self, usuario):
+        with self._lock:
+            if self._carregado:
+                self._inserir(usuario.id, usuario.nome, usuario.matricula)
+
+    def remover(self, usuario_id):
+        with self._lock:
+            if usuario_id in self._usuarios:
+                self._retirar(usuario_id)
+
+    def invalidar(self):
+        with self._lock:
+            self._carregado = False
+
+    # --- consulta ---
+
+    def _por_prefixo(self, prefixo):
+        # percorre os ids cujo algum termo começa com o prefixo, sem repetir
+        vistos = set()
+        pos = bisect_left(self._chaves, (prefixo, 0))
+        while pos < len(self._chaves):
+            chave, uid = self._chaves[pos]
+            if not chave.startswith(prefixo):
+                break
+            if uid not in vistos:
+                vistos.add(uid)
+                yield uid
+            pos += 1
+
+    def _por_trecho(self, trecho):
+        # termos que contêm o trecho no meio (ex.: "ceicao" em "conceicao")
+        conjuntos = [self._trigramas.get(tri, set()) for tri in _trigramas(trecho)]
+        if not conjuntos:
+            return
+        candidatos = set.intersection(*sorted(conjuntos, key=len))
+        for chave in sorted(c for c in candidatos if trecho in c and not c.startswith(trecho)):
+            yield from self._por_prefixo(chave)
+
+    def _casa(self, uid, palavras):
+        chaves = self._usuarios[uid][2]
+        return all(any(c.startswith(p) for c in chaves) for p in palavras)
+
+    def buscar(self, q, limite=8):
+        palavras = termos(q)
+        if not palavras:
+            return []
+
+        with self._lock:
+            self._garantir_atualizado()
+
+            # o termo mais longo é o mais seletivo; os demais filtram
+            principal = max(palavras, key=len)
+            outras = list(palavras)
+            outras.remove(principal)
+
+            candidatos = self._por_prefixo(principal)
+            if len(principal) >= 3:
+                # completa com ocorrências no meio do nome/matrícula ("2345" em "20231234567")
+                candidatos = chain(candidatos, self._por_trecho(principal))
+
+            ids = []
+            for uid in candidatos:
+                if uid not in ids and self._casa(uid, outras):
+                    ids.append(uid)
+                    if len(ids) >= limite:
+                        break
+
+            return [
+                {"id": uid, "nome": self._usuarios[uid][0], "matricula": self._usuarios[uid][1]}
+                for uid in ids
+            ]
+
+
+indice_usuarios = IndiceUsuarios()
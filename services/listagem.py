@@ -0,0 +1,84 @@
+#paginação por cursor (keyset) e contagem em cache da listagem de projetos
+
+import math
+
+from sqlalchemy import tuple_
+
+from extensions import cache
+from models import Projeto
+
+# outros workers não avisam este processo quando escrevem (no backend em memória):
+# a contagem pode ficar até esse tempo desatualizada (é só o "N projetos encontrados")
+VALIDADE_CONTAGEM = 60
+
+
+def contar_projetos(query, chave):
+    return cache.lembrar(
+        'listagem:contagem:' + '|'.join(chave),
+        lambda: query.order_by(None).count(),
+        ttl=VALIDADE_CONTAGEM,
+        tags=('listagem',),
+    )
+
+
+def _colunas(ordenacao):
+    if ordenacao == 'curtidas':
+        return (Projeto.curtidas, Projeto.id)
+    if ordenacao == 'tendencia':
+        return (Projeto.tendencia, Projeto.id)
+    if ordenacao == 'semestre':
+        return (Projeto.curtidas_semestre, Projeto.id)
+    return (Projeto.id,)
+
+
+def ler_cursor(valor, ordenacao):
+    # cursor é "valor.id" (curtidas, tendência ou curtidas no semestre) ou "id" (mais recentes);
+    # a tendência é float e pode ter ponto: o id é sempre o que vem depois do último
+    if not valor:
+        return None
+    colunas = _colunas(ordenacao)
+    partes = valor.rsplit('.', len(colunas) - 1)
+    if len(partes) != len(colunas):
+        return None
+    try:
+        partes = tuple(c.type.python_type(p) for c, p in zip(colunas, partes))
+    except ValueError:
+        return None
+    if not all(math.isfinite(p) for p in partes):
+        return None
+    return partes
+
+
+def gerar_cursor(projeto, ordenacao):
+    return '.'.join(str(getattr(projeto, c.key) or 0) for c in _colunas(ordenacao))
+
+
+def pagina_por_cursor(query, ordenacao, apos=None, antes=None, por_pagina=12, ultima=None):
+    # devolve (projetos, cursor da página anterior, cursor da próxima)
+    # apos: itens depois do cursor; antes: itens antes dele; ultima: tamanho da última página
+    colunas = _colunas(ordenacao)
+    chave = tuple_(*colunas) if len(colunas) > 1 else colunas[0]
+    valor = (antes or apos or (None,))
+    valor = tuple_(*valor) if len(colunas) > 1 else valor[0]
+
+    query = query.order_by(None)
+    if antes or ultima:
+        # anda para trás na ordem crescente e devolve a página na ordem normal
+        if antes:
+            query = query.filter(chave > valor)
+        limite = ultima or por_pagina
+        itens = query.order_by(*[c.asc() for c in colunas]).limit(limite + 1).all()
+        tem_anterior = len(itens) > limite
+        itens = list(reversed(itens[:limite]))
+        tem_proxima = bool(antes)
+    else:
+        if apos:
+            query = query.filter(chave < valor)
+        itens = query.order_by(*[c.desc() for c in colunas]).limit(por_pagina + 1).all()
+        tem_proxima = len(itens) > por_pagina
+        itens = itens[:por_pagina]
+        tem_anterior = bool(apos)
+
+    cursor_anterior = gerar_cursor(itens[0], ordenacao) if itens and tem_anterior else None
+    cursor_proxima = gerar_cursor(itens[-1], ordenacao) if itens and tem_proxima else None
+    return itens, cursor_anterior, cursor_proxima
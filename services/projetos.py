@@ -0,0 +1,73 @@
+#carregamento dos dados de projeto usados pelas páginas
+#cada função busca o grafo inteiro em um número fixo de consultas (selectin/joined)
+
+from datetime import datetime
+
+from sqlalchemy.orm import selectinload
+
+from extensions import db, cache
+from models import Projeto, Autor
+
+
+def opcoes_pagina_projeto():
+    # autores (+ usuário de cada um), objetivos, metodologias e links: uma consulta por coleção
+    return (
+        selectinload(Projeto.autores).joinedload(Autor.usuario),
+        selectinload(Projeto.objetivos),
+        selectinload(Projeto.metodologias),
+        selectinload(Projeto.links),
+    )
+
+
+def carregar_projeto_completo(id):
+    return Projeto.query.options(*opcoes_pagina_projeto()).get_or_404(id)
+
+
+def sincronizar_lista(colecao, valores, campo, modelo):
+    # aplica o formulário a uma coleção (objetivos, metodologias, links) mudando só o necessário:
+    # o item i do formulário fica na linha i (ordem por id), então a ordem se mantém e as linhas
+    # iguais não são tocadas; sobra no fim vira INSERT, falta vira DELETE. Devolve se mudou algo
+    mudou = False
+    for linha, valor in zip(colecao, valores):
+        if getattr(linha, campo) != valor:
+            setattr(linha, campo, valor)
+            mudou = True
+    for linha in list(colecao[len(valores):]):
+        colecao.remove(linha)
+        mudou = True
+    for valor in valores[len(colecao):]:
+        colecao.append(modelo(**{campo: valor}))
+        mudou = True
+    return mudou
+
+
+def sincronizar_autores(projeto, usuario_ids):
+    # coautores são um conjunto: remove quem saiu e adiciona quem entrou, sem mexer nos outros
+    # devolve (adicionados, removidos)
+    atuais = {autor.usuario_id: autor for autor in projeto.autores}
+    removidos = set(atuais) - set(usuario_ids)
+    adicionados = set(usuario_ids) - set(atuais)
+    for usuario_id in removidos:
+        projeto.autores.remove(atuais[usuario_id])
+    for usuario_id in sorted(adicionados):
+        projeto.autores.append(Autor(usuario_id=usuario_id))
+    return adicionados, removidos
+
+
+def campos_alterados(objeto):
+    # atributos com mudança de verdade desde a carga (atribuir o mesmo valor não conta)
+    return {atributo.key for atributo in db.inspect(objeto).attrs if atributo.history.has_changes()}
+
+
+def tocar_projeto(projeto_id):
+    # nova versão da página do projeto (ETag); na mesma transação da escrita
+    db.session.execute(
+        db.update(Projeto)
+        .where(Projeto.id == projeto_id)
+        .values(versao=Projeto.versao + 1, atualizado_em=datetime.utcnow())
+    )
+
+
+def invalidar_cache_projeto(projeto_id):
+    # depois do commit de qualquer escrita no projeto (criação, edição, exclusão)
+    cache.invalidar(f'projeto:{projeto_id}', 'ranking:top', 'facetas', 'listagem')
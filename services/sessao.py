@@ -0,0 +1,83 @@
+#usuário da sessão (Flask-Login): o user_loader roda em toda requisição autenticada, então só
+#busca as colunas que as páginas usam de current_user (navbar, avatar, permissão do SUAP) e
+#guarda o resultado por alguns segundos na memória do processo
+#
+#quem muda nome/foto/tipo ou remove uma conta chama sessoes.esquecer(id); os outros workers
+#enxergam a mudança em até USUARIO_SESSAO_VALIDADE segundos. Páginas que precisam da linha
+#inteira (perfil) buscam o Usuario pelo id
+
+import threading
+import time
+from collections import OrderedDict
+
+from flask_login import UserMixin
+
+from extensions import db
+from models import Usuario
+
+CAMPOS_SESSAO = ('id', 'nome', 'tipo_usuario', 'foto')
+
+
+class UsuarioSessao(UserMixin):
+    # current_user das requisições autenticadas (sem senha, cpf, data de nascimento...)
+
+    def __init__(self, id, nome, tipo_usuario, foto):
+        self.id = id
+        self.nome = nome
+        self.tipo_usuario = tipo_usuario
+        self.foto = foto
+
+    def __repr__(self):
+        return f'<UsuarioSessao {self.id}>'
+
+
+class CacheSessoes:
+
+    def __init__(self, validade=30, tamanho=4096):
+        self.validade = validade
+        self.tamanho = tamanho
+        self._itens = OrderedDict()  # id -> (expira_em, UsuarioSessao)
+        self._geracao = 0
+        self._lock = threading.Lock()
+
+    def carregar(self, usuario_id):
+        agora = time.monotonic()
+        with self._lock:
+            item = self._itens.get(usuario_id)
+            if item and item[0] > agora:
+                self._itens.move_to_end(usuario_id)
+                return item[1]
+            geracao = self._geracao
+
+        linha = db.session.query(*(getattr(Usuario, c) for c in CAMPOS_SESSAO))\
+            .filter(Usuario.id == usuario_id).first()
+        if linha is None:
+            return None
+        usuario = UsuarioSessao(*linha)
+
+        with self._lock:
+            # alguém esqueceu um usuário enquanto a consulta rodava: não guarda o que pode ser velho
+            if geracao == self._geracao:
+                self._itens[usuario_id] = (agora + self.validade, usuario)
+                self._itens.move_to_end(usuario_id)
+                while len(self._itens) > self.tamanho:
+                    self._itens.popitem(last=False)
+        return usuario
+
+    def esquecer(self, *usuario_ids):
+        with self._lock:
+            self._geracao += 1
+            for usuario_id in usuario_ids:
+                self._itens.pop(usuario_id, None)
+
+    def limpar(self):
+        with self._lock:
+            self._geracao += 1
+            self._itens.clear()
+
+
+sessoes = CacheSessoes()
+
+
+def init_sessoes(app):
+    sessoes.validade = app.config.get("USUARIO_SESSAO_VALIDADE", 30)
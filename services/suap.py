@@ -0,0 +1,188 @@
+#cliente do SUAP usado no login (troca do código pelo token e leitura do perfil)
+#uma sessão HTTP compartilhada por processo (conexões reaproveitadas), timeouts de conexão e de
+#leitura em toda chamada e poucas novas tentativas, só quando é seguro repetir
+#
+#o disjuntor conta falhas seguidas (timeout, conexão recusada, 5xx): passando do limite ele abre
+#e as chamadas falham na hora por SUAP_TEMPO_ABERTO segundos, em vez de prender as threads do
+#servidor esperando um SUAP fora do ar; depois disso uma chamada de teste decide se ele fecha
+#
+#com IFNEXUS_SUAP_URL=http://127.0.0.1:5050 o app fala com o servidor falso de scripts/suap_falso.py
+
+import logging
+import threading
+import time
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from services.suap_config import SUAP_CLIENT_ID, SUAP_REDIRECT_URI
+
+log = logging.getLogger("ifnexus.suap")
+
+
+class SuapErro(Exception):
+    pass
+
+
+class SuapIndisponivel(SuapErro):
+    # timeout, erro de conexão, 5xx ou disjuntor aberto: vale tentar de novo mais tarde
+    pass
+
+
+class Disjuntor:
+
+    def __init__(self, limite=5, tempo_aberto=30):
+        self.limite = limite
+        self.tempo_aberto = tempo_aberto
+        self._lock = threading.Lock()
+        self._falhas = 0
+        self._aberto_ate = None
+        self._testando = False
+
+    def permitir(self):
+        with self._lock:
+            if self._aberto_ate is None:
+                return True
+            # passado o tempo, deixa uma única chamada de teste passar (meio-aberto)
+            if time.monotonic() >= self._aberto_ate and not self._testando:
+                self._testando = True
+                return True
+            return False
+
+    def sucesso(self):
+        with self._lock:
+            self._falhas = 0
+            self._aberto_ate = None
+            self._testando = False
+
+    def falha(self):
+        with self._lock:
+            self._falhas += 1
+            self._testando = False
+            if self._falhas >= self.limite:
+                if self._aberto_ate is None:
+                    log.warning("SUAP falhou %s vezes seguidas: disjuntor aberto", self._falhas)
+                self._aberto_ate = time.monotonic() + self.tempo_aberto
+
+    def estado(self):
+        with self._lock:
+            if self._aberto_ate is None:
+                return 'fechado'
+            return 'aberto' if time.monotonic() < self._aberto_ate else 'meio-aberto'
+
+    def aberto(self):
+        return self.estado() == 'aberto'
+
+
+class ClienteSuap:
+
+    def __init__(self):
+        self.configurar()
+
+    def configurar(self, url="https://suap.ifrn.edu.br", timeout=(3, 10), tentativas=2,
+                   conexoes=10, limite_falhas=5, tempo_aberto=30):
+        self.url = url.rstrip('/')
+        self.timeout = tuple(timeout)
+        self.disjuntor = Disjuntor(limite_falhas, tempo_aberto)
+
+        # erros de conexão são repetidos em qualquer método (o pedido nem chegou ao SUAP);
+        # erros de leitura e 502/503/504 só no GET do perfil: o código do POST vale uma vez só
+        repetir = Retry(
+            total=tentativas,
+            connect=tentativas,
+            read=tentativas,
+            status=tentativas,
+            allowed_methods=frozenset({'GET'}),
+            status_forcelist=(502, 503, 504),
+            backoff_factor=0.2,
+            raise_on_status=False,
+        )
+        adaptador = HTTPAdapter(pool_connections=2, pool_maxsize=conexoes, max_retries=repetir)
+        self.sessao = requests.Session()
+        self.sessao.mount('https://', adaptador)
+        self.sessao.mount('http://', adaptador)
+        self.sessao.headers['Accept'] = 'application/json'
+
+    def init_app(self, app):
+        self.configurar(
+            url=app.config.get("SUAP_URL", "https://suap.ifrn.edu.br"),
+            timeout=app.config.get("SUAP_TIMEOUT", (3, 10)),
+            tentativas=app.config.get("SUAP_TENTATIVAS", 2),
+            conexoes=app.config.get("SUAP_CONEXOES", 10),
+            limite_falhas=app.config.get("SUAP_FALHAS_PARA_ABRIR", 5),
+            tempo_aberto=app.config.get("SUAP_TEMPO_ABERTO", 30),
+        )
+
+    def url_autorizacao(self):
+        params = {
+            "response_type": "code",
+            "client_id": SUAP_CLIENT_ID,
+            "redirect_uri": SUAP_REDIRECT_URI,
+        }
+        return f"{self.url}/o/authorize/?{urlencode(params)}"
+
+    def _chamar(self, metodo, caminho, **kwargs):
+        if not self.disjuntor.permitir():
+            raise SuapIndisponivel("SUAP indisponível (disjuntor aberto)")
+
+        inicio = time.perf_counter()
+        try:
+            resposta = self.sessao.request(metodo, self.url + caminho, timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            self.disjuntor.falha()
+            log.warning("SUAP %s %s falhou em %.0f ms: %s", metodo, caminho,
+                        (time.perf_counter() - inicio) * 1000, e)
+            raise SuapIndisponivel(str(e)) from e
+
+        if resposta.status_code >= 500:
+            self.disjuntor.falha()
+            log.warning("SUAP %s %s respondeu %s", metodo, caminho, resposta.status_code)
+            raise SuapIndisponivel(f"SUAP respondeu {resposta.status_code}")
+
+        # 200 que não é um objeto JSON (página de manutenção de um proxy na frente do SUAP, por
+        # exemplo) conta como SUAP fora do ar, senão o .json() viraria um 500 no callback
+        dados = None
+        if resposta.status_code == 200:
+            try:
+                dados = resposta.json()
+            except ValueError:
+                dados = None
+            if not isinstance(dados, dict):
+                self.disjuntor.falha()
+                log.warning("SUAP %s %s respondeu 200 sem JSON: %s", metodo, caminho, resposta.text[:200])
+                raise SuapIndisponivel("SUAP respondeu sem JSON")
+
+        # 4xx é problema do pedido (código expirado, token inválido), não do SUAP
+        self.disjuntor.sucesso()
+        return resposta, dados
+
+    def trocar_codigo(self, code):
+        resposta, dados = self._chamar('POST', '/o/token/', data={
+            "grant_type": "authorization_code",
+            "code": code,
+            "redirect_uri": SUAP_REDIRECT_URI,
+            "client_id": SUAP_CLIENT_ID,
+        })
+        if resposta.status_code != 200:
+            raise SuapErro(f"Erro ao obter token do SUAP: {resposta.text}")
+        token = dados.get("access_token")
+        if not token:
+            raise SuapErro("Erro ao obter token do SUAP: resposta sem access_token")
+        return token
+
+    def perfil(self, token):
+        # sem cache: o token vem de um código de uso único e só é lido uma vez por login, e o
+        # perfil traz dados pessoais (cpf, nascimento) que não devem ir para o cache compartilhado
+        resposta, dados = self._chamar('GET', '/api/eu/', headers={"Authorization": f"Bearer {token}"})
+        if resposta.status_code != 200:
+            log.warning("SUAP /api/eu/ respondeu %s: %s", resposta.status_code, resposta.text[:200])
+            raise SuapErro("Erro ao buscar dados do usuário no SUAP.")
+        return dados
+
+    def estado(self):
+        return {'url': self.url, 'disjuntor': self.disjuntor.estado(), 'timeout': list(self.timeout)}
+
+
+suap = ClienteSuap()
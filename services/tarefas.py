@@ -0,0 +1,238 @@
+#fila de tarefas persistente para o trabalho lento que não precisa segurar a resposta
+#(remover arquivos, gerar variantes de imagens, unir contas do SUAP)
+#
+#a fila é a tabela tarefas no próprio banco: enfileirar() entra na mesma transação da escrita
+#que gerou o trabalho, então ou os dois são gravados ou nenhum. Um trabalhador (threads dentro
+#do app com TAREFAS_NO_APP, ou "python scripts/trabalhador.py") pega as pendentes, executa e
+#tenta de novo com espera exponencial se falhar
+#
+#cada tipo de tarefa é uma função registrada com @tarefa("nome"), chamada com os dados como kwargs;
+#ela pode rodar mais de uma vez (nova tentativa depois de um crash), então deve ser idempotente
+
+import json
+import logging
+import random
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import Tarefa
+
+# esperas entre tentativas: 5s, 10s, 20s... até 10 minutos
+ESPERA_BASE = 5
+ESPERA_MAXIMA = 600
+# tarefa "executando" há mais tempo que isso é de um trabalhador que morreu
+TEMPO_LIMITE = 600
+
+log = logging.getLogger("ifnexus.tarefas")
+
+TAREFAS = {}
+_acordar = threading.Event()
+
+
+def tarefa(nome):
+    def registrar(funcao):
+        TAREFAS[nome] = funcao
+        return funcao
+    return registrar
+
+
+def enfileirar(tipo, dados=None, chave=None, atraso=0, max_tentativas=5):
+    # não faz commit: a tarefa é gravada junto com o resto da transação
+    # com chave, só existe uma tarefa pendente/executando por chave (as repetidas são ignoradas)
+    valores = {
+        'tipo': tipo,
+        'dados': json.dumps(dados or {}),
+        'chave': chave,
+        'estado': 'pendente',
+        'tentativas': 0,
+        'max_tentativas': max_tentativas,
+        'executar_em': datetime.utcnow() + timedelta(seconds=atraso),
+        'criado_em': datetime.utcnow(),
+    }
+    dialeto = db.engine.dialect.name
+
+    if dialeto in ('sqlite', 'postgresql'):
+        if dialeto == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        comando = insert(Tarefa).values(**valores)
+        if chave:
+            comando = comando.on_conflict_do_nothing(index_elements=['chave'])
+        inserida = db.session.execute(comando).rowcount
+    else:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(db.insert(Tarefa).values(**valores))
+            inserida = 1
+        except IntegrityError:
+            inserida = 0
+
+    _acordar.set()
+    return bool(inserida)
+
+
+def _espera(tentativas):
+    segundos = min(ESPERA_BASE * 2 ** max(tentativas - 1, 0), ESPERA_MAXIMA)
+    return segundos * random.uniform(0.8, 1.2)
+
+
+def _reservar():
+    # pega a próxima pendente; o UPDATE condicional garante que só um trabalhador fica com ela
+    agora = datetime.utcnow()
+    while True:
+        candidata = db.session.query(Tarefa.id)\
+            .filter(Tarefa.estado == 'pendente', Tarefa.executar_em <= agora)\
+            .order_by(Tarefa.executar_em, Tarefa.id)\
+            .limit(1).scalar()
+        if candidata is None:
+            db.session.commit()
+            return None
+        reservada = db.session.execute(
+            db.update(Tarefa)
+            .where(Tarefa.id == candidata, Tarefa.estado == 'pendente')
+            .values(estado='executando', iniciada_em=agora, tentativas=Tarefa.tentativas + 1)
+        ).rowcount
+        db.session.commit()
+        if reservada:
+            return db.session.get(Tarefa, candidata)
+
+
+def _finalizar(tarefa_id, **valores):
+    db.session.execute(db.update(Tarefa).where(Tarefa.id == tarefa_id).values(**valores))
+    db.session.commit()
+
+
+def executar(registro):
+    funcao = TAREFAS.get(registro.tipo)
+    tarefa_id, tentativas, max_tentativas = registro.id, registro.tentativas, registro.max_tentativas
+    try:
+        if funcao is None:
+            raise LookupError(f"tarefa desconhecida: {registro.tipo}")
+        funcao(**json.loads(registro.dados or '{}'))
+    except Exception as e:
+        db.session.rollback()
+        erro = f"{type(e).__name__}: {e}"
+        if tentativas < max_tentativas and funcao is not None:
+            log.warning("Tarefa %s (%s) falhou, nova tentativa: %s", tarefa_id, registro.tipo, erro)
+            _finalizar(tarefa_id, estado='pendente', erro=erro,
+                       executar_em=datetime.utcnow() + timedelta(seconds=_espera(tentativas)))
+        else:
+            log.error("Tarefa %s (%s) desistiu depois de %s tentativas: %s", tarefa_id, registro.tipo, tentativas, erro)
+            _finalizar(tarefa_id, estado='falhou', erro=erro, chave=None, concluida_em=datetime.utcnow())
+        return False
+
+    # a chave é liberada: um novo pedido igual no futuro volta a ser executado
+    _finalizar(tarefa_id, estado='concluida', erro=None, chave=None, concluida_em=datetime.utcnow())
+    return True
+
+
+def recuperar_travadas():
+    # tarefas "executando" de um trabalhador que caiu voltam para a fila
+    limite = datetime.utcnow() - timedelta(seconds=TEMPO_LIMITE)
+    voltaram = db.session.execute(
+        db.update(Tarefa)
+        .where(Tarefa.estado == 'executando', Tarefa.iniciada_em < limite)
+        .values(estado='pendente', executar_em=datetime.utcnow())
+    ).rowcount
+    db.session.commit()
+    return voltaram
+
+
+def executar_pendentes(limite=None):
+    # roda o que estiver pronto agora, no processo atual (scripts e testes); devolve quantas rodou
+    feitas = 0
+    while limite is None or feitas < limite:
+        registro = _reservar()
+        if registro is None:
+            break
+        executar(registro)
+        feitas += 1
+    return feitas
+
+
+def resumo_tarefas(falhas=20):
+    contagem = dict(db.session.query(Tarefa.estado, db.func.count(Tarefa.id)).group_by(Tarefa.estado).all())
+    proxima = db.session.query(db.func.min(Tarefa.executar_em)).filter(Tarefa.estado == 'pendente').scalar()
+    ultimas = Tarefa.query.filter(Tarefa.erro.isnot(None))\
+        .order_by(Tarefa.id.desc()).limit(falhas).all()
+    return {
+        'contagem': contagem,
+        'proxima_pendente': proxima.isoformat() if proxima else None,
+        'erros_recentes': [
+            {
+                'id': t.id, 'tipo': t.tipo, 'estado': t.estado, 'tentativas': t.tentativas,
+                'executar_em': t.executar_em.isoformat(), 'erro': t.erro,
+            }
+            for t in ultimas
+        ],
+    }
+
+
+def limpar_concluidas(dias=7):
+    limite = datetime.utcnow() - timedelta(days=dias)
+    removidas = Tarefa.query.filter(Tarefa.estado == 'concluida', Tarefa.concluida_em < limite)\
+        .delete(synchronize_session=False)
+    db.session.commit()
+    return removidas
+
+
+class Trabalhador:
+
+    def __init__(self, app, threads=2, intervalo=1.0):
+        self.app = app
+        self.threads = threads
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._ativas = []
+
+    def _laco(self):
+        while not self._parar.is_set():
+            with self.app.app_context():
+                try:
+                    feitas = executar_pendentes(limite=10)
+                except Exception as e:
+                    db.session.rollback()
+                    self.app.logger.error("Erro no trabalhador de tarefas: %s", e)
+                    feitas = 0
+            if not feitas:
+                _acordar.wait(self.intervalo)
+                _acordar.clear()
+
+    def iniciar(self):
+        with self.app.app_context():
+            recuperar_travadas()
+        for i in range(self.threads):
+            thread = threading.Thread(target=self._laco, name=f"tarefas-{i}", daemon=True)
+            thread.start()
+            self._ativas.append(thread)
+
+    def aguardar(self):
+        # bloqueia a thread principal até parar() (scripts/trabalhador.py)
+        while not self._parar.wait(1):
+            pass
+
+    def parar(self, esperar=True):
+        self._parar.set()
+        _acordar.set()
+        if esperar:
+            for thread in self._ativas:
+                thread.join()
+
+
+trabalhador = None
+_iniciando = threading.Lock()
+
+
+def init_tarefas(app):
+    # chamado a cada requisição (app.py): só a primeira, com TAREFAS_NO_APP, sobe as threads
+    global trabalhador
+    if trabalhador is not None or not app.config.get("TAREFAS_NO_APP"):
+        return
+    with _iniciando:
+        if trabalhador is None:
+            trabalhador = Trabalhador(app, app.config.get("TAREFAS_THREADS", 2), app.config.get("TAREFAS_INTERVALO", 1.0))
+            trabalhador.iniciar()
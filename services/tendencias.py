@@ -0,0 +1,156 @@
+#"em alta" e "top do semestre" guardados na própria linha de projetos, com índice, para ordenar
+#tão barato quanto por curtidas
+#
+#a pontuação decaída de um projeto é a soma de peso * 2^(-(agora - t) / meia-vida) das curtidas e
+#comentários. tendencia guarda log2 dessa soma sem o fator de "agora", ou seja, log2 da soma de
+#peso * 2^((t - EPOCA) / meia-vida): o fator é o mesmo para todos os projetos, então a ordem é a
+#mesma sem nunca reescrever as linhas. Em log o valor cresce só uma unidade por meia-vida (não
+#estoura nunca) e cada interação entra com um UPDATE atômico que soma (ou, ao descurtir,
+#subtrai) 2^x no próprio banco, com ln/exp; 0 quer dizer "nenhuma interação"
+#
+#curtidas_semestre conta as curtidas feitas no semestre guardado em semestre (20261, 20262...):
+#a primeira curtida de um semestre novo recomeça a contagem, e "top do semestre" só lista os
+#projetos com semestre igual ao atual. Curtidas sem criado_em não entram em nenhum dos dois (as de
+#antes da migração 0006 recebem o fim do semestre anterior: contam em "em alta", não no semestre)
+
+import math
+from collections import Counter
+from datetime import datetime
+
+from extensions import db, cache
+from models import Projeto, Curtida, Comentario
+
+# antes de qualquer interação: todo expoente é positivo (0 fica livre para "vazio")
+EPOCA = datetime(2000, 1, 1)
+
+LN2 = math.log(2)
+# 2^-60 some diante do maior termo: nem calcula (e o exp do PostgreSQL não reclama de underflow)
+DIFERENCA_DESPREZIVEL = 60
+# subtração que deixaria só o erro de arredondamento: zera
+RESTO_MINIMO = 1e-9
+
+_parametros = {'meia_vida': 72 * 3600.0, 'peso_comentario': 2.0}
+
+
+def semestre_de(quando):
+    return quando.year * 10 + (1 if quando.month <= 6 else 2)
+
+
+def expoente(quando, peso=1.0):
+    # log2(peso * 2^((quando - EPOCA) / meia-vida))
+    return math.log2(peso) + (quando - EPOCA).total_seconds() / _parametros['meia_vida']
+
+
+def expoente_comentario(quando):
+    return expoente(quando, _parametros['peso_comentario'])
+
+
+def juntar(a, b):
+    # soma de duas variações (sinal, log2 do valor); None é zero
+    if a is None or b is None:
+        return a if b is None else b
+    (sinal, maior), (sinal_b, menor) = sorted((a, b), key=lambda v: v[1], reverse=True)
+    if sinal == sinal_b:
+        return sinal, maior + math.log2(1 + 2.0 ** (menor - maior))
+    if maior - menor < RESTO_MINIMO:
+        return None
+    return sinal, maior + math.log2(1 - 2.0 ** (menor - maior))
+
+
+def _somar(atual, x):
+    # log2(2^atual + 2^x) em SQL
+    maior = db.case((atual > x, atual), else_=x)
+    diferenca = db.func.abs(atual - x)
+    soma = db.case((diferenca > DIFERENCA_DESPREZIVEL, maior),
+                   else_=maior + db.func.ln(1 + db.func.exp(-diferenca * LN2)) / LN2)
+    return db.case((atual <= 0, x), else_=soma)
+
+
+def _subtrair(atual, x):
+    # log2(2^atual - 2^x) em SQL; se não sobra nada, volta a 0
+    diferenca = atual - x
+    return db.case(
+        (diferenca < RESTO_MINIMO, 0.0),
+        (diferenca > DIFERENCA_DESPREZIVEL, atual),
+        else_=atual + db.func.ln(1 - db.func.exp(-diferenca * LN2)) / LN2,
+    )
+
+
+def valores_tendencia(variacao=None, curtidas_semestre=0, agora=None):
+    # colunas do UPDATE em projetos (quem chama junta com os outros contadores)
+    valores = {}
+    if variacao:
+        sinal, x = variacao
+        valores['tendencia'] = _somar(Projeto.tendencia, x) if sinal > 0 else _subtrair(Projeto.tendencia, x)
+    if curtidas_semestre:
+        atual = semestre_de(agora or datetime.utcnow())
+        novo = db.case((Projeto.semestre == atual, Projeto.curtidas_semestre + curtidas_semestre),
+                       else_=curtidas_semestre)
+        valores['curtidas_semestre'] = db.case((novo < 0, 0), else_=novo)
+        valores['semestre'] = atual
+    return valores
+
+
+def variacao_curtidas(delta, criadas_em, agora):
+    # (variação da tendência, curtidas no semestre) de curtidas gravadas (delta > 0) ou removidas
+    sinal = 1 if delta > 0 else -1
+    variacao, no_semestre = None, 0
+    for quando in criadas_em:
+        if quando is None:
+            continue
+        variacao = juntar(variacao, (sinal, expoente(quando)))
+        if semestre_de(quando) == semestre_de(agora):
+            no_semestre += sinal
+    return variacao, no_semestre
+
+
+def filtro_semestre(agora=None):
+    # condição de "top do semestre" (índice semestre, curtidas_semestre, id)
+    return db.and_(Projeto.semestre == semestre_de(agora or datetime.utcnow()), Projeto.curtidas_semestre > 0)
+
+
+def recalcular_tendencias(conn=None):
+    # refaz as três colunas a partir de curtidas.criado_em e comentarios.criado_em; com conn roda
+    # na transação de quem chama (migração 0006), sem commit
+    executar = (conn or db.session).execute
+    agora = datetime.utcnow()
+    atual = semestre_de(agora)
+    pontos = {}
+    no_semestre = Counter()
+    for projeto_id, quando in executar(
+            db.select(Curtida.projeto_id, Curtida.criado_em).where(Curtida.criado_em.isnot(None))
+            .execution_options(yield_per=10000)):
+        pontos[projeto_id] = juntar(pontos.get(projeto_id), (1, expoente(quando)))
+        if semestre_de(quando) == atual:
+            no_semestre[projeto_id] += 1
+    for projeto_id, quando in executar(
+            db.select(Comentario.projeto_id, Comentario.criado_em).execution_options(yield_per=10000)):
+        pontos[projeto_id] = juntar(pontos.get(projeto_id), (1, expoente_comentario(quando)))
+
+    projetos = Projeto.__table__
+    executar(db.update(projetos).values(tendencia=0.0, curtidas_semestre=0, semestre=0))
+    linhas = [{'pid': pid, 't': variacao[1], 'cs': no_semestre[pid], 's': atual if no_semestre[pid] else 0}
+              for pid, variacao in pontos.items()]
+    if linhas:
+        # um UPDATE (executemany) pela chave primária
+        executar(
+            db.update(projetos).where(projetos.c.id == db.bindparam('pid'))
+            .values(tendencia=db.bindparam('t'), curtidas_semestre=db.bindparam('cs'), semestre=db.bindparam('s')),
+            linhas,
+        )
+    if conn is None:
+        db.session.commit()
+    cache.invalidar('ranking:top', 'listagem')
+    return len(linhas)
+
+
+def init_tendencias(app):
+    # valores inválidos derrubariam toda curtida e comentário: falha logo ao subir
+    meia_vida = app.config.get("TENDENCIA_MEIA_VIDA_HORAS", 72)
+    peso_comentario = app.config.get("TENDENCIA_PESO_COMENTARIO", 2)
+    for nome, valor in (("TENDENCIA_MEIA_VIDA_HORAS", meia_vida), ("TENDENCIA_PESO_COMENTARIO", peso_comentario)):
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)) \
+                or not math.isfinite(valor) or valor <= 0:
+            raise ValueError(f"{nome} precisa ser um número positivo (recebido {valor!r})")
+    _parametros['meia_vida'] = meia_vida * 3600.0
+    _parametros['peso_comentario'] = float(peso_comentario)
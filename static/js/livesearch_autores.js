@@ -18,7 +18,7 @@ buscaAutor.addEventListener("input", () => {
             return;
         }
 
-        const res = await fetch(`/livesearch/usuarios?q=${termo}`);
+        const res = await fetch(`/livesearch/usuarios?q=${encodeURIComponent(termo)}`);
         const usuarios = await res.json();
 
         resultadoAutores.innerHTML = "";
@@ -0,0 +1,36 @@
+#configuração das conexões com o banco (PRAGMAs do SQLite em cada conexão nova)
+
+import math
+import sqlite3
+
+from sqlalchemy import event
+
+from extensions import db
+
+# services/tendencias.py usa ln/exp; o SQLite só tem as funções matemáticas se foi compilado com elas
+FUNCOES_SQLITE = {"ln": math.log, "exp": math.exp}
+
+
+def _registrar_funcoes(conexao):
+    for nome, funcao in FUNCOES_SQLITE.items():
+        try:
+            conexao.execute(f"SELECT {nome}(1)")
+        except sqlite3.OperationalError:
+            conexao.create_function(nome, 1, funcao, deterministic=True)
+
+
+def init_banco(app):
+    pragmas = app.config.get("SQLITE_PRAGMAS") or {}
+
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name != "sqlite":
+            return
+
+        @event.listens_for(engine, "connect")
+        def aplicar_pragmas(conexao, registro):
+            cursor = conexao.cursor()
+            for nome, valor in pragmas.items():
+                cursor.execute(f"PRAGMA {nome} = {valor}")
+            cursor.close()
+            _registrar_funcoes(conexao)
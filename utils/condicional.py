@@ -0,0 +1,36 @@
+#GET condicional: ETag/Last-Modified calculados de dados baratos (versão do projeto, curtida
+#do usuário...) antes de carregar e renderizar a página; se o navegador já tem essa versão,
+#a resposta é um 304 sem corpo
+#
+#as páginas dependem de quem está logado, então o cache é "private, no-cache" (o navegador
+#guarda, mas sempre pergunta antes de usar) e varia por Cookie
+
+import hashlib
+
+from flask import Response, make_response, request
+
+
+def gerar_etag(*partes):
+    return hashlib.sha1(repr(partes).encode('utf-8')).hexdigest()[:24]
+
+
+def _validadores(resposta, etag, modificado_em):
+    resposta.set_etag(etag)
+    if modificado_em is not None:
+        resposta.last_modified = modificado_em
+    resposta.cache_control.private = True
+    resposta.cache_control.no_cache = True
+    resposta.vary.add('Cookie')
+    return resposta
+
+
+def nao_modificado(etag, modificado_em=None):
+    # devolve a resposta 304 quando o navegador já tem essa versão, senão None
+    # (só use em páginas que não mostram mensagens flash: um 304 não as consumiria)
+    resposta = _validadores(Response(status=200), etag, modificado_em)
+    resposta.make_conditional(request)
+    return resposta if resposta.status_code == 304 else None
+
+
+def com_validadores(conteudo, etag, modificado_em=None):
+    return _validadores(make_response(conteudo), etag, modificado_em)
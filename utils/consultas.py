@@ -0,0 +1,104 @@
+#contagem de consultas SQL e orçamento de consultas por view
+#o orçamento só é verificado com app.testing (ou ORCAMENTO_CONSULTAS=True na config);
+#scripts/benchmark.py passa por todas as views com orçamento e falha se alguma estourar
+#e verificação (EXPLAIN QUERY PLAN) de que as consultas quentes usam índice
+
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app
+from sqlalchemy import event
+
+from extensions import db
+
+
+class ContadorConsultas:
+
+    def __init__(self):
+        self.sql = []
+
+    @property
+    def total(self):
+        return len(self.sql)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.sql.append(statement)
+
+
+@contextmanager
+def contar_consultas(engine=None):
+    # engine explícito permite contar fora de um app context (ex.: em volta do test client)
+    contador = ContadorConsultas()
+    engine = engine or db.engine
+    event.listen(engine, "before_cursor_execute", contador)
+    try:
+        yield contador
+    finally:
+        event.remove(engine, "before_cursor_execute", contador)
+
+
+@contextmanager
+def limite_consultas(limite, nome="bloco"):
+    # falha com AssertionError se o bloco fizer mais de `limite` consultas
+    with contar_consultas() as contador:
+        yield contador
+    if contador.total > limite:
+        raise AssertionError(
+            f"{nome} fez {contador.total} consultas (orçamento: {limite}):\n"
+            + "\n".join(contador.sql)
+        )
+
+
+def orcamento_consultas(limite):
+    # declara quantas consultas uma view pode fazer, incluindo o render do template
+    def decorator(f):
+        f.orcamento_consultas = limite
+
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not (current_app.testing or current_app.config.get("ORCAMENTO_CONSULTAS")):
+                return f(*args, **kwargs)
+            with limite_consultas(limite, nome=f.__name__):
+                return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+
+# consultas dos caminhos mais usados; nenhuma pode cair em varredura completa da tabela
+CONSULTAS_QUENTES = {
+    "curtida do usuário no projeto":
+        "SELECT id FROM curtidas WHERE usuario_id = 1 AND projeto_id = 1",
+    "curtidas do projeto":
+        "SELECT id FROM curtidas WHERE projeto_id = 1",
+    "comentários do projeto":
+        "SELECT * FROM comentarios WHERE projeto_id = 1 ORDER BY criado_em DESC",
+    "coautoria":
+        "SELECT id FROM autor WHERE projeto_id = 1 AND usuario_id = 1",
+    "projetos do coautor":
+        "SELECT projeto_id FROM autor WHERE usuario_id = 1",
+    "projetos do dono":
+        "SELECT id FROM projetos WHERE usuario_id = 1",
+    "listagem por curtidas":
+        "SELECT * FROM projetos ORDER BY curtidas DESC, id DESC LIMIT 13",
+    "listagem por curtidas (cursor)":
+        "SELECT * FROM projetos WHERE (curtidas, id) < (5, 100) ORDER BY curtidas DESC, id DESC LIMIT 13",
+    "listagem filtrada":
+        "SELECT * FROM projetos WHERE curso = 'x' AND tipo = 'y' ORDER BY id DESC LIMIT 13",
+    "objetivos do projeto":
+        "SELECT * FROM objetivos WHERE projeto_id IN (1, 2)",
+    "metodologias do projeto":
+        "SELECT * FROM metodologias WHERE projeto_id IN (1, 2)",
+    "links do projeto":
+        "SELECT * FROM links WHERE projeto_id IN (1, 2)",
+}
+
+
+def planos_com_varredura():
+    # devolve {nome: plano} das consultas quentes que fazem "SCAN tabela" sem índice (só SQLite)
+    problemas = {}
+    with db.engine.connect() as conn:
+        for nome, sql in CONSULTAS_QUENTES.items():
+            plano = [linha[-1] for linha in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+            if any(p.startswith("SCAN") and "INDEX" not in p for p in plano):
+                problemas[nome] = plano
+    return problemas
@@ -0,0 +1,153 @@
+#arquivos estáticos com impressão digital (hash no nome) e versões pré-comprimidas
+#gerar_manifesto() percorre static/ (menos uploads/) e grava instance/estaticos.json com
+#"css/base.css" -> {"url": "css/base.3f2a9c1d.css", "gz": true, "br": true}, criando base.css.gz
+#e base.css.br ao lado do original. Com init_estaticos(app), url_for('static', ...) devolve o nome
+#com hash, que é servido com Cache-Control immutable: o nome muda quando o conteúdo muda
+#
+#brotli é opcional (pip install brotli); sem ele só o .gz é gerado
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+
+from flask import current_app, request, send_from_directory
+
+# um ano: o máximo que os navegadores respeitam
+VALIDADE_IMUTAVEL = 365 * 24 * 3600
+
+COMPRIMIVEIS = ('.css', '.js', '.svg', '.json', '.txt', '.html')
+IGNORADOS = ('uploads/',)
+
+_manifesto = {}   # "css/base.css" -> {"url": ..., "gz": bool, "br": bool}
+_reverso = {}     # "css/base.3f2a9c1d.css" -> "css/base.css"
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def _gravar(caminho, dados):
+    # vários workers podem gerar ao mesmo tempo: cada um grava no seu temporário
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, 'wb') as arquivo:
+        arquivo.write(dados)
+    os.replace(temporario, caminho)
+
+
+def _sidecars(absoluto, dados):
+    # só grava se ficar menor que o original
+    gerados = {'gz': False, 'br': False}
+    if not absoluto.endswith(COMPRIMIVEIS):
+        return gerados
+
+    comprimido = gzip.compress(dados, compresslevel=9, mtime=0)
+    if len(comprimido) < len(dados):
+        _gravar(absoluto + '.gz', comprimido)
+        gerados['gz'] = True
+
+    brotli = _brotli()
+    if brotli is not None:
+        comprimido = brotli.compress(dados, quality=11)
+        if len(comprimido) < len(dados):
+            _gravar(absoluto + '.br', comprimido)
+            gerados['br'] = True
+    return gerados
+
+
+def gerar_manifesto(pasta_static, destino):
+    manifesto = {}
+    for raiz, pastas, arquivos in os.walk(pasta_static):
+        pastas.sort()
+        for nome in sorted(arquivos):
+            if nome.endswith(('.gz', '.br', '.tmp')):
+                continue
+            absoluto = os.path.join(raiz, nome)
+            relativo = os.path.relpath(absoluto, pasta_static).replace(os.sep, '/')
+            if relativo.startswith(IGNORADOS):
+                continue
+
+            with open(absoluto, 'rb') as arquivo:
+                dados = arquivo.read()
+            impressao = hashlib.sha256(dados).hexdigest()[:12]
+            base, extensao = os.path.splitext(relativo)
+            manifesto[relativo] = {'url': f"{base}.{impressao}{extensao}", **_sidecars(absoluto, dados)}
+
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    _gravar(destino, json.dumps(manifesto, indent=1, sort_keys=True).encode('utf-8'))
+    return manifesto
+
+
+def carregar_manifesto(manifesto):
+    _manifesto.clear()
+    _manifesto.update(manifesto)
+    _reverso.clear()
+    _reverso.update({item['url']: original for original, item in manifesto.items()})
+
+
+def estatico_existe(caminho):
+    # substitui os.path.exists nos arquivos de static/ (sem acesso ao disco por requisição)
+    return caminho in _manifesto
+
+
+def _imutavel(resposta):
+    resposta.cache_control.no_cache = None  # padrão do send_file quando não há max_age
+    resposta.cache_control.public = True
+    resposta.cache_control.max_age = VALIDADE_IMUTAVEL
+    resposta.cache_control.immutable = True
+    return resposta
+
+
+def _servir(filename):
+    original = _reverso.get(filename)
+    if original is None:
+        resposta = current_app.send_static_file(filename)
+        # uploads endereçados pelo hash (services/armazenamento.py) também nunca mudam
+        if filename.startswith('uploads/objetos/') and '/_variantes/' not in filename:
+            _imutavel(resposta)
+        return resposta
+
+    item = _manifesto[original]
+    arquivo, codificacao = original, None
+    if item.get('br') and 'br' in request.accept_encodings:
+        arquivo, codificacao = original + '.br', 'br'
+    elif item.get('gz') and 'gzip' in request.accept_encodings:
+        arquivo, codificacao = original + '.gz', 'gzip'
+
+    resposta = send_from_directory(
+        current_app.static_folder, arquivo,
+        mimetype=mimetypes.guess_type(original)[0],
+    )
+    if codificacao:
+        resposta.headers['Content-Encoding'] = codificacao
+    if item.get('br') or item.get('gz'):
+        resposta.vary.add('Accept-Encoding')
+    return _imutavel(resposta)
+
+
+def init_estaticos(app):
+    destino = os.path.join(app.instance_path, 'estaticos.json')
+    if app.config.get("ESTATICOS_GERAR_AO_INICIAR", True) or not os.path.exists(destino):
+        manifesto = gerar_manifesto(app.static_folder, destino)
+    else:
+        with open(destino, encoding='utf-8') as arquivo:
+            manifesto = json.load(arquivo)
+    carregar_manifesto(manifesto)
+
+    if not app.config.get("ESTATICOS_IMPRESSAO_DIGITAL", True):
+        return
+
+    @app.url_defaults
+    def impressao_digital(endpoint, values):
+        # no modo debug o CSS muda sem reiniciar: mantém o nome original
+        if endpoint == 'static' and not current_app.debug:
+            item = _manifesto.get(values.get('filename'))
+            if item:
+                values['filename'] = item['url']
+
+    app.view_functions['static'] = _servir
@@ -0,0 +1,167 @@
+#instrumentação opcional por requisição (INSTRUMENTACAO = True na config)
+#conta consultas, tempo de banco e de template, devolve tudo no header Server-Timing
+#e grava as requisições lentas em um log rotativo
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+from flask import g, request, has_request_context, before_render_template, template_rendered
+from sqlalchemy import event
+
+from extensions import db
+
+# quantas consultas mais lentas guardar por requisição
+MAX_CONSULTAS_LENTAS = 5
+
+_recentes = deque(maxlen=200)
+_lock = threading.Lock()
+
+log_lentas = logging.getLogger("ifnexus.lentas")
+
+
+def requisicoes_recentes():
+    with _lock:
+        return list(reversed(_recentes))
+
+
+def _formato_parametros(parametros):
+    # só os tipos, nunca os valores (senhas, cpf...)
+    if parametros is None:
+        return "()"
+    if isinstance(parametros, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parametros.items()) + "}"
+    if isinstance(parametros, (list, tuple)):
+        if parametros and isinstance(parametros[0], (list, tuple, dict)):
+            return f"{len(parametros)} x {_formato_parametros(parametros[0])}"
+        return "(" + ", ".join(type(v).__name__ for v in parametros) + ")"
+    return type(parametros).__name__
+
+
+def _registro():
+    if has_request_context():
+        return g.get("_instrumentacao")
+    return None
+
+
+def _antes_consulta(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_inicio_consulta", []).append(time.perf_counter())
+
+
+def _depois_consulta(conn, cursor, statement, parameters, context, executemany):
+    inicio = conn.info["_inicio_consulta"].pop()
+    registro = _registro()
+    if registro is None:
+        return
+
+    duracao = (time.perf_counter() - inicio) * 1000
+    registro["consultas"] += 1
+    registro["db_ms"] += duracao
+
+    lentas = registro["lentas"]
+    if len(lentas) < MAX_CONSULTAS_LENTAS or duracao > lentas[-1]["ms"]:
+        lentas.append({
+            "ms": round(duracao, 2),
+            "sql": " ".join(statement.split()),
+            "parametros": _formato_parametros(parameters),
+        })
+        lentas.sort(key=lambda c: c["ms"], reverse=True)
+        del lentas[MAX_CONSULTAS_LENTAS:]
+
+
+def _erro_consulta(contexto):
+    # consulta que falhou não passa pelo after_cursor_execute
+    pilha = contexto.connection.info.get("_inicio_consulta") if contexto.connection is not None else None
+    if pilha:
+        pilha.pop()
+
+
+def _antes_template(app, template, context, **extra):
+    registro = _registro()
+    if registro is not None:
+        registro["_templates"].append(time.perf_counter())
+
+
+def _depois_template(app, template, context, **extra):
+    registro = _registro()
+    if registro is not None and registro["_templates"]:
+        inicio = registro["_templates"].pop()
+        # templates aninhados (include) não são somados duas vezes
+        if not registro["_templates"]:
+            registro["template_ms"] += (time.perf_counter() - inicio) * 1000
+
+
+def _configurar_log(app):
+    if log_lentas.handlers:
+        return
+    caminho = app.config.get("LOG_REQUISICOES_LENTAS") or os.path.join(app.instance_path, "requisicoes_lentas.log")
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    handler = RotatingFileHandler(caminho, maxBytes=5 * 1024 * 1024, backupCount=3, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    log_lentas.addHandler(handler)
+    log_lentas.setLevel(logging.INFO)
+    log_lentas.propagate = False
+
+
+def init_instrumentacao(app):
+    limite_lenta = app.config.get("LIMITE_REQUISICAO_LENTA_MS", 500)
+    _configurar_log(app)
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", _antes_consulta)
+        event.listen(db.engine, "after_cursor_execute", _depois_consulta)
+        event.listen(db.engine, "handle_error", _erro_consulta)
+
+    before_render_template.connect(_antes_template, app)
+    template_rendered.connect(_depois_template, app)
+
+    @app.before_request
+    def iniciar_registro():
+        g._instrumentacao = {
+            "inicio": time.perf_counter(),
+            "consultas": 0,
+            "db_ms": 0.0,
+            "template_ms": 0.0,
+            "lentas": [],
+            "_templates": [],
+        }
+
+    @app.after_request
+    def finalizar_registro(response):
+        registro = g.pop("_instrumentacao", None)
+        if registro is None:
+            return response
+
+        total_ms = (time.perf_counter() - registro["inicio"]) * 1000
+        response.headers["Server-Timing"] = ", ".join([
+            f'db;dur={registro["db_ms"]:.1f};desc="{registro["consultas"]} consultas"',
+            f'tpl;dur={registro["template_ms"]:.1f}',
+            f"total;dur={total_ms:.1f}",
+        ])
+
+        resumo = {
+            "quando": time.strftime("%H:%M:%S"),
+            "metodo": request.method,
+            "caminho": request.full_path.rstrip("?"),
+            "endpoint": request.endpoint,
+            "status": response.status_code,
+            "total_ms": round(total_ms, 1),
+            "db_ms": round(registro["db_ms"], 1),
+            "template_ms": round(registro["template_ms"], 1),
+            "consultas": registro["consultas"],
+            "lentas": registro["lentas"],
+        }
+        with _lock:
+            _recentes.append(resumo)
+
+        if total_ms >= limite_lenta:
+            log_lentas.info(
+                "%s %s %s %.1fms db=%.1fms/%d consultas tpl=%.1fms mais lenta: %s",
+                resumo["metodo"], resumo["caminho"], resumo["status"], total_ms,
+                resumo["db_ms"], resumo["consultas"], resumo["template_ms"],
+                resumo["lentas"][0] if resumo["lentas"] else "-",
+            )
+        return response
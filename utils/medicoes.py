@@ -0,0 +1,140 @@
+#medições dos benchmarks (scripts/benchmark.py e scripts/carga.py): percentis de latência,
+#resultado em JSON e comparação com a linha de base guardada em benchmarks/
+#
+#uma regressão é: p95 acima da linha de base mais a tolerância (e mais que FOLGA_MS, para o
+#ruído de cenários de 1-2 ms não reprovar), mais consultas por requisição do que antes ou
+#vazão (RPS) abaixo da linha de base menos a tolerância
+#
+#só se compara com a linha de base um resultado sobre o mesmo volume de dados (dentro de
+#TOLERANCIA_DADOS, as curtidas alternadas pelos benchmarks mudam um pouco as contagens); p95 e
+#vazão só valem com MINIMO_AMOSTRAS nos dois lados (o p95 de 2 ou 6 amostras é o máximo delas)
+
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+
+TOLERANCIA = 0.25
+FOLGA_MS = 2.0
+TOLERANCIA_DADOS = 0.01
+MINIMO_AMOSTRAS = 20
+
+
+def percentil(ordenados, p):
+    # interpolação linear entre os dois vizinhos (mesmo resultado do numpy.percentile)
+    if not ordenados:
+        return 0.0
+    posicao = (len(ordenados) - 1) * p / 100
+    abaixo = int(posicao)
+    acima = min(abaixo + 1, len(ordenados) - 1)
+    return ordenados[abaixo] + (ordenados[acima] - ordenados[abaixo]) * (posicao - abaixo)
+
+
+def resumir(latencias_ms, consultas=None, duracao=None, erros=0):
+    ordenados = sorted(latencias_ms)
+    resumo = {
+        "n": len(ordenados),
+        "erros": erros,
+        "media_ms": round(sum(ordenados) / len(ordenados), 2) if ordenados else 0.0,
+        "p50_ms": round(percentil(ordenados, 50), 2),
+        "p95_ms": round(percentil(ordenados, 95), 2),
+        "p99_ms": round(percentil(ordenados, 99), 2),
+        "max_ms": round(ordenados[-1], 2) if ordenados else 0.0,
+    }
+    # sem duração (requisições em sequência), a vazão é a de um único cliente
+    tempo = duracao if duracao else sum(ordenados) / 1000
+    resumo["rps"] = round(len(ordenados) / tempo, 1) if tempo else 0.0
+    if consultas:
+        resumo["consultas_media"] = round(sum(consultas) / len(consultas), 2)
+        resumo["consultas_max"] = max(consultas)
+    return resumo
+
+
+def novo_resultado(tipo, **contexto):
+    return {
+        "tipo": tipo,
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "ambiente": {
+            "python": sys.version.split()[0],
+            "plataforma": platform.platform(),
+            "processador": platform.processor() or platform.machine(),
+        },
+        **contexto,
+        "cenarios": {},
+    }
+
+
+def salvar(resultado, caminho):
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+
+
+def carregar(caminho):
+    if not caminho or not os.path.exists(caminho):
+        return None
+    with open(caminho, encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def dados_diferentes(resultado, linha_base, tolerancia=TOLERANCIA_DADOS):
+    # {tabela: (linhas agora, linhas na linha de base)} das que não batem
+    atual = resultado.get("dados") or {}
+    diferentes = {}
+    for tabela, linhas in (linha_base.get("dados") or {}).items():
+        agora = atual.get(tabela)
+        if agora is None or abs(agora - linhas) > tolerancia * max(linhas, 1):
+            diferentes[tabela] = (agora, linhas)
+    return diferentes
+
+
+def poucas_amostras(resultado, linha_base, minimo=MINIMO_AMOSTRAS):
+    # {cenário: menor n dos dois lados} dos que não têm amostras para comparar p95 e vazão
+    poucas = {}
+    for nome, base in linha_base.get("cenarios", {}).items():
+        atual = resultado["cenarios"].get(nome)
+        if atual is not None and min(atual["n"], base["n"]) < minimo:
+            poucas[nome] = min(atual["n"], base["n"])
+    return poucas
+
+
+def comparar(resultado, linha_base, tolerancia=TOLERANCIA, folga_ms=FOLGA_MS, minimo_amostras=MINIMO_AMOSTRAS):
+    # devolve a lista de regressões (vazia = dentro do orçamento)
+    diferentes = dados_diferentes(resultado, linha_base)
+    if diferentes:
+        detalhe = ", ".join(f"{tabela} {agora} x {linhas}" for tabela, (agora, linhas) in diferentes.items())
+        return [f"volume de dados diferente da linha de base ({detalhe}): compare sobre um banco da mesma "
+                f"escala ou grave outra linha de base"]
+
+    regressoes = []
+    for nome, base in linha_base.get("cenarios", {}).items():
+        atual = resultado["cenarios"].get(nome)
+        if atual is None:
+            continue
+        amostras = min(atual["n"], base["n"]) >= minimo_amostras
+
+        limite = base["p95_ms"] * (1 + tolerancia)
+        if amostras and atual["p95_ms"] > limite and atual["p95_ms"] - base["p95_ms"] > folga_ms:
+            regressoes.append(f"{nome}: p95 {atual['p95_ms']} ms (linha de base {base['p95_ms']} ms, limite {limite:.1f})")
+
+        if "consultas_max" in base and atual.get("consultas_max", 0) > base["consultas_max"]:
+            regressoes.append(f"{nome}: {atual['consultas_max']} consultas por requisição "
+                              f"(linha de base {base['consultas_max']})")
+
+        if amostras and resultado["tipo"] == "carga" and atual["rps"] < base["rps"] * (1 - tolerancia):
+            regressoes.append(f"{nome}: {atual['rps']} req/s (linha de base {base['rps']})")
+
+        if atual.get("erros") and not base.get("erros"):
+            regressoes.append(f"{nome}: {atual['erros']} erros")
+    return regressoes
+
+
+def imprimir(resultado, linha_base=None):
+    base = (linha_base or {}).get("cenarios", {})
+    print(f"{'cenário':<24}{'n':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'req/s':>9}{'consultas':>11}{'p95 base':>10}")
+    for nome, r in resultado["cenarios"].items():
+        consultas = f"{r['consultas_media']:.1f}/{r['consultas_max']}" if "consultas_max" in r else "-"
+        anterior = f"{base[nome]['p95_ms']:.1f}" if nome in base else "-"
+        print(f"{nome:<24}{r['n']:>6}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+              f"{r['rps']:>9.1f}{consultas:>11}{anterior:>10}")